@@ -0,0 +1,3 @@
+""""""
+
+from .ledger_generator import generate_events, write_csv
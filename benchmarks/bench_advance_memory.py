@@ -0,0 +1,110 @@
+"""
+Benchmark of the memory used to keep the processed advances.
+
+The same advances are kept both as a list of 'AdvanceEntity' dataclasses, as the balance entity used to keep
+them, and in an 'AdvanceStore', and the memory allocated by each one of them is measured with tracemalloc.
+
+Usage: python -m benchmarks.bench_advance_memory [--advances 1000000] [--open-ratio 0.1] [--inexact-every 100]
+"""
+
+import argparse
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, List, Tuple
+
+from src.builders import AdvanceEntityBuilder
+from src.entities import AdvanceStore
+
+from .ledger_generator import generate_events
+
+
+def measure(build: Callable[[], Any]) -> Tuple[Any, int]:
+    """
+    Function to measure the memory allocated by the object built by the given function.
+
+    Parameters
+    ----------
+    build : Callable[[], Any]
+        The function that builds the object.
+
+    Returns
+    --------
+    Tuple[Any, int]
+        The built object and how many bytes it holds.
+    """
+    tracemalloc.start()
+    built = build()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return built, allocated
+
+
+def run(count: int, open_ratio: float, inexact_every: int) -> None:
+    """
+    Function to keep the given number of advances in both structures and print their memory usage.
+
+    The most recent advances are open, as payments always close the oldest ones first, and a few of them are not
+    a whole number of cents. Every Decimal is created while the structures are built, so the balances and the
+    amounts each structure holds are measured along with it.
+
+    Parameters
+    ----------
+    count : int
+        How many advances to keep.
+
+    open_ratio : float
+        The fraction of the advances that are still open.
+
+    inexact_every : int
+        One in every `inexact_every` advances is not a whole number of cents. If 0, all of them are.
+    """
+    first_open = count - int(count * open_ratio)
+    advances: List[Tuple[date, str, str]] = []
+
+    for index, (_, event_date, amount) in enumerate(generate_events(count, advance_ratio=1)):
+        if inexact_every and index % inexact_every == 0:
+            amount += "5"
+
+        advances.append((date.fromisoformat(event_date), amount, amount if index >= first_open else "0"))
+
+    def build_entities() -> List[Any]:
+        builder = AdvanceEntityBuilder()
+        entities = []
+
+        for event_date, amount, current_balance in advances:
+            entity = builder.build_entity(Decimal(amount), event_date)
+            entity.current_balance = Decimal(current_balance)
+            entities.append(entity)
+
+        return entities
+
+    def build_store() -> AdvanceStore:
+        store = AdvanceStore()
+        for event_date, amount, current_balance in advances:
+            store.append(event_date, Decimal(amount), Decimal(current_balance))
+        return store
+
+    _, entities_bytes = measure(build_entities)
+    store, store_bytes = measure(build_store)
+
+    print(
+        f"{count} advances, {len(store.open_balances)} open, "
+        f"{len(store.inexact_amounts)} not a whole number of cents"
+    )
+    print(f"{'Structure':>16}{'Advances':>12}{'MB':>10}{'Bytes/advance':>16}")
+    print(f"{'AdvanceEntity':>16}{count:>12}{entities_bytes / 1e6:>10.1f}{entities_bytes / count:>16.1f}")
+    print(f"{'AdvanceStore':>16}{count:>12}{store_bytes / 1e6:>10.1f}{store_bytes / count:>16.1f}")
+    print(f"Reduction: {entities_bytes / store_bytes:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--advances", type=int, default=1000000)
+    parser.add_argument("--open-ratio", type=float, default=0.1, help="The fraction of the advances still open.")
+    parser.add_argument(
+        "--inexact-every", type=int, default=100, help="One in every N advances is not a whole number of cents."
+    )
+    arguments = parser.parse_args()
+    run(arguments.advances, arguments.open_ratio, arguments.inexact_every)
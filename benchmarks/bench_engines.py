@@ -0,0 +1,76 @@
+"""
+Benchmark of the balance engines.
+
+Each engine replays the same synthetic ledger, straight from in-memory rows, so the timings only measure
+the engines themselves. The vector engine is also timed from the event columns, as it reads the binary files,
+without reading the rows into columns first.
+
+Usage: python -m benchmarks.bench_engines [--sizes 100000 1000000]
+"""
+
+import argparse
+import time
+from typing import List
+
+from src import EventHandler
+from src.use_cases import FixedPointCalculateAdvances, VectorizedCalculateAdvances
+from src.use_cases.vectorized_calculate_advances import NUMPY_AVAILABLE, np
+
+from .bench_fifo_allocation import build_rows
+
+
+def run(sizes: List[int]) -> None:
+    """
+    Function to replay ledgers of the given sizes with each engine and print their timings.
+
+    Parameters
+    ----------
+    sizes : List[int]
+        The event counts to benchmark.
+    """
+    print(f"{'Events':>10}{'Engine':>10}{'Seconds':>12}{'us/event':>12}{'Speedup':>10}")
+
+    for size in sizes:
+        rows = build_rows(size)
+
+        start = time.perf_counter()
+        EventHandler(rows, None).handle_all_events()
+        decimal_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        FixedPointCalculateAdvances(rows, None).get_balance()
+        fixed_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        VectorizedCalculateAdvances(rows, None).get_balance()
+        vector_elapsed = time.perf_counter() - start
+
+        print(f"{size:>10}{'decimal':>10}{decimal_elapsed:>12.3f}{decimal_elapsed / size * 1e6:>12.2f}{1:>10.1f}")
+        print(
+            f"{size:>10}{'fixed':>10}{fixed_elapsed:>12.3f}{fixed_elapsed / size * 1e6:>12.2f}"
+            f"{decimal_elapsed / fixed_elapsed:>10.1f}"
+        )
+        print(
+            f"{size:>10}{'vector':>10}{vector_elapsed:>12.3f}{vector_elapsed / size * 1e6:>12.2f}"
+            f"{decimal_elapsed / vector_elapsed:>10.1f}"
+        )
+
+        # THE COLUMNS ARE ONLY TIMED WITH NUMPY, AS THE VECTOR ENGINE FALLS BACK TO THE FIXED ONE WITHOUT IT
+        if not NUMPY_AVAILABLE:
+            continue
+
+        columns = [np.array([row[field] for row in rows], dtype=np.int64) for field in (1, 2, 3)]
+        start = time.perf_counter()
+        VectorizedCalculateAdvances([], None).get_columns_balance(*columns)
+        columns_elapsed = time.perf_counter() - start
+
+        print(
+            f"{size:>10}{'columns':>10}{columns_elapsed:>12.3f}{columns_elapsed / size * 1e6:>12.2f}"
+            f"{decimal_elapsed / columns_elapsed:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100000, 1000000])
+    run(parser.parse_args().sizes)
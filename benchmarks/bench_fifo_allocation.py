@@ -0,0 +1,65 @@
+"""
+Benchmark of the FIFO payment allocation over the open advances.
+
+The ledger is replayed for increasing event counts; if the allocation is linear in the event count,
+the time per event stays roughly constant while the total replay time grows linearly.
+
+Usage: python -m benchmarks.bench_fifo_allocation [--sizes 10000 20000 40000 80000]
+"""
+
+import argparse
+import time
+from typing import Any, List, Tuple
+
+from src import EventHandler
+from src.entities import EVENT_TYPE_CODES
+from src.repositories.event_repository import to_cents, to_day_ordinal, to_exact_amount
+
+from .ledger_generator import generate_events
+
+
+def build_rows(count: int) -> List[Tuple[Any]]:
+    """
+    Function to build the database rows of a synthetic ledger.
+
+    Parameters
+    ----------
+    count : int
+        How many events to generate.
+
+    Returns
+    --------
+    List[Tuple[Any]]
+        The (id, type_code, cents, date_created, exact_amount) rows, encoded as they are stored.
+    """
+    return [
+        (event_id, EVENT_TYPE_CODES[event_type], to_cents(amount), to_day_ordinal(event_date), to_exact_amount(amount))
+        for event_id, (event_type, event_date, amount) in enumerate(generate_events(count), start=1)
+    ]
+
+
+def run(sizes: List[int]) -> None:
+    """
+    Function to replay ledgers of the given sizes and print their timings.
+
+    Parameters
+    ----------
+    sizes : List[int]
+        The event counts to benchmark.
+    """
+    print(f"{'Events':>10}{'Seconds':>12}{'us/event':>12}")
+
+    for size in sizes:
+        rows = build_rows(size)
+
+        start = time.perf_counter()
+        EventHandler(rows, None).handle_all_events()
+        elapsed = time.perf_counter() - start
+
+        print(f"{size:>10}{elapsed:>12.3f}{elapsed / size * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10000, 20000, 40000, 80000])
+    run(parser.parse_args().sizes)
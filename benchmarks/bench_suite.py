@@ -0,0 +1,255 @@
+"""
+Benchmark suite of the ledger commands and stages, with JSON results that can be compared between runs.
+
+For each ledger size, a synthetic CSV file is generated and the following scenarios are timed:
+* load: the `load` command, from the CSV file into a new database;
+* balances_early / balances_late: the `balances` command, without the cache, as of a date at 10% of the
+  ledger and as of a date after its last event;
+* balances_cached: the `balances` command as of the late date, once its balance is cached;
+* entities_handler: building the entities from in-memory rows with the 'EntitiesHandler' Class alone;
+* calculate_advances: processing prebuilt entities with the 'CalculateAdvances' Class alone.
+
+Usage: python -m benchmarks.bench_suite [--sizes 1000 10000 100000] [--repeat 3] [--output results.json]
+       [--compare baseline.json] [--threshold 0.2]
+
+When `--compare` is given, every scenario that got slower than the baseline by more than the threshold is flagged
+as a regression, and the process exits with status 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from click.testing import CliRunner
+
+from cli import interface
+from src.handlers.entities_handler import EntitiesHandler
+from src.use_cases import CalculateAdvances
+
+from .bench_fifo_allocation import build_rows
+from .ledger_generator import generate_events, write_csv
+
+
+def time_best(function: Callable[[], Any], repeat: int, setup: Optional[Callable[[], None]] = None) -> float:
+    """
+    Function to time a function a few times and get its best timing.
+
+    Parameters
+    ----------
+    function : Callable[[], Any]
+        The function to be timed.
+
+    repeat : int
+        How many times the function is timed.
+
+    setup : Optional[Callable[[], None]]
+        A function called, without being timed, before each timing.
+
+    Returns
+    --------
+    float
+        The best timing, in seconds.
+    """
+    timings = []
+
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def invoke(*arguments: str) -> None:
+    """
+    Function to invoke a command of the ledger CLI, failing if the command fails.
+
+    Parameters
+    ----------
+    arguments : str
+        The command line arguments.
+    """
+    result = CliRunner().invoke(interface, list(arguments))
+
+    if result.exit_code != 0:
+        raise RuntimeError(f"`{' '.join(arguments)}` failed: {result.output}{result.exception}")
+
+
+def run_size(size: int, repeat: int) -> Dict[str, float]:
+    """
+    Function to time all the scenarios for a ledger of the given size.
+
+    Parameters
+    ----------
+    size : int
+        How many events the ledger has.
+
+    repeat : int
+        How many times each scenario is timed.
+
+    Returns
+    --------
+    Dict[str, float]
+        The best timing of each scenario, in seconds, by scenario name.
+    """
+    timings = {}
+    rows = build_rows(size)
+    first_date = date.fromordinal(rows[0][3])
+    last_date = date.fromordinal(rows[-1][3])
+    early_date = (first_date + (last_date - first_date) / 10).isoformat()
+    late_date = (last_date + timedelta(days=30)).isoformat()
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "ledger.csv")
+        db_path = os.path.join(directory, "db.sqlite3")
+        write_csv(csv_path, generate_events(size))
+
+        current_directory = os.getcwd()
+        os.chdir(directory)
+
+        try:
+            def create_db() -> None:
+                if os.path.exists(db_path):
+                    os.unlink(db_path)
+                invoke("create-db")
+
+            timings["load"] = time_best(lambda: invoke("load", csv_path), repeat, setup=create_db)
+            timings["balances_early"] = time_best(lambda: invoke("balances", early_date, "--no-cache"), repeat)
+            timings["balances_late"] = time_best(lambda: invoke("balances", late_date, "--no-cache"), repeat)
+
+            invoke("balances", late_date)
+            timings["balances_cached"] = time_best(lambda: invoke("balances", late_date), repeat)
+
+        finally:
+            os.chdir(current_directory)
+
+    timings["entities_handler"] = time_best(
+        lambda: deque(EntitiesHandler(rows, None).build_entities(), maxlen=0), repeat
+    )
+
+    entities: List[Any] = []
+
+    def build_entities() -> None:
+        entities[:] = EntitiesHandler(rows, None).build_entities()
+
+    timings["calculate_advances"] = time_best(
+        lambda: CalculateAdvances(entities, None).get_balance(), repeat, setup=build_entities
+    )
+
+    return timings
+
+
+def run(sizes: List[int], repeat: int) -> Dict[str, Any]:
+    """
+    Function to time all the scenarios for ledgers of the given sizes and print their timings.
+
+    Parameters
+    ----------
+    sizes : List[int]
+        The event counts to benchmark.
+
+    repeat : int
+        How many times each scenario is timed.
+
+    Returns
+    --------
+    Dict[str, Any]
+        The JSON results, with the run metadata and the timing of each scenario.
+    """
+    results = []
+    print(f"{'Events':>10}{'Scenario':>20}{'Seconds':>12}{'us/event':>12}")
+
+    for size in sizes:
+        for scenario, seconds in run_size(size, repeat).items():
+            results.append({"scenario": scenario, "events": size, "seconds": seconds})
+            print(f"{size:>10}{scenario:>20}{seconds:>12.3f}{seconds / size * 1e6:>12.2f}")
+
+    return {
+        "metadata": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Function to compare the results with a baseline and print the ratio of each timing.
+
+    Parameters
+    ----------
+    results : Dict[str, Any]
+        The JSON results of the current run.
+
+    baseline : Dict[str, Any]
+        The JSON results of the baseline run.
+
+    threshold : float
+        How much slower than the baseline, as a fraction, a scenario can get before being flagged.
+
+    Returns
+    --------
+    List[str]
+        A description of each regression.
+    """
+    baseline_seconds = {(result["scenario"], result["events"]): result["seconds"] for result in baseline["results"]}
+    regressions = []
+
+    print(f"\n{'Events':>10}{'Scenario':>20}{'Baseline':>12}{'Current':>12}{'Ratio':>8}")
+
+    for result in results["results"]:
+        key = (result["scenario"], result["events"])
+        if key not in baseline_seconds:
+            continue
+
+        ratio = result["seconds"] / baseline_seconds[key]
+        flag = ""
+
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(f"{result['scenario']} with {result['events']} events is {ratio:.2f}x slower")
+
+        print(
+            f"{result['events']:>10}{result['scenario']:>20}{baseline_seconds[key]:>12.3f}"
+            f"{result['seconds']:>12.3f}{ratio:>8.2f}{flag}"
+        )
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="The path to write the JSON results to.")
+    parser.add_argument("--compare", help="The path of the JSON results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    arguments = parser.parse_args()
+
+    run_results = run(arguments.sizes, arguments.repeat)
+
+    if arguments.output is not None:
+        with open(arguments.output, "w") as output_f:
+            json.dump(run_results, output_f, indent=2)
+
+    if arguments.compare is not None:
+        with open(arguments.compare) as baseline_f:
+            found_regressions = compare(run_results, json.load(baseline_f), arguments.threshold)
+
+        for regression in found_regressions:
+            print(f"Regression: {regression}")
+
+        sys.exit(1 if found_regressions else 0)
@@ -0,0 +1,33 @@
+"""
+Generator of synthetic ledger CSV files, in the format loaded by the `load` command.
+
+Usage: python -m benchmarks.generate_ledger OUTPUT.csv [--events 100000] [--advance-ratio 0.5]
+       [--events-per-day 3] [--max-day-gap 3] [--seed 0]
+"""
+
+import argparse
+
+from .ledger_generator import generate_events, write_csv
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output")
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--advance-ratio", type=float, default=0.5)
+    parser.add_argument("--events-per-day", type=int, default=3)
+    parser.add_argument("--max-day-gap", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    count = write_csv(
+        arguments.output,
+        generate_events(
+            arguments.events,
+            advance_ratio=arguments.advance_ratio,
+            seed=arguments.seed,
+            events_per_day=arguments.events_per_day,
+            max_day_gap=arguments.max_day_gap
+        )
+    )
+    print(f"Wrote {count} events to {arguments.output}")
@@ -0,0 +1,93 @@
+"""
+Module containing the synthetic ledger generator used by the benchmarks.
+"""
+
+import csv
+import random
+from datetime import date, timedelta
+from typing import Iterable, Iterator, Tuple
+
+
+def generate_events(
+    count: int,
+    advance_ratio: float = 0.5,
+    seed: int = 0,
+    start_date: date = date(2021, 1, 1),
+    events_per_day: int = 3,
+    max_day_gap: int = 3
+) -> Iterator[Tuple[str, str, str]]:
+    """
+    Function to generate a deterministic sequence of ledger events, in the CSV file format.
+
+    Payments are sized around the average advance amount, so most advances end up being paid off
+    while a few of them stay open for a while.
+
+    Parameters
+    ----------
+    count : int
+        How many events to generate.
+
+    advance_ratio : float
+        The fraction of the events that are advances; the remaining ones are payments.
+
+    seed : int
+        The seed of the random generator, so the same arguments always generate the same events.
+
+    start_date : date
+        The date of the first event.
+
+    events_per_day : int
+        The average number of events per day.
+
+    max_day_gap : int
+        The greatest number of days between two consecutive event dates.
+
+    Yields
+    -------
+    Tuple[str, str, str]
+        The (type, date, amount) of each event.
+    """
+    generator = random.Random(seed)
+    current_date = start_date
+
+    for _ in range(count):
+        if generator.random() < 1 / events_per_day:
+            current_date += timedelta(days=generator.randint(1, max_day_gap))
+
+        if generator.random() < advance_ratio:
+            event_type = "advance"
+            amount = generator.randint(10000, 500000)
+        else:
+            event_type = "payment"
+            amount = generator.randint(5000, 600000)
+
+        yield event_type, current_date.isoformat(), f"{amount / 100:.2f}"
+
+
+def write_csv(path: str, events: Iterable[Tuple[str, str, str]]) -> int:
+    """
+    Function to write events to a CSV file, in the format loaded by the `load` command.
+
+    Parameters
+    ----------
+    path : str
+        The path of the CSV file.
+
+    events : Iterable[Tuple[str, str, str]]
+        The (type, date, amount) of each event.
+
+    Returns
+    --------
+    int
+        How many events were written.
+    """
+    written = 0
+
+    with open(path, "w", newline="") as outfile:
+        writer = csv.writer(outfile)
+
+        for event in events:
+            writer.writerow(event)
+            written += 1
+
+    return written
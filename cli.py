@@ -4,20 +4,52 @@ import sqlite3
 
 import os
 import csv
-from datetime import datetime, timedelta
-from typing import Dict
+import json
+import contextlib
+import signal
+import time
+import cProfile
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib.request import pathname2url
 
-from src import EventHandler
+from src import LedgerHandler, LoadHandler
+from src.handlers import (
+    DaemonClient,
+    DaemonHandler,
+    EventFileHandler,
+    InstrumentationHandler,
+    OutputHandler,
+    PortfolioHandler,
+    SimulationHandler
+)
+from src.handlers.instrumentation_handler import record_stage
+from src.repositories import SchemaRepository
+
+
+PERIODS = ("day", "week", "month", "quarter", "year")
 
 
 @click.group()
 @click.option("--debug/--no-debug", default=False, help="Debug output, or no debug output.")
+@click.option(
+    "--profile", "profile_path", type=click.Path(dir_okay=False, writable=True), help="Dump a cProfile file to PATH."
+)
+@click.option(
+    "--metrics",
+    "metrics_path",
+    type=click.Path(dir_okay=False, writable=True),
+    help="Dump the stage timings and counters as JSON to PATH."
+)
 @click.pass_context
-def interface(ctx: Dict, debug: bool) -> None:
+def interface(ctx: Dict, debug: bool, profile_path: Optional[str], metrics_path: Optional[str]) -> None:
     """Ampla engineering takehome ledger calculator."""
     ctx.ensure_object(dict)
     ctx.obj["DEBUG"] = debug  # you can use ctx.obj['DEBUG'] in other commands to log or print if DEBUG is on
+    ctx.obj["PROFILE_PATH"] = profile_path
+    ctx.obj["METRICS_PATH"] = metrics_path
     ctx.obj["DB_PATH"] = os.path.join(os.getcwd(), "db.sqlite3")
+    ctx.obj["DAEMON_PATH"] = ctx.obj["DB_PATH"] + ".daemon"
     if debug:
         click.echo(f"[Debug mode is on]")
 
@@ -38,20 +70,7 @@ def create_db(ctx: Dict) -> None:
             )
             return
 
-        cursor = connection.cursor()
-        cursor.execute(
-            """
-            create table events
-            (
-                id integer not null primary key autoincrement,
-                type varchar(32) not null,
-                amount decimal not null,
-                date_created date not null
-                CHECK (type IN ("advance", "payment"))
-            );
-        """
-        )
-        connection.commit()
+        SchemaRepository(connection).create_schema()
     click.echo(f"Initialized database at {ctx.obj['DB_PATH']}")
 
 
@@ -59,76 +78,758 @@ def create_db(ctx: Dict) -> None:
 @click.pass_context
 def drop_db(ctx: Dict) -> None:
     """Delete sqlite3 database."""
+    address = DaemonClient.get_running_address(ctx.obj["DAEMON_PATH"])
+
     if not os.path.exists(ctx.obj["DB_PATH"]):
         click.echo(f"SQLite database does not exist at {ctx.obj['DB_PATH']}")
+    elif address is not None:
+        click.echo(
+            f"A daemon (pid {address['pid']}) is serving the database at {address['url']}, "
+            "please stop it before deleting the database"
+        )
     else:
         os.unlink(ctx.obj["DB_PATH"])
+
+        # REMOVING THE WAL FILES AND THE ADDRESS OF A DAEMON THAT DID NOT STOP CLEANLY, SO THEY ARE NOT APPLIED
+        # TO A NEW DATABASE AT THE SAME PATH
+        for suffix in ("-wal", "-shm", ".daemon"):
+            if os.path.exists(ctx.obj["DB_PATH"] + suffix):
+                os.unlink(ctx.obj["DB_PATH"] + suffix)
+
         click.echo(f"Deleted SQLite database at {ctx.obj['DB_PATH']}")
 
 
 @interface.command()
-@click.argument("filename", type=click.Path(exists=True, writable=False, readable=True))
 @click.pass_context
-def load(ctx: Dict, filename: str) -> None:
-    """Load events with data from csv file."""
+def migrate_db(ctx: Dict) -> None:
+    """Apply pending schema migrations to the sqlite3 database."""
+    if not os.path.exists(ctx.obj["DB_PATH"]):
+        click.echo(f"Database does not exist at {ctx.obj['DB_PATH']}, please create it using `create-db` command")
+        return
+
+    with sqlite3.connect(ctx.obj["DB_PATH"]) as connection:
+        schema_repository = SchemaRepository(connection)
+        applied = schema_repository.migrate()
+
+        for description in applied:
+            click.echo(f"Applied migration: {description}")
+
+        click.echo(f"Database at {ctx.obj['DB_PATH']} is at schema version {schema_repository.get_version()}")
+
+
+def echo_progress(loaded: int, elapsed: float) -> None:
+    """Report how many events were loaded so far and the load throughput on stderr."""
+    click.echo(f"{loaded} events loaded in {elapsed:.2f}s ({loaded / max(elapsed, 1e-9):.0f} rows/s)", err=True)
+
+
+@interface.command()
+@click.argument(
+    "filename", type=click.Path(exists=True, dir_okay=False, writable=False, readable=True, allow_dash=True)
+)
+@click.option(
+    "--checkpoint-interval",
+    default=LedgerHandler.DEFAULT_CHECKPOINT_INTERVAL,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="How many events are replayed between two ledger checkpoints."
+)
+@click.option(
+    "--batch-size",
+    default=LoadHandler.DEFAULT_BATCH_SIZE,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="How many events are inserted in each batch."
+)
+@click.option("--defer-index", is_flag=True, help="Drop the events date index during the load and build it at the end.")
+@click.option("--progress", is_flag=True, help="Report the load progress and throughput on stderr.")
+@click.option(
+    "--follow",
+    is_flag=True,
+    help="Load only the lines appended since the previous `--follow` load of the file, then keep loading new ones."
+)
+@click.option("--once", is_flag=True, help="With `--follow`, stop after loading the appended lines.")
+@click.option(
+    "--poll-interval",
+    default=1.0,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help="With `--follow`, how many seconds to wait before checking the file for new lines again."
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="How many processes parse and validate the file. Defaults to one per CPU."
+)
+@click.option(
+    "--chunk-size",
+    default=LoadHandler.DEFAULT_CHUNK_SIZE,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="How many bytes of the file each process parses at a time."
+)
+@click.option(
+    "rejects_path",
+    "--rejects",
+    type=click.Path(dir_okay=False, writable=True),
+    help="The CSV file the rejected lines are written to. Defaults to FILENAME.rejects, or stdin.rejects."
+)
+@click.pass_context
+def load(
+    ctx: Dict,
+    filename: str,
+    checkpoint_interval: int,
+    batch_size: int,
+    defer_index: bool,
+    progress: bool,
+    follow: bool = False,
+    once: bool = False,
+    poll_interval: float = 1.0,
+    workers: Optional[int] = None,
+    chunk_size: int = LoadHandler.DEFAULT_CHUNK_SIZE,
+    rejects_path: Optional[str] = None
+) -> None:
+    """
+    Load events with data from csv file, with `TYPE,DATE,AMOUNT[,CUSTOMER]` rows.
+
+    The file may be compressed with gzip, bzip2 or xz, and `-` reads it from the standard input.
+    """
     if not os.path.exists(ctx.obj["DB_PATH"]):
         click.echo(f"Database does not exist at {ctx.obj['DB_PATH']}, please create it using `create-db` command")
         return
 
-    loaded = 0
-    with open(filename) as infile, sqlite3.connect(ctx.obj["DB_PATH"]) as connection:
-        cursor = connection.cursor()
-        reader = csv.reader(infile)
-        for row in reader:
-            cursor.execute(
-                f"insert into events (type, amount, date_created) values (?, ?, ?)", (row[0], row[2], row[1])
+    if once and not follow:
+        raise click.UsageError("`--once` requires `--follow`.")
+
+    if follow and filename == "-":
+        raise click.UsageError("`--follow` can not read from the standard input.")
+
+    source_name = "stdin" if filename == "-" else filename
+
+    rejects_path = rejects_path or f"{source_name}.rejects"
+    rejects_writer = None
+
+    def report_reject(offset: int, reason: str, line: str) -> None:
+        nonlocal rejects_writer
+
+        # THE REJECTS FILE IS ONLY CREATED IF ANY LINE IS REJECTED, AND IT IS KEPT ACROSS THE POLLS OF `--follow`
+        if rejects_writer is None:
+            rejects_f = stack.enter_context(open(rejects_path, "a" if follow else "w", newline=""))
+            rejects_writer = csv.writer(rejects_f)
+            if not rejects_f.tell():
+                rejects_writer.writerow(["offset", "reason", "line"])
+
+        rejects_writer.writerow([offset, reason, line])
+
+    def report_load(load_handler: LoadHandler, loaded: int) -> None:
+        click.echo(f"Loaded {loaded} events from {source_name}")
+
+        if load_handler.rejected:
+            click.echo(f"Rejected {load_handler.rejected} lines, written to {rejects_path}")
+
+        if load_handler.out_of_order:
+            click.echo(
+                f"Warning: {load_handler.out_of_order} events are dated before a previous event of the file, "
+                "they are replayed in date order",
+                err=True
             )
-            loaded += 1
-        connection.commit()
 
-    click.echo(f"Loaded {loaded} events from {filename}")
+    with contextlib.ExitStack() as stack, sqlite3.connect(ctx.obj["DB_PATH"]) as connection:
+        SchemaRepository(connection).migrate()
+        ledger_handler = LedgerHandler(connection, checkpoint_interval)
+        load_handler = LoadHandler(connection, batch_size, defer_index, workers, chunk_size)
+
+        if not follow:
+            last_event_id = ledger_handler.event_repository.get_max_id()
+            previous_fingerprint = ledger_handler.event_repository.get_fingerprint()
+
+            try:
+                loaded = load_handler.load(filename, echo_progress if progress else None, report_reject)
+            finally:
+                ledger_handler.refresh_checkpoints(last_event_id)
+                ledger_handler.refresh_cache(last_event_id, previous_fingerprint)
+
+            report_load(load_handler, loaded)
+            return
+
+        # STOPPING ON SIGTERM AS ON CTRL+C, SO THE LEDGER IS REFRESHED WITH THE EVENTS ALREADY LOADED
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+        try:
+            while True:
+                last_event_id = ledger_handler.event_repository.get_max_id()
+                previous_fingerprint = ledger_handler.event_repository.get_fingerprint()
+
+                # THE CHECKPOINTS AND THE CACHE ARE REFRESHED AFTER EACH POLL, SO THE BALANCES ARE ALWAYS CURRENT
+                try:
+                    loaded = load_handler.load_appended(
+                        filename, echo_progress if progress else None, report_reject
+                    )
+                except ValueError as error:
+                    raise click.ClickException(str(error))
+                finally:
+                    ledger_handler.refresh_checkpoints(last_event_id)
+                    ledger_handler.refresh_cache(last_event_id, previous_fingerprint)
+
+                if loaded or load_handler.rejected or once:
+                    report_load(load_handler, loaded)
+
+                if once:
+                    return
+
+                time.sleep(poll_interval)
+
+        except KeyboardInterrupt:
+            pass
 
 
 @interface.command()
-@click.argument("end_date", required=False, type=click.STRING)
+@click.argument("filename", type=click.Path(dir_okay=False, writable=True))
+@click.option(
+    "customer_id",
+    "--customer",
+    help="Export the events of a single customer. Required when the database holds more than one customer."
+)
 @click.pass_context
-def balances(ctx: Dict, end_date: str = None) -> None:
-    """Display balance statistics as of `end_date`."""
-    if end_date is None:
-        end_date = datetime.now().date()
+def export_binary(ctx: Dict, filename: str, customer_id: Optional[str] = None) -> None:
+    """Export the events to a binary file of fixed-width `DATE,TYPE,CENTS` records, for `balances --source`."""
+    if not os.path.exists(ctx.obj["DB_PATH"]):
+        click.echo(f"Database does not exist at {ctx.obj['DB_PATH']}, please create it using `create-db` command")
+        return
+
+    with sqlite3.connect(ctx.obj["DB_PATH"]) as connection:
+        SchemaRepository(connection).migrate()
 
+        try:
+            exported, rounded = EventFileHandler(filename).export_events(connection, customer_id)
+
+        except ValueError as error:
+            raise click.ClickException(f"{error}, please export each one of them with `--customer`.")
+
+    click.echo(f"Exported {exported} events to {filename}")
+    if rounded:
+        click.echo(f"Warning: {rounded} amounts were rounded to whole cents", err=True)
+
+
+@interface.command()
+@click.argument("filename", type=click.Path(exists=True, dir_okay=False, readable=True))
+@click.option(
+    "--checkpoint-interval",
+    default=LedgerHandler.DEFAULT_CHECKPOINT_INTERVAL,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="How many events are replayed between two ledger checkpoints."
+)
+@click.option(
+    "--batch-size",
+    default=LoadHandler.DEFAULT_BATCH_SIZE,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="How many events are inserted in each batch."
+)
+@click.option("--defer-index", is_flag=True, help="Drop the events date index during the load and build it at the end.")
+@click.option("--progress", is_flag=True, help="Report the load progress and throughput on stderr.")
+@click.pass_context
+def import_binary(
+    ctx: Dict, filename: str, checkpoint_interval: int, batch_size: int, defer_index: bool, progress: bool
+) -> None:
+    """Load events from a binary file written by `export-binary`, to the default customer."""
+    if not os.path.exists(ctx.obj["DB_PATH"]):
+        click.echo(f"Database does not exist at {ctx.obj['DB_PATH']}, please create it using `create-db` command")
+        return
+
+    try:
+        events = EventFileHandler(filename).get_events()
+
+    except ValueError as error:
+        raise click.ClickException(str(error))
+
+    with sqlite3.connect(ctx.obj["DB_PATH"]) as connection:
+        SchemaRepository(connection).migrate()
+        ledger_handler = LedgerHandler(connection, checkpoint_interval)
+        last_event_id = ledger_handler.event_repository.get_max_id()
+        previous_fingerprint = ledger_handler.event_repository.get_fingerprint()
+
+        load_handler = LoadHandler(connection, batch_size, defer_index)
+        try:
+            loaded = load_handler.load_encoded(events, echo_progress if progress else None)
+        finally:
+            ledger_handler.refresh_checkpoints(last_event_id)
+            ledger_handler.refresh_cache(last_event_id, previous_fingerprint)
+
+    click.echo(f"Loaded {loaded} events from {filename}")
+
+
+def get_period_end(current_date: date, every: str) -> date:
+    """Get the last day of the `every` period containing `current_date`."""
+    if every == "week":
+        return current_date + timedelta(days=6 - current_date.weekday())
+
+    if every == "month":
+        last_month = current_date.month
+    elif every == "quarter":
+        last_month = (current_date.month - 1) // 3 * 3 + 3
+    elif every == "year":
+        last_month = 12
     else:
-        end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+        return current_date
+
+    return date(current_date.year + last_month // 12, last_month % 12 + 1, 1) - timedelta(days=1)
+
+
+def get_period_end_dates(every: str, from_date: date, to_date: date) -> List[date]:
+    """Get the last day of each `every` period between `from_date` and `to_date`, both inclusive."""
+    period_end_dates = []
+    current_date = get_period_end(from_date, every)
+
+    while current_date <= to_date:
+        period_end_dates.append(current_date)
+        current_date = get_period_end(current_date + timedelta(days=1), every)
+
+    return period_end_dates
+
+
+def echo_instrumentation(ctx: Dict, instrumentation: InstrumentationHandler) -> None:
+    """Report the instrumentation on stderr in debug mode, and dump it as JSON if asked to."""
+    if ctx.obj["DEBUG"]:
+        for line in instrumentation.format_report():
+            click.echo(line, err=True)
+
+    if ctx.obj["METRICS_PATH"]:
+        with open(ctx.obj["METRICS_PATH"], "w") as metrics_f:
+            json.dump(instrumentation.to_dict(), metrics_f, indent=2)
+
+
+@interface.command()
+@click.argument("end_dates", nargs=-1, type=click.DateTime(formats=["%Y-%m-%d"]))
+@click.option(
+    "--engine",
+    default="decimal",
+    show_default=True,
+    type=click.Choice(LedgerHandler.ENGINES),
+    help="The arithmetic engine used to calculate the balances."
+)
+@click.option(
+    "--every",
+    type=click.Choice(PERIODS),
+    help="Display the balances as of the last day of every period between `--from` and `--to`."
+)
+@click.option("from_date", "--from", type=click.DateTime(formats=["%Y-%m-%d"]), help="The first day of the periods.")
+@click.option(
+    "to_date", "--to", type=click.DateTime(formats=["%Y-%m-%d"]), help="The last day of the periods. Defaults to today."
+)
+@click.option("--no-cache", is_flag=True, help="Calculate the balances without reading or writing the balances cache.")
+@click.option("--no-daemon", is_flag=True, help="Calculate the balances locally even if a `serve` daemon is running.")
+@click.option("customer_id", "--customer", help="Display the balances of a single customer.")
+@click.option("--by-customer", is_flag=True, help="Display the balances of every customer and the portfolio totals.")
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="How many processes calculate the customer balances. Defaults to one per CPU."
+)
+@click.option(
+    "--source",
+    type=click.Path(exists=True, dir_okay=False, readable=True),
+    help="Calculate the balances from a binary file written by `export-binary`, instead of the database."
+)
+@click.option(
+    "output_format",
+    "--format",
+    default="table",
+    show_default=True,
+    type=click.Choice(OutputHandler.FORMATS),
+    help="Display the balances as a table, or stream them as CSV or JSON Lines records."
+)
+@click.option("--open-only", is_flag=True, help="Display only the advances with a current balance.")
+@click.option("--limit", type=click.IntRange(min=0), help="Display at most LIMIT advances for each balance.")
+@click.pass_context
+def balances(
+    ctx: Dict,
+    end_dates: Tuple[datetime, ...],
+    engine: str = "decimal",
+    every: Optional[str] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    no_cache: bool = False,
+    no_daemon: bool = False,
+    customer_id: Optional[str] = None,
+    by_customer: bool = False,
+    workers: Optional[int] = None,
+    source: Optional[str] = None,
+    output_format: str = "table",
+    open_only: bool = False,
+    limit: Optional[int] = None
+) -> None:
+    """Display balance statistics as of `end_dates`, all computed in a single replay."""
+    if source is None and not os.path.exists(ctx.obj["DB_PATH"]):
+        click.echo(f"Database does not exist at {ctx.obj['DB_PATH']}, please create it using `create-db` command")
+        return
+
+    output_dates = {end_date.date() for end_date in end_dates}
+
+    if every is not None:
+        if from_date is None:
+            raise click.UsageError("`--every` requires `--from`.")
+
+        to_date = to_date.date() if to_date is not None else datetime.now().date()
+        output_dates.update(get_period_end_dates(every, from_date.date(), to_date))
+
+    elif from_date is not None or to_date is not None:
+        raise click.UsageError("`--from` and `--to` require `--every`.")
+
+    if source is not None and (customer_id is not None or by_customer):
+        raise click.UsageError("`--source` files do not keep the customers of the events.")
+
+    if by_customer and (open_only or limit is not None):
+        raise click.UsageError("`--by-customer` displays no advance, so it takes neither `--open-only` nor `--limit`.")
+
+    # WITHOUT ANY DATE, THE BALANCES ARE DISPLAYED AS OF TODAY
+    if not end_dates and every is None:
+        output_dates.add(datetime.now().date())
+
+    output_dates = sorted(output_dates)
+
+    instrumentation = None
+    if ctx.obj["DEBUG"] or ctx.obj["METRICS_PATH"] or ctx.obj["PROFILE_PATH"]:
+        instrumentation = InstrumentationHandler()
+
+    profiler = cProfile.Profile() if ctx.obj["PROFILE_PATH"] else None
+    if profiler is not None:
+        profiler.enable()
+
+    balance_entities = None
+    customer_balances = None
+
+    # THE ADVANCES ARE ONLY COPIED FOR EACH DATE WHEN ANY OF THEM IS DISPLAYED
+    with_advances = not by_customer and limit != 0
+    exclusive_end_dates = [output_date + timedelta(days=1) for output_date in output_dates]
+
+    # EACH CUSTOMER IS AN INDEPENDENT LEDGER, REPLAYED ON ITS OWN FROM ITS FIRST EVENT, SO THE BALANCES CACHE IS
+    # NEVER USED AND `--no-cache` CHANGES NOTHING
+    if customer_id is not None or by_customer:
+        with sqlite3.connect(ctx.obj["DB_PATH"]) as connection:
+            with record_stage(instrumentation, "migrate"):
+                SchemaRepository(connection).migrate()
+
+        with record_stage(instrumentation, "calculate customers"):
+            customer_balances = PortfolioHandler(ctx.obj["DB_PATH"], workers).get_balances(
+                exclusive_end_dates, engine, [customer_id] if customer_id is not None else None, with_advances
+            )
+
+        if not by_customer:
+            balance_entities = customer_balances[customer_id]
+
+    # THE EVENT FILE IS READ ON ITS OWN, WITHOUT THE DATABASE
+    if source is not None:
+        with record_stage(instrumentation, "calculate file"):
+            try:
+                balance_entities = EventFileHandler(source).get_balances(exclusive_end_dates, engine, with_advances)
+
+            except ValueError as error:
+                raise click.ClickException(str(error))
+
+    # THE DAEMON ANSWERS FROM ITS WARM STATE, IF IT IS RUNNING
+    if customer_balances is None and balance_entities is None and not no_daemon and not no_cache:
+        with record_stage(instrumentation, "daemon request"):
+            daemon_client = DaemonClient(ctx.obj["DAEMON_PATH"], ctx.obj["DB_PATH"])
+            balance_entities = daemon_client.get_balances(output_dates, engine, with_advances)
+
+    if customer_balances is None and balance_entities is None:
+        with sqlite3.connect(ctx.obj["DB_PATH"]) as connection:
+            with record_stage(instrumentation, "migrate"):
+                SchemaRepository(connection).migrate()
+
+            ledger_handler = LedgerHandler(
+                connection,
+                cache_size=0 if no_cache else LedgerHandler.DEFAULT_CACHE_SIZE,
+                instrumentation=instrumentation
+            )
+
+            try:
+                balance_entities = ledger_handler.get_balances(exclusive_end_dates, engine, with_advances)
+
+            except ValueError as error:
+                raise click.ClickException(f"{error}, please use `--customer` or `--by-customer`.")
+
+    output_handler = OutputHandler(lambda text: click.echo(text, nl=False), output_format, open_only, limit)
+
+    with record_stage(instrumentation, "render"):
+        if by_customer:
+            for index, output_date in enumerate(output_dates):
+                output_handler.write_heading(output_date, index)
+                output_handler.write_customer_balances(
+                    {customer: balances[index] for customer, balances in customer_balances.items()}, output_date
+                )
+
+        else:
+            # A SINGLE DATE ASKED FOR BY ITSELF IS DISPLAYED WITHOUT ANY HEADING
+            headings = len(output_dates) > 1 or every is not None
+
+            for index, (output_date, balance_entity) in enumerate(zip(output_dates, balance_entities)):
+                if headings:
+                    output_handler.write_heading(output_date, index)
+
+                output_handler.write_balance(balance_entity, output_date)
+
+        output_handler.flush()
+
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(ctx.obj["PROFILE_PATH"])
+
+    if instrumentation is not None:
+        instrumentation.count("advances rendered", output_handler.advances_written)
+        echo_instrumentation(ctx, instrumentation)
+
+
+def build_simulation_handler(ctx: Dict, events: Tuple[str, ...], lean: bool) -> SimulationHandler:
+    """Build a simulation handler over the ledger state right after its last event and the hypothetical events."""
+    try:
+        with sqlite3.connect(ctx.obj["DB_PATH"]) as connection:
+            SchemaRepository(connection).migrate()
+            balance_entity, checkpoint = LedgerHandler(connection).get_latest_balance(lean)
+
+        return SimulationHandler(
+            balance_entity, checkpoint.last_event_date if checkpoint is not None else None, csv.reader(events)
+        )
+
+    except (ValueError, csv.Error) as error:
+        raise click.ClickException(str(error))
+
 
-    end_date += timedelta(days=1)
+@interface.command()
+@click.argument("payoff_date", type=click.DateTime(formats=["%Y-%m-%d"]))
+@click.option(
+    "events",
+    "--event",
+    "-e",
+    multiple=True,
+    help="A hypothetical `TYPE,DATE,AMOUNT` event applied before the payoff. May be repeated."
+)
+@click.pass_context
+def quote(ctx: Dict, payoff_date: datetime, events: Tuple[str, ...] = ()) -> None:
+    """Display how much a payment on `PAYOFF_DATE` must be to pay off all the advances and the interest."""
+    if not os.path.exists(ctx.obj["DB_PATH"]):
+        click.echo(f"Database does not exist at {ctx.obj['DB_PATH']}, please create it using `create-db` command")
+        return
+
+    simulation_handler = build_simulation_handler(ctx, events, lean=True)
+
+    try:
+        balance_entity, payoff_amount = simulation_handler.get_payoff(payoff_date.date())
+
+    except ValueError as error:
+        raise click.ClickException(str(error))
+
+    click.echo(
+        f"Payoff Quote as of {payoff_date.date().isoformat()}:\n"
+        "----------------------------------------------------------\n"
+        f"Aggregate Advance Balance: {balance_entity.advance_balance:31.2f}\n"
+        f"Interest Payable Balance: {balance_entity.interest_payable_balance:32.2f}\n"
+        f"Balance Applicable to Future Advances: {balance_entity.payments_for_future:>19.2f}\n"
+        f"Payoff Amount: {payoff_amount:43.2f}"
+    )
+
+
+@interface.command()
+@click.argument("end_date", type=click.DateTime(formats=["%Y-%m-%d"]))
+@click.option(
+    "events",
+    "--event",
+    "-e",
+    multiple=True,
+    help="A hypothetical `TYPE,DATE,AMOUNT` event applied before the balance. May be repeated."
+)
+@click.option(
+    "output_format",
+    "--format",
+    default="table",
+    show_default=True,
+    type=click.Choice(OutputHandler.FORMATS),
+    help="The output format."
+)
+@click.option("--open-only", is_flag=True, help="Display only the advances with a current balance.")
+@click.option("--limit", type=click.IntRange(min=0), help="Display at most LIMIT advances.")
+@click.pass_context
+def simulate(
+    ctx: Dict,
+    end_date: datetime,
+    events: Tuple[str, ...] = (),
+    output_format: str = "table",
+    open_only: bool = False,
+    limit: Optional[int] = None
+) -> None:
+    """Display the balance as of `END_DATE` with hypothetical events applied, without storing them."""
+    if not os.path.exists(ctx.obj["DB_PATH"]):
+        click.echo(f"Database does not exist at {ctx.obj['DB_PATH']}, please create it using `create-db` command")
+        return
+
+    simulation_handler = build_simulation_handler(ctx, events, lean=open_only)
+
+    try:
+        balance_entity = simulation_handler.get_balance(end_date.date() + timedelta(days=1))
+
+    except ValueError as error:
+        raise click.ClickException(str(error))
+
+    output_handler = OutputHandler(lambda text: click.echo(text, nl=False), output_format, open_only, limit)
+    output_handler.write_balance(balance_entity, end_date.date())
+    output_handler.flush()
+
+
+@interface.command()
+@click.argument("advance_id", type=click.IntRange(min=1))
+@click.pass_context
+def advance_history(ctx: Dict, advance_id: int) -> None:
+    """Display how the advance `ADVANCE_ID` was paid down, event by event, from the allocations index."""
+    if not os.path.exists(ctx.obj["DB_PATH"]):
+        click.echo(f"Database does not exist at {ctx.obj['DB_PATH']}, please create it using `create-db` command")
+        return
+
+    with sqlite3.connect(ctx.obj["DB_PATH"]) as connection:
+        SchemaRepository(connection).migrate()
+
+        try:
+            advance_history = LedgerHandler(connection).get_advance_history(advance_id)
+
+        except ValueError as error:
+            raise click.ClickException(str(error))
+
+    if advance_history is None:
+        raise click.ClickException(f"There is no advance {advance_id}.")
+
+    advance, allocations = advance_history
+    click.echo(
+        "Advance:\n"
+        "----------------------------------------------------------\n"
+        f"{'Identifier':>10}{'Date':>11}{'Initial Amt':>17}{'Current Balance':>20}\n"
+        f"{advance.id:>10}{advance.event_date.isoformat():>11}"
+        f"{advance.initial_amount:>17.2f}{advance.current_balance:>20.2f}\n"
+        "\n"
+        "History:\n"
+        "----------------------------------------------------------\n"
+        f"{'Date':>10}{'Event':>10}{'Source':>10}{'Allocated':>14}{'Balance':>14}"
+    )
+
+    # THE FIRST ALLOCATION IS THE CREDIT FOR FUTURE ADVANCES THE ADVANCE TOOK WHEN IT WAS MADE
+    for index, (event_id, event_date, amount, balance) in enumerate(allocations):
+        click.echo(
+            f"{event_date.isoformat():>10}{event_id:>10}{'credit' if not index else 'payment':>10}"
+            f"{amount:>14.2f}{balance:>14.2f}"
+        )
+
+
+@interface.group()
+def report() -> None:
+    """Display reports read from the indexes kept up to date by every load."""
+
+
+@report.command()
+@click.option("from_month", "--from", type=click.DateTime(formats=["%Y-%m"]), help="The first month of the report.")
+@click.option("to_month", "--to", type=click.DateTime(formats=["%Y-%m"]), help="The last month of the report.")
+@click.option(
+    "output_format",
+    "--format",
+    default="table",
+    show_default=True,
+    type=click.Choice(OutputHandler.FORMATS),
+    help="Display the months as a table, or stream them as CSV or JSON Lines records."
+)
+@click.pass_context
+def monthly(
+    ctx: Dict,
+    from_month: Optional[datetime] = None,
+    to_month: Optional[datetime] = None,
+    output_format: str = "table"
+) -> None:
+    """Display the principal and the interest of every month, from the monthly rollups, until the last event."""
+    if not os.path.exists(ctx.obj["DB_PATH"]):
+        click.echo(f"Database does not exist at {ctx.obj['DB_PATH']}, please create it using `create-db` command")
+        return
 
-    # query events from database example
     with sqlite3.connect(ctx.obj["DB_PATH"]) as connection:
-        cursor = connection.cursor()
-        result = cursor.execute("select * from events order by date_created asc;")
-        events = result.fetchall()
-
-    handle_events = EventHandler(events, end_date)
-    balance_entity = handle_events.handle_all_events()
-
-    click.echo("Advances:")
-    click.echo("----------------------------------------------------------")
-    click.echo(f"{'Identifier':>10}{'Date':>11}{'Initial Amt':>17}{'Current Balance':>20}")
-
-    for advance in balance_entity.advances:
-        click.echo(f"{advance.id:>10}{datetime.strftime(advance.event_date, '%Y-%m-%d'):>11}{advance.initial_amount:>17.2f}{advance.current_balance:>20.2f}")
-
-    overall_advance_balance = balance_entity.advance_balance
-    overall_interest_payable_balance = balance_entity.interest_payable_balance
-    overall_interest_paid = balance_entity.interest_paid
-    overall_payments_for_future = balance_entity.payments_for_future
-
-    click.echo("\nSummary Statistics:")
-    click.echo("----------------------------------------------------------")
-    click.echo(f"Aggregate Advance Balance: {overall_advance_balance:31.2f}")
-    click.echo(f"Interest Payable Balance: {overall_interest_payable_balance:32.2f}")
-    click.echo(f"Total Interest Paid: {overall_interest_paid:37.2f}")
-    click.echo(f"Balance Applicable to Future Advances: {overall_payments_for_future:>19.2f}")
+        SchemaRepository(connection).migrate()
+
+        try:
+            rollups = LedgerHandler(connection).get_monthly_rollups(
+                from_month.date() if from_month is not None else None,
+                to_month.date() if to_month is not None else None
+            )
+
+        except ValueError as error:
+            raise click.ClickException(str(error))
+
+    fields = ("month", "principal_advanced", "principal_repaid", "interest_accrued", "interest_paid")
+
+    if output_format == "table":
+        click.echo(
+            "Monthly Report:\n"
+            "----------------------------------------------------------\n"
+            f"{'Month':>7}{'Advanced':>13}{'Repaid':>13}{'Accrued':>12}{'Int Paid':>13}"
+        )
+
+    elif output_format == "csv":
+        click.echo(",".join(fields))
+
+    for month, *amounts in rollups:
+        if output_format == "table":
+            click.echo(f"{month.strftime('%Y-%m'):>7}" + "".join(
+                f"{amount:>{width}.2f}" for amount, width in zip(amounts, (13, 13, 12, 13))
+            ))
+
+        else:
+            record = dict(zip(fields, (month.strftime("%Y-%m"), *(f"{amount:.2f}" for amount in amounts))))
+            click.echo(",".join(record.values()) if output_format == "csv" else json.dumps(record))
+
+
+@interface.command()
+@click.option("--host", default="127.0.0.1", show_default=True, help="The host to listen on.")
+@click.option("--port", default=0, show_default=True, type=click.IntRange(min=0), help="The port, 0 for any free one.")
+@click.pass_context
+def serve(ctx: Dict, host: str, port: int) -> None:
+    """Keep the ledger in memory and answer balance queries over localhost HTTP."""
+    if not os.path.exists(ctx.obj["DB_PATH"]):
+        click.echo(f"Database does not exist at {ctx.obj['DB_PATH']}, please create it using `create-db` command")
+        return
+
+    # A SECOND DAEMON WOULD TAKE OVER THE ADDRESS FILE OF THE ONE ALREADY RUNNING
+    address = DaemonClient.get_running_address(ctx.obj["DAEMON_PATH"])
+    if address is not None:
+        raise click.ClickException(
+            f"A daemon (pid {address['pid']}) is already serving the database at {address['url']}"
+        )
+
+    with sqlite3.connect(ctx.obj["DB_PATH"]) as connection:
+        SchemaRepository(connection).migrate()
+
+    # THE DAEMON ONLY READS THE DATABASE, SO IT NEVER HOLDS THE WRITE LOCK THE LOADS NEED
+    with contextlib.closing(
+        sqlite3.connect(f"file:{pathname2url(ctx.obj['DB_PATH'])}?mode=ro", uri=True)
+    ) as connection:
+        daemon_handler = DaemonHandler(connection)
+
+        try:
+            daemon_handler.refresh()
+
+        except ValueError as error:
+            raise click.ClickException(str(error))
+
+        server = daemon_handler.build_server(host, port)
+        url = f"http://{server.server_address[0]}:{server.server_address[1]}"
+        DaemonClient.write_address(ctx.obj["DAEMON_PATH"], url, daemon_handler.database_id)
+        click.echo(f"Serving ledger at {url}")
+
+        # STOPPING ON SIGTERM AS ON CTRL+C, SO THE ADDRESS FILE IS REMOVED, UNLESS ANOTHER DAEMON WROTE IT SINCE
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+        try:
+            server.serve_forever()
+
+        except KeyboardInterrupt:
+            pass
+
+        finally:
+            server.server_close()
+            DaemonClient.remove_address(ctx.obj["DAEMON_PATH"], url)
 
 
 if __name__ == "__main__":
@@ -1,3 +1,3 @@
 """"""
 
-from .handlers import EventHandler
+from .handlers import EventHandler, LedgerHandler, LoadHandler
@@ -14,7 +14,7 @@ class AdvanceEntityBuilder(EntityBuilder):
     Class to represent a Builder for all the Advance entities.
 
     This class implements the 'EntityBuilder' Interface, so it implements the following methods:
-    * build_entity(event_amount: Decimal, event_date: date) -> AdvanceEntity
+    * build_entity(event_amount: Decimal, event_date: date, event_id: int = 0) -> AdvanceEntity
 
     Attributes
     ----------
@@ -23,7 +23,18 @@ class AdvanceEntityBuilder(EntityBuilder):
     """
     advance_entities_index: int = 1
 
-    def build_entity(self, event_amount: Decimal, event_date: date) -> AdvanceEntity:
+    def __init__(self, advance_entities_index: int = 1) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        advance_entities_index : int
+            The index of the next advance entity to be built.
+        """
+        self.advance_entities_index = advance_entities_index
+
+    def build_entity(self, event_amount: Decimal, event_date: date, event_id: int = 0) -> AdvanceEntity:
         """
         Method to build (or create) an Advance Entity.
 
@@ -35,6 +46,9 @@ class AdvanceEntityBuilder(EntityBuilder):
         event_date : date
             The event date.
 
+        event_id : int
+            The id of the database event, if any.
+
         Returns
         --------
         AdvanceEntity
@@ -46,6 +60,7 @@ class AdvanceEntityBuilder(EntityBuilder):
             event_date=event_date,
             current_balance=event_amount
         )
+        event.event_id = event_id
 
         self.advance_entities_index += 1
 
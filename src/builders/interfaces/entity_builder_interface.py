@@ -14,11 +14,11 @@ class EntityBuilder(ABC):
     Interface to define that all classes that wants to build an entity
     must implement the following methods:
 
-    * build_entity(event_amount: Decimal, event_date: date) -> EventEntity
+    * build_entity(event_amount: Decimal, event_date: date, event_id: int = 0) -> EventEntity
     """
 
     @abstractmethod
-    def build_entity(self, event_amount: Decimal, event_date: date) -> EventEntity:
+    def build_entity(self, event_amount: Decimal, event_date: date, event_id: int = 0) -> EventEntity:
         """
         Abstract method to build (or create) an Event Entity.
 
@@ -30,6 +30,9 @@ class EntityBuilder(ABC):
         event_date : date
             The event date.
 
+        event_id : int
+            The id of the database event, if any.
+
         Returns
         --------
         EventEntity
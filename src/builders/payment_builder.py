@@ -14,10 +14,10 @@ class PaymentEntityBuilder(EntityBuilder):
     Class to represent a Builder for all the Payment entities.
 
     This class implements the 'EntityBuilder' Interface, so it implements the following methods:
-    * build_entity(event_amount: Decimal, event_date: date) -> PaymentEntity
+    * build_entity(event_amount: Decimal, event_date: date, event_id: int = 0) -> PaymentEntity
     """
 
-    def build_entity(self, event_amount: Decimal, event_date: date) -> PaymentEntity:
+    def build_entity(self, event_amount: Decimal, event_date: date, event_id: int = 0) -> PaymentEntity:
         """
         Method to build (or create) a Payment Entity.
 
@@ -29,6 +29,9 @@ class PaymentEntityBuilder(EntityBuilder):
         event_date : date
             The event date.
 
+        event_id : int
+            The id of the database event, if any.
+
         Returns
         --------
         PaymentEntity
@@ -38,5 +41,6 @@ class PaymentEntityBuilder(EntityBuilder):
             initial_amount=event_amount,
             event_date=event_date
         )
+        event.event_id = event_id
 
         return event
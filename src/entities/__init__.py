@@ -1,6 +1,8 @@
 """"""
 
-from .event_entity import EventEntity
+from .advance_store import AdvanceStore, AdvanceView
+from .event_entity import EventEntity, ADVANCE_TYPE_CODE, PAYMENT_TYPE_CODE, EVENT_TYPE_CODES
 from .advance_entity import AdvanceEntity
 from .payment_entity import PaymentEntity
 from .balance_entity import BalanceEntity
+from .checkpoint_entity import CheckpointEntity
@@ -58,4 +58,4 @@ class AdvanceEntity(EventEntity):
 
         balance_entity.advance_balance += self.current_balance
 
-        balance_entity.advances.append(self)
+        balance_entity.advances.append(self.event_date, self.initial_amount, self.current_balance)
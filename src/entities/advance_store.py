@@ -0,0 +1,317 @@
+"""
+Module containing the 'AdvanceStore' and 'AdvanceView' Classes.
+"""
+
+from array import array
+from collections import deque
+from datetime import date
+from decimal import Decimal
+from typing import Any, Deque, Dict, Iterator, Tuple
+
+
+class AdvanceView():
+    """
+    Class to represent a read-only view of a single advance kept in an 'AdvanceStore'.
+
+    Attributes
+    ----------
+    id : int
+        The advance id.
+
+    event_date : date
+        The advance date.
+
+    initial_amount : Decimal
+        The advance initial amount.
+
+    current_balance : Decimal
+        The current balance of the advance.
+    """
+    __slots__ = ("id", "event_date", "initial_amount", "current_balance")
+
+    id: int
+    event_date: date
+    initial_amount: Decimal
+    current_balance: Decimal
+
+    def __init__(self, id: int, event_date: date, initial_amount: Decimal, current_balance: Decimal) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        id : int
+            The advance id.
+
+        event_date : date
+            The advance date.
+
+        initial_amount : Decimal
+            The advance initial amount.
+
+        current_balance : Decimal
+            The current balance of the advance.
+        """
+        self.id = id
+        self.event_date = event_date
+        self.initial_amount = initial_amount
+        self.current_balance = current_balance
+
+    def __repr__(self) -> str:
+        """
+        Method to represent this view as a string.
+
+        Returns
+        --------
+        str
+            The string representation of this view.
+        """
+        return (
+            f"AdvanceView(id={self.id}, event_date={self.event_date!r}, "
+            f"initial_amount={self.initial_amount!r}, current_balance={self.current_balance!r})"
+        )
+
+
+class AdvanceStore():
+    """
+    Class to keep all the processed advances in compact parallel columns.
+
+    Advance ids are implicit: the advance at position `i` has the id `i + 1`. Since payments are applied to the
+    oldest advances first, every advance before the first open one has a zero balance, so only the balances
+    from the first open advance onwards are kept, in the `open_balances` deque.
+
+    A lean store, used to resume the ledger when the closed advances are not going to be displayed, does not
+    keep the columns of its first `offset` advances, which are all closed.
+
+    Attributes
+    ----------
+    offset : int
+        How many of the oldest advances are counted, but not kept in the columns.
+
+    dates : array
+        The date ordinal of each advance.
+
+    amounts : array
+        The initial amount of each advance, in cents.
+
+    inexact_amounts : Dict[int, Decimal]
+        The initial amount of the advances that are not a whole number of cents, by column position.
+
+    open_balances : Deque[Any]
+        The current balance of each advance from the first open one to the last one.
+    """
+    offset: int
+    dates: array
+    amounts: array
+    inexact_amounts: Dict[int, Decimal]
+    open_balances: Deque[Any]
+
+    def __init__(self, offset: int = 0) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        offset : int
+            How many of the oldest advances, all of them closed, are counted but not kept in the columns.
+        """
+        self.offset = offset
+        self.dates = array("i")
+        self.amounts = array("q")
+        self.inexact_amounts = {}
+        self.open_balances = deque()
+
+    def __len__(self) -> int:
+        """
+        Method to get how many advances are in the store.
+
+        Returns
+        --------
+        int
+            How many advances are in the store.
+        """
+        return self.offset + len(self.dates)
+
+    @property
+    def first_open_index(self) -> int:
+        """
+        Property with the position of the first open advance, or the store length if all of them are closed.
+
+        Returns
+        --------
+        int
+            The position of the first open advance.
+        """
+        return len(self) - len(self.open_balances)
+
+    def append_columns(self, date_ordinal: int, cents: int, current_balance: Any) -> None:
+        """
+        Method to append an advance given its raw column values.
+
+        Parameters
+        ----------
+        date_ordinal : int
+            The advance date ordinal.
+
+        cents : int
+            The advance initial amount, in cents.
+
+        current_balance : Any
+            The current balance of the advance.
+        """
+        self.dates.append(date_ordinal)
+        self.amounts.append(cents)
+
+        if current_balance or self.open_balances:
+            self.open_balances.append(current_balance)
+
+    def append(self, event_date: date, initial_amount: Decimal, current_balance: Decimal) -> None:
+        """
+        Method to append an advance.
+
+        Parameters
+        ----------
+        event_date : date
+            The advance date.
+
+        initial_amount : Decimal
+            The advance initial amount.
+
+        current_balance : Decimal
+            The current balance of the advance.
+        """
+        cents = initial_amount * 100
+        integral_cents = int(cents)
+
+        if cents != integral_cents:
+            self.inexact_amounts[len(self.dates)] = initial_amount
+
+        self.append_columns(event_date.toordinal(), integral_cents, current_balance)
+
+    def copy(self) -> "AdvanceStore":
+        """
+        Method to copy this store, so the copy is not changed by the advances processed afterwards.
+
+        Returns
+        --------
+        AdvanceStore
+            A copy of this store.
+        """
+        store = AdvanceStore(self.offset)
+        store.dates = array("i", self.dates)
+        store.amounts = array("q", self.amounts)
+        store.inexact_amounts = dict(self.inexact_amounts)
+        store.open_balances = deque(self.open_balances)
+
+        return store
+
+    def get_initial_amount(self, index: int) -> Decimal:
+        """
+        Method to get the initial amount of an advance.
+
+        Parameters
+        ----------
+        index : int
+            The advance column position.
+
+        Returns
+        --------
+        Decimal
+            The advance initial amount.
+        """
+        if index in self.inexact_amounts:
+            return self.inexact_amounts[index]
+
+        return Decimal(self.amounts[index]).scaleb(-2)
+
+    def get_current_balance(self, index: int) -> Any:
+        """
+        Method to get the current balance of an advance.
+
+        Parameters
+        ----------
+        index : int
+            The advance position.
+
+        Returns
+        --------
+        Any
+            The current balance of the advance.
+        """
+        first_open_index = self.first_open_index
+
+        if index < first_open_index:
+            return Decimal(0)
+
+        return self.open_balances[index - first_open_index]
+
+    def rows(self, open_only: bool = False) -> Iterator[Tuple[int, date, Decimal, Any]]:
+        """
+        Method to iterate over the advances kept in the columns as plain tuples, without building any view.
+
+        Parameters
+        ----------
+        open_only : bool
+            Whether only the advances with a current balance are returned. The closed advances before the first
+            open one are skipped without being visited.
+
+        Yields
+        -------
+        Tuple[int, date, Decimal, Any]
+            The (id, event_date, initial_amount, current_balance) of each advance.
+        """
+        first_open_index = self.first_open_index - self.offset
+        open_balances = iter(self.open_balances)
+        zero = Decimal(0)
+
+        for index in range(first_open_index if open_only else 0, len(self.dates)):
+            current_balance = zero if index < first_open_index else next(open_balances)
+
+            if open_only and not current_balance:
+                continue
+
+            yield (
+                self.offset + index + 1,
+                date.fromordinal(self.dates[index]),
+                self.get_initial_amount(index),
+                current_balance
+            )
+
+    def __getitem__(self, index: int) -> AdvanceView:
+        """
+        Method to get a view of an advance.
+
+        Parameters
+        ----------
+        index : int
+            The advance position.
+
+        Returns
+        --------
+        AdvanceView
+            A view of the advance.
+        """
+        if index < 0:
+            index += len(self)
+
+        if not self.offset <= index < len(self):
+            raise IndexError("advance index out of range")
+
+        return AdvanceView(
+            index + 1,
+            date.fromordinal(self.dates[index - self.offset]),
+            self.get_initial_amount(index - self.offset),
+            self.get_current_balance(index)
+        )
+
+    def __iter__(self) -> Iterator[AdvanceView]:
+        """
+        Method to iterate over views of all the advances.
+
+        Yields
+        -------
+        AdvanceView
+            A view of each advance.
+        """
+        for row in self.rows():
+            yield AdvanceView(*row)
@@ -2,13 +2,13 @@
 Module containing the 'BalanceEntity' Class.
 """
 
-# TYPING IMPORTS
-from typing import List
-from . import AdvanceEntity
-
-# MODULE IMPORTS
+from array import array
+from collections import deque
 from decimal import Decimal
 from dataclasses import dataclass, field
+from typing import Any, Dict
+
+from .advance_store import AdvanceStore
 
 
 @dataclass
@@ -30,12 +30,71 @@ class BalanceEntity:
     payments_for_future : Decimal
         The credit for future advances.
 
-    advances : List[AdvanceEntity]
-        A list containing all the processed advance entities.
+    advances : AdvanceStore
+        A compact store containing all the processed advances, including the balances of the open ones.
     """
-    advance_balance = Decimal(0)
-    interest_payable_balance = Decimal(0)
-    interest_paid = Decimal(0)
-    payments_for_future = Decimal(0)
+    advance_balance: Decimal = Decimal(0)
+    interest_payable_balance: Decimal = Decimal(0)
+    interest_paid: Decimal = Decimal(0)
+    payments_for_future: Decimal = Decimal(0)
+
+    advances: AdvanceStore = field(default_factory=AdvanceStore)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Method to convert this balance to a JSON serializable dictionary.
+
+        The advances are converted column by column, as date ordinals and amounts in cents, and Decimal values
+        are converted to strings, so the balance is rebuilt with exactly the same values.
+
+        Returns
+        --------
+        Dict[str, Any]
+            The balance summary and the advance store columns.
+        """
+        advances = self.advances
+
+        return {
+            "advance_balance": str(self.advance_balance),
+            "interest_payable_balance": str(self.interest_payable_balance),
+            "interest_paid": str(self.interest_paid),
+            "payments_for_future": str(self.payments_for_future),
+            "advances": {
+                "offset": advances.offset,
+                "dates": advances.dates.tolist(),
+                "amounts": advances.amounts.tolist(),
+                "inexact_amounts": [[index, str(amount)] for index, amount in advances.inexact_amounts.items()],
+                "open_balances": [str(balance) for balance in advances.open_balances],
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BalanceEntity":
+        """
+        Method to build a balance from a dictionary built by the `to_dict` Method.
+
+        Parameters
+        ----------
+        data : Dict[str, Any]
+            The balance dictionary.
+
+        Returns
+        --------
+        BalanceEntity
+            The rebuilt balance.
+        """
+        columns = data["advances"]
+
+        advances = AdvanceStore(columns["offset"])
+        advances.dates = array("i", columns["dates"])
+        advances.amounts = array("q", columns["amounts"])
+        advances.inexact_amounts = {index: Decimal(amount) for index, amount in columns["inexact_amounts"]}
+        advances.open_balances = deque(Decimal(balance) for balance in columns["open_balances"])
 
-    advances: List[AdvanceEntity] = field(default_factory=list)
+        return cls(
+            advance_balance=Decimal(data["advance_balance"]),
+            interest_payable_balance=Decimal(data["interest_payable_balance"]),
+            interest_paid=Decimal(data["interest_paid"]),
+            payments_for_future=Decimal(data["payments_for_future"]),
+            advances=advances
+        )
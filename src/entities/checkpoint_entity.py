@@ -0,0 +1,54 @@
+"""
+Module containing the 'CheckpointEntity' Class.
+"""
+
+from datetime import date
+from decimal import Decimal
+from typing import Dict
+from dataclasses import dataclass, field
+
+
+@dataclass
+class CheckpointEntity:
+    """
+    Class to represent a snapshot of the ledger balances right after an event was processed.
+
+    The interest payable balance of a checkpoint is accrued up to (and not including) the last event date,
+    so the replay can be resumed from it as if that event had just been processed.
+
+    Attributes
+    ----------
+    last_event_id : int
+        The id of the last processed event.
+
+    last_event_date : date
+        The date of the last processed event.
+
+    advance_count : int
+        How many advances were processed until the last event.
+
+    advance_balance : Decimal
+        The total advance balance.
+
+    interest_payable_balance : Decimal
+        The total interest balance amount.
+
+    interest_paid : Decimal
+        The total amount of interest that was paid.
+
+    payments_for_future : Decimal
+        The credit for future advances.
+
+    open_advances : Dict[int, Decimal]
+        The current balance of every advance that was not paid off yet, by advance id.
+    """
+    last_event_id: int
+    last_event_date: date
+    advance_count: int
+
+    advance_balance: Decimal
+    interest_payable_balance: Decimal
+    interest_paid: Decimal
+    payments_for_future: Decimal
+
+    open_advances: Dict[int, Decimal] = field(default_factory=dict)
@@ -12,10 +12,16 @@ if TYPE_CHECKING:
     from .balance_entity import BalanceEntity
 
 # MODULE IMPORTS
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 
 
+# CODES OF THE EVENT TYPES, AS STORED IN THE DATABASE
+ADVANCE_TYPE_CODE = 1
+PAYMENT_TYPE_CODE = 2
+EVENT_TYPE_CODES = {"advance": ADVANCE_TYPE_CODE, "payment": PAYMENT_TYPE_CODE}
+
+
 @dataclass
 class EventEntity(ABC):
     """
@@ -33,10 +39,15 @@ class EventEntity(ABC):
 
     event_date : date
         The entity date.
+
+    event_id : int
+        The id of the database event this entity was built from.
     """
     initial_amount: Decimal
     event_date: date
 
+    event_id: int = field(default=0, init=False, compare=False)
+
     @abstractmethod
     def process_entity(self, balance_entity: BalanceEntity) -> None:
         """"""
@@ -2,8 +2,9 @@
 Module containing the 'PaymentEntity' Class.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from decimal import Decimal
+from typing import List, Tuple
 
 from .event_entity import EventEntity
 from .balance_entity import BalanceEntity
@@ -18,7 +19,17 @@ class PaymentEntity(EventEntity):
     and implements the following methods:
 
     * process_entity(balance_entity: BalanceEntity) -> None
+
+    Attributes
+    ----------
+    advances_scanned : int
+        How many open advances were visited while this payment was processed.
+
+    allocations : List[Tuple[int, Decimal]]
+        The id of each advance this payment paid down and the amount allocated to it.
     """
+    advances_scanned: int = field(default=0, init=False, compare=False)
+    allocations: List[Tuple[int, Decimal]] = field(default_factory=list, init=False, compare=False)
 
     def process_entity(self, balance_entity: BalanceEntity) -> None:
         """
@@ -49,6 +60,9 @@ class PaymentEntity(EventEntity):
         """
         Private Method to reduce the total advance balance.
 
+        The payment is applied to the open advances from the oldest to the newest one, so each call
+        only touches the advances it actually pays down.
+
         Parameters
         ----------
         balance_entity : BalanceEntity
@@ -62,17 +76,37 @@ class PaymentEntity(EventEntity):
         Decimal
             The amount left over after paying all advances.
         """
-        for entity in balance_entity.advances:
-            if current_payment_value <= entity.current_balance:
-                # PAYING ONLY A PORTION OF THE ADVANCE
-                entity.current_balance -= current_payment_value
+        open_balances = balance_entity.advances.open_balances
+        advance_id = balance_entity.advances.first_open_index + 1
+
+        # ONLY THE OPEN ADVANCES ARE VISITED, FROM THE OLDEST TO THE NEWEST ONE
+        while open_balances:
+            current_balance = open_balances[0]
+            self.advances_scanned += 1
+
+            if current_payment_value <= current_balance:
+                # PAYING ONLY A PORTION OF THE ADVANCE, IF ANYTHING WAS LEFT AFTER THE INTEREST
+                if current_payment_value:
+                    self.allocations.append((advance_id, current_payment_value))
+
+                current_balance -= current_payment_value
                 balance_entity.advance_balance -= current_payment_value
+
+                if current_balance:
+                    open_balances[0] = current_balance
+                else:
+                    open_balances.popleft()
+
                 return Decimal(0)
 
-            # PAYING THE ADVANCE IN TOTALLY
-            current_payment_value -= entity.current_balance
-            balance_entity.advance_balance -= entity.current_balance
-            entity.current_balance = Decimal(0)
+            # PAYING THE ADVANCE IN TOTALLY, IF ANYTHING WAS LEFT OF IT
+            if current_balance:
+                self.allocations.append((advance_id, current_balance))
+
+            current_payment_value -= current_balance
+            balance_entity.advance_balance -= current_balance
+            open_balances.popleft()
+            advance_id += 1
 
             if balance_entity.advance_balance < 0:
                 balance_entity.advance_balance = Decimal(0)
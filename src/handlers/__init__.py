@@ -1,3 +1,16 @@
 """"""
 
-from .event_handler import EventHandler
\ No newline at end of file
+from .event_handler import EventHandler
+from .checkpoint_handler import CheckpointHandler
+from .allocation_handler import AllocationHandler
+from .rollup_handler import RollupHandler
+from .ledger_handler import LedgerHandler
+from .load_handler import LoadHandler
+from .instrumentation_handler import InstrumentationHandler
+from .daemon_handler import DaemonHandler
+from .daemon_client import DaemonClient
+from .async_query_handler import AsyncQueryHandler, ConnectionPool
+from .portfolio_handler import PortfolioHandler
+from .event_file_handler import EventFileHandler
+from .output_handler import OutputHandler
+from .simulation_handler import SimulationHandler
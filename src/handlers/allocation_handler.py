@@ -0,0 +1,93 @@
+"""
+Module containing the 'AllocationHandler' Class.
+"""
+
+# TYPING IMPORTS
+from __future__ import annotations
+from decimal import Decimal
+from typing import List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..repositories import AllocationRepository
+
+# MODULE IMPORTS
+from ..entities import AdvanceEntity, EventEntity, BalanceEntity, PaymentEntity
+from ..use_cases import LedgerObserver
+
+
+class AllocationHandler(LedgerObserver):
+    """
+    Class to save the amounts each event allocated to each advance while the ledger is replayed.
+
+    This class implements the 'LedgerObserver' Interface, so it implements the following methods:
+    * on_entity_processed(entity: EventEntity, balance_entity: BalanceEntity) -> None
+
+    Attributes
+    ----------
+    allocation_repository : AllocationRepository
+        A reference to store the allocations.
+
+    batch_size : int
+        How many allocations are saved at once.
+
+    pending : List[Tuple[int, int, int, Decimal]]
+        The (advance_id, event_date, event_id, amount) of the allocations that were not saved yet.
+    """
+    allocation_repository: AllocationRepository
+    batch_size: int
+
+    pending: List[Tuple[int, int, int, Decimal]]
+
+    DEFAULT_BATCH_SIZE = 10000
+
+    def __init__(self, allocation_repository: AllocationRepository, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        allocation_repository : AllocationRepository
+            A reference to store the allocations.
+
+        batch_size : int
+            How many allocations are saved at once.
+        """
+        self.allocation_repository = allocation_repository
+        self.batch_size = batch_size
+
+        self.pending = []
+
+    def on_entity_processed(self, entity: EventEntity, balance_entity: BalanceEntity) -> None:
+        """
+        Method to keep the allocations of the processed entity, saving them once there are enough of them.
+
+        Parameters
+        ----------
+        entity : EventEntity
+            A reference to the processed entity.
+
+        balance_entity : BalanceEntity
+            Entity containing all the current balances.
+        """
+        event_date = entity.event_date.toordinal()
+
+        # THE CREDIT AN ADVANCE TOOK WHEN IT WAS MADE IS ITS OWN ALLOCATION
+        if isinstance(entity, AdvanceEntity):
+            self.pending.append(
+                (entity.id, event_date, entity.event_id, entity.initial_amount - entity.current_balance)
+            )
+
+        elif isinstance(entity, PaymentEntity):
+            for advance_id, amount in entity.allocations:
+                self.pending.append((advance_id, event_date, entity.event_id, amount))
+
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Method to save all the allocations that were not saved yet.
+        """
+        if self.pending:
+            self.allocation_repository.save_allocations(self.pending)
+            self.pending = []
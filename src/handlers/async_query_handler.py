@@ -0,0 +1,260 @@
+"""
+Module containing the 'AsyncQueryHandler' and 'ConnectionPool' Classes.
+"""
+
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.request import pathname2url
+
+from .ledger_handler import LedgerHandler
+from ..entities import BalanceEntity
+from ..repositories import SchemaRepository
+
+
+class ConnectionPool():
+    """
+    Class to reuse read-only connections to a database.
+
+    The database is switched to WAL mode once, when the pool is created, so the readers never block a `load`
+    writing to it, nor the other way around. Connections are only created when every other one is in use.
+
+    Attributes
+    ----------
+    db_path : str
+        The path of the database.
+
+    connections : queue.SimpleQueue
+        The connections that are not in use.
+    """
+    db_path: str
+    connections: queue.SimpleQueue
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        db_path : str
+            The path of the database.
+        """
+        self.db_path = db_path
+        self.connections = queue.SimpleQueue()
+
+        # THE JOURNAL MODE IS PERSISTENT, BUT READ-ONLY CONNECTIONS CAN NOT CHANGE IT NOR MIGRATE THE SCHEMA
+        with closing(sqlite3.connect(db_path)) as connection:
+            SchemaRepository(connection).migrate()
+            connection.execute("pragma journal_mode=wal;")
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Method to borrow a connection inside a `with` block.
+
+        Yields
+        -------
+        sqlite3.Connection
+            A read-only connection, used by a single thread at once.
+        """
+        try:
+            connection = self.connections.get_nowait()
+
+        except queue.Empty:
+            connection = sqlite3.connect(
+                f"file:{pathname2url(self.db_path)}?mode=ro", uri=True, check_same_thread=False
+            )
+
+        try:
+            yield connection
+
+        finally:
+            self.connections.put(connection)
+
+    def close(self) -> None:
+        """
+        Method to close all the connections that are not in use.
+        """
+        while True:
+            try:
+                self.connections.get_nowait().close()
+
+            except queue.Empty:
+                return
+
+
+class AsyncQueryHandler():
+    """
+    Class to answer many concurrent balance queries, over any number of databases, from an asyncio event loop.
+
+    Each query is calculated by a 'LedgerHandler' in a read-only mode, in a pool of worker threads, so the event
+    loop is never blocked. Identical queries that arrive while one of them is being calculated wait for the same
+    calculation, so ten simultaneous queries for the same date cost a single one. The coalesced queries share the
+    returned balances, which must not be changed.
+
+    Attributes
+    ----------
+    executor : ThreadPoolExecutor
+        The worker threads that calculate the balances.
+
+    pools : Dict[str, ConnectionPool]
+        The connection pool of each database, by absolute path.
+
+    pools_lock : threading.Lock
+        The lock the worker threads hold to create the connection pools.
+
+    in_flight : Dict[Tuple[str, Tuple[date, ...], str], asyncio.Future]
+        The calculations in progress, by database path, end dates and engine.
+
+    calculations : int
+        How many calculations were dispatched to the worker threads.
+    """
+    executor: ThreadPoolExecutor
+    pools: Dict[str, ConnectionPool]
+    pools_lock: threading.Lock
+    in_flight: Dict[Tuple[str, Tuple[date, ...], str], asyncio.Future]
+    calculations: int
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        max_workers : Optional[int]
+            How many worker threads calculate the balances. If None, the `ThreadPoolExecutor` default is used.
+        """
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="ledger-query")
+        self.pools = {}
+        self.pools_lock = threading.Lock()
+        self.in_flight = {}
+        self.calculations = 0
+
+    async def __aenter__(self) -> "AsyncQueryHandler":
+        """
+        Method to use this handler in an `async with` block.
+
+        Returns
+        --------
+        AsyncQueryHandler
+            This handler.
+        """
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """
+        Method to close this handler at the end of an `async with` block.
+        """
+        self.close()
+
+    def __get_pool(self, db_path: str) -> ConnectionPool:
+        """
+        Private Method to get the connection pool of a database, creating it on the first query.
+
+        Parameters
+        ----------
+        db_path : str
+            The absolute path of the database.
+
+        Returns
+        --------
+        ConnectionPool
+            The connection pool of the database.
+        """
+        with self.pools_lock:
+            if db_path not in self.pools:
+                self.pools[db_path] = ConnectionPool(db_path)
+
+            return self.pools[db_path]
+
+    def __calculate_balances(self, db_path: str, end_dates: Tuple[date, ...], engine: str) -> List[BalanceEntity]:
+        """
+        Private Method to calculate the balances in a worker thread.
+
+        Parameters
+        ----------
+        db_path : str
+            The absolute path of the database.
+
+        end_dates : Tuple[date, ...]
+            The (exclusive) end dates, in ascending order.
+
+        engine : str
+            The name of the engine used to calculate the balances.
+
+        Returns
+        --------
+        List[BalanceEntity]
+            An entity containing all the events balance as of each end date.
+        """
+        with self.__get_pool(db_path).connection() as connection:
+            return LedgerHandler(connection, read_only=True).get_balances(list(end_dates), engine)
+
+    async def get_balances(self, db_path: str, end_dates: List[date], engine: str = "decimal") -> List[BalanceEntity]:
+        """
+        Method to get the ledger balance of a database as of each one of the end dates.
+
+        Parameters
+        ----------
+        db_path : str
+            The path of the database.
+
+        end_dates : List[date]
+            The (exclusive) end dates, in ascending order.
+
+        engine : str
+            The name of the engine used to calculate the balances.
+
+        Returns
+        --------
+        List[BalanceEntity]
+            An entity containing all the events balance as of each end date.
+        """
+        key = (os.path.abspath(db_path), tuple(end_dates), engine)
+        future = self.in_flight.get(key)
+
+        if future is None:
+            self.calculations += 1
+            future = asyncio.get_running_loop().run_in_executor(self.executor, self.__calculate_balances, *key)
+            self.in_flight[key] = future
+            future.add_done_callback(lambda _: self.in_flight.pop(key, None))
+
+        # A CANCELLED QUERY DOES NOT CANCEL THE CALCULATION THE OTHER ONES ARE WAITING FOR
+        return await asyncio.shield(future)
+
+    async def get_balance(self, db_path: str, end_date: date, engine: str = "decimal") -> BalanceEntity:
+        """
+        Method to get the ledger balance of a database as of the end date.
+
+        Parameters
+        ----------
+        db_path : str
+            The path of the database.
+
+        end_date : date
+            The (exclusive) end date.
+
+        engine : str
+            The name of the engine used to calculate the balance.
+
+        Returns
+        --------
+        BalanceEntity
+            An entity containing all the events balance.
+        """
+        return (await self.get_balances(db_path, [end_date], engine))[0]
+
+    def close(self) -> None:
+        """
+        Method to wait for the calculations in progress and close all the connections.
+        """
+        self.executor.shutdown(wait=True)
+
+        for pool in self.pools.values():
+            pool.close()
@@ -0,0 +1,152 @@
+"""
+Module containing the 'CheckpointHandler' Class.
+"""
+
+# TYPING IMPORTS
+from __future__ import annotations
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..repositories import CheckpointRepository
+
+# MODULE IMPORTS
+from ..entities import EventEntity, BalanceEntity, CheckpointEntity
+from ..use_cases import LedgerObserver
+
+
+class CheckpointHandler(LedgerObserver):
+    """
+    Class to periodically save checkpoints while the ledger is replayed.
+
+    This class implements the 'LedgerObserver' Interface, so it implements the following methods:
+    * on_entity_processed(entity: EventEntity, balance_entity: BalanceEntity) -> None
+
+    Attributes
+    ----------
+    checkpoint_repository : CheckpointRepository
+        A reference to store the checkpoints.
+
+    checkpoint_interval : int
+        How many entities are processed between two checkpoints.
+
+    processed_entities : int
+        How many entities were processed since the last checkpoint.
+
+    last_entity : Optional[EventEntity]
+        The last processed entity.
+
+    last_checkpoint : Optional[CheckpointEntity]
+        The last saved checkpoint.
+    """
+    checkpoint_repository: CheckpointRepository
+    checkpoint_interval: int
+
+    processed_entities: int
+    last_entity: Optional[EventEntity]
+    last_checkpoint: Optional[CheckpointEntity]
+
+    def __init__(self, checkpoint_repository: CheckpointRepository, checkpoint_interval: int) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        checkpoint_repository : CheckpointRepository
+            A reference to store the checkpoints.
+
+        checkpoint_interval : int
+            How many entities are processed between two checkpoints.
+        """
+        self.checkpoint_repository = checkpoint_repository
+        self.checkpoint_interval = checkpoint_interval
+
+        self.processed_entities = 0
+        self.last_entity = None
+        self.last_checkpoint = None
+
+    @staticmethod
+    def build_checkpoint(entity: EventEntity, balance_entity: BalanceEntity) -> CheckpointEntity:
+        """
+        Method to build a checkpoint of the balance right after the given entity was processed.
+
+        Parameters
+        ----------
+        entity : EventEntity
+            A reference to the last processed entity.
+
+        balance_entity : BalanceEntity
+            Entity containing all the current balances.
+
+        Returns
+        --------
+        CheckpointEntity
+            The built checkpoint.
+        """
+        advances = balance_entity.advances
+        open_advances = {
+            advances.first_open_index + position + 1: current_balance
+            for position, current_balance in enumerate(advances.open_balances)
+        }
+
+        return CheckpointEntity(
+            last_event_id=entity.event_id,
+            last_event_date=entity.event_date,
+            advance_count=len(balance_entity.advances),
+            advance_balance=balance_entity.advance_balance,
+            interest_payable_balance=balance_entity.interest_payable_balance,
+            interest_paid=balance_entity.interest_paid,
+            payments_for_future=balance_entity.payments_for_future,
+            open_advances=open_advances
+        )
+
+    def on_entity_processed(self, entity: EventEntity, balance_entity: BalanceEntity) -> None:
+        """
+        Method to save a checkpoint every `checkpoint_interval` processed entities.
+
+        Parameters
+        ----------
+        entity : EventEntity
+            A reference to the processed entity.
+
+        balance_entity : BalanceEntity
+            Entity containing all the current balances.
+        """
+        self.processed_entities += 1
+        self.last_entity = entity
+
+        if self.processed_entities < self.checkpoint_interval:
+            return
+
+        self.save_checkpoint(entity, balance_entity)
+
+    def save_checkpoint(self, entity: EventEntity, balance_entity: BalanceEntity) -> None:
+        """
+        Method to save a checkpoint of the balance right after the given entity was processed.
+
+        Parameters
+        ----------
+        entity : EventEntity
+            A reference to the last processed entity.
+
+        balance_entity : BalanceEntity
+            Entity containing all the current balances.
+        """
+        self.last_checkpoint = self.build_checkpoint(entity, balance_entity)
+        self.checkpoint_repository.save_checkpoint(self.last_checkpoint)
+        self.processed_entities = 0
+
+    def flush(self, balance_entity: BalanceEntity) -> None:
+        """
+        Method to save a checkpoint of the last processed entity, if it was not saved yet.
+
+        Must be called before any interest is accrued past the last processed entity date.
+
+        Parameters
+        ----------
+        balance_entity : BalanceEntity
+            Entity containing all the current balances.
+        """
+        if self.last_entity is None or self.processed_entities == 0:
+            return
+
+        self.save_checkpoint(self.last_entity, balance_entity)
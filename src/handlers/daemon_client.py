@@ -0,0 +1,232 @@
+"""
+Module containing the 'DaemonClient' Class.
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import date
+from typing import Any, Dict, List, Optional
+from urllib.error import URLError
+from urllib.parse import urlencode
+from urllib.request import pathname2url, urlopen
+
+from ..entities import BalanceEntity
+from ..repositories import SchemaRepository
+
+
+class DaemonClient():
+    """
+    Class to query the balances from a running ledger daemon.
+
+    The daemon writes its URL to an address file next to the database while it is running, so the client
+    only talks to it when that file exists. Any failure to reach the daemon is reported as a missing answer,
+    so the caller can calculate the balances on its own instead.
+
+    The address file and the answers of the daemon carry the id of the database it serves, so a daemon still
+    serving a database that was dropped and created again at the same path is not asked at all.
+
+    Attributes
+    ----------
+    address_path : str
+        The path of the file the daemon writes its URL to.
+
+    database_path : str
+        The path of the database the balances are queried from.
+
+    timeout : float
+        How many seconds to wait for the daemon to answer.
+    """
+    address_path: str
+    database_path: str
+    timeout: float
+
+    DEFAULT_TIMEOUT = 60.0
+
+    def __init__(self, address_path: str, database_path: str, timeout: float = DEFAULT_TIMEOUT) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        address_path : str
+            The path of the file the daemon writes its URL to.
+
+        database_path : str
+            The path of the database the balances are queried from.
+
+        timeout : float
+            How many seconds to wait for the daemon to answer.
+        """
+        self.address_path = address_path
+        self.database_path = database_path
+        self.timeout = timeout
+
+    @staticmethod
+    def write_address(address_path: str, url: str, database_id: Optional[str]) -> None:
+        """
+        Method to write the daemon URL to the address file.
+
+        Parameters
+        ----------
+        address_path : str
+            The path of the address file.
+
+        url : str
+            The daemon URL.
+
+        database_id : Optional[str]
+            The id of the database the daemon serves.
+        """
+        with open(address_path, "w") as address_f:
+            json.dump({"url": url, "pid": os.getpid(), "database_id": database_id}, address_f)
+
+    @staticmethod
+    def remove_address(address_path: str, url: str) -> None:
+        """
+        Method to remove the address file, if it was written by this process for the given URL.
+
+        The file of another daemon serving the same database is left in place.
+
+        Parameters
+        ----------
+        address_path : str
+            The path of the address file.
+
+        url : str
+            The daemon URL.
+        """
+        address = DaemonClient.read_address(address_path)
+
+        if address is None or address.get("pid") != os.getpid() or address.get("url") != url:
+            return
+
+        try:
+            os.unlink(address_path)
+
+        except OSError:
+            pass
+
+    @staticmethod
+    def read_address(address_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Method to read the address file.
+
+        Parameters
+        ----------
+        address_path : str
+            The path of the address file.
+
+        Returns
+        --------
+        Optional[Dict[str, Any]]
+            The URL, the process id and the database id of the daemon, or None if there is no address file.
+        """
+        try:
+            with open(address_path) as address_f:
+                address = json.load(address_f)
+
+        except (OSError, ValueError):
+            return None
+
+        return address if isinstance(address, dict) and "url" in address else None
+
+    @staticmethod
+    def get_running_address(address_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Method to read the address file, if the daemon that wrote it is still running.
+
+        Parameters
+        ----------
+        address_path : str
+            The path of the address file.
+
+        Returns
+        --------
+        Optional[Dict[str, Any]]
+            The URL, the process id and the database id of the daemon, or None if no daemon is running.
+        """
+        address = DaemonClient.read_address(address_path)
+        pid = address.get("pid") if address is not None else None
+
+        if not isinstance(pid, int) or pid <= 0:
+            return None
+
+        try:
+            os.kill(pid, 0)
+
+        # THE PROCESS EXISTS, BUT BELONGS TO ANOTHER USER
+        except PermissionError:
+            return address
+
+        except OSError:
+            return None
+
+        return address
+
+    def get_database_id(self) -> Optional[str]:
+        """
+        Method to get the id of the database at the database path, without creating it.
+
+        Returns
+        --------
+        Optional[str]
+            The database id, or None if there is no migrated database at the path.
+        """
+        try:
+            with closing(
+                sqlite3.connect(f"file:{pathname2url(self.database_path)}?mode=ro", uri=True)
+            ) as connection:
+                return SchemaRepository(connection).get_database_id()
+
+        except sqlite3.Error:
+            return None
+
+    def get_balances(
+        self, output_dates: List[date], engine: str = "decimal", with_advances: bool = True
+    ) -> Optional[List[BalanceEntity]]:
+        """
+        Method to query the ledger balance as of the end of each one of the dates.
+
+        Parameters
+        ----------
+        output_dates : List[date]
+            The (inclusive) dates, in ascending order.
+
+        engine : str
+            The name of the engine used to calculate the balances.
+
+        with_advances : bool
+            Whether the balances keep a copy of the advances, or only the summary totals.
+
+        Returns
+        --------
+        Optional[List[BalanceEntity]]
+            An entity containing all the events balance as of each date, or None if the daemon could not answer.
+        """
+        address = self.read_address(self.address_path)
+        if address is None:
+            return None
+
+        # THE DAEMON MAY STILL BE SERVING A DATABASE THAT IS NO LONGER AT THE PATH
+        database_id = self.get_database_id()
+        if database_id is None or address.get("database_id") != database_id:
+            return None
+
+        query = urlencode(
+            [("date", output_date.isoformat()) for output_date in output_dates]
+            + [("engine", engine), ("advances", "1" if with_advances else "0")]
+        )
+
+        try:
+            with urlopen(f"{address['url']}/balances?{query}", timeout=self.timeout) as response:
+                content = json.load(response)
+
+        except (OSError, URLError, ValueError):
+            return None
+
+        if content.get("database_id") != database_id:
+            return None
+
+        return [BalanceEntity.from_dict(balance) for balance in content["balances"]]
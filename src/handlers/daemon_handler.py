@@ -0,0 +1,316 @@
+"""
+Module containing the 'DaemonHandler' Class.
+"""
+
+import json
+import sqlite3
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from .event_handler import EventHandler
+from .ledger_handler import LedgerHandler
+from ..entities import BalanceEntity
+from ..repositories import SchemaRepository
+from ..use_cases import CalculateAdvances
+
+
+class DaemonHandler():
+    """
+    Class to keep the ledger state warm in memory and answer balance queries without replaying it.
+
+    The balance right after the last event is kept in memory. Before each query, the events inserted since the
+    previous one are replayed on top of it, so new loads are picked up incrementally. If any new event happened
+    before the last replayed one, the state is restored again from the checkpoints the load refreshed.
+
+    The daemon only reads the database, so it never competes with the loads for the write lock.
+
+    Decimal balances as of a date after the last event are taken straight from the state in memory. Any other
+    balance is calculated by the ledger handler, which resumes from the checkpoints and reuses the balances cache.
+
+    Attributes
+    ----------
+    connection : sqlite3.Connection
+        The connection to the database.
+
+    ledger_handler : LedgerHandler
+        A reference to calculate the balances that are not taken from the state in memory.
+
+    database_id : Optional[str]
+        The id of the database served, sent along with the balances so the clients can tell it apart from
+        another database created at the same path.
+
+    balance_entity : Optional[BalanceEntity]
+        The balance right after the last replayed event, or None until the state is loaded.
+
+    last_event_date : Optional[date]
+        The date of the last replayed event, if any.
+
+    last_event_id : int
+        The id of the last replayed event, or 0 if there is none.
+
+    watermark : int
+        The greatest event id already replayed.
+    """
+    connection: sqlite3.Connection
+    ledger_handler: LedgerHandler
+    database_id: Optional[str]
+
+    balance_entity: Optional[BalanceEntity]
+    last_event_date: Optional[date]
+    last_event_id: int
+    watermark: int
+
+    def __init__(self, connection: sqlite3.Connection, ledger_handler: Optional[LedgerHandler] = None) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            The connection to the database.
+
+        ledger_handler : Optional[LedgerHandler]
+            A reference to calculate the balances that are not taken from the state in memory.
+            A new read-only one is created if not given.
+        """
+        self.connection = connection
+        self.ledger_handler = (
+            ledger_handler if ledger_handler is not None else LedgerHandler(connection, read_only=True)
+        )
+        self.database_id = SchemaRepository(connection).get_database_id()
+
+        self.balance_entity = None
+        self.last_event_date = None
+        self.last_event_id = 0
+        self.watermark = 0
+
+    def __restore_state(self) -> None:
+        """
+        Private Method to restore the state in memory from the latest checkpoint, leaving the events after it
+        to be replayed.
+        """
+        self.balance_entity, checkpoint = self.ledger_handler.get_checkpoint_balance()
+
+        self.last_event_date = checkpoint.last_event_date if checkpoint is not None else None
+        self.last_event_id = checkpoint.last_event_id if checkpoint is not None else 0
+
+    def refresh(self) -> None:
+        """
+        Method to bring the state in memory up to date with the events stored in the database.
+
+        Raises
+        ------
+        ValueError
+            If the events belong to more than one customer.
+        """
+        event_repository = self.ledger_handler.event_repository
+        max_id = event_repository.get_max_id()
+
+        # THE NEW EVENTS MAY BELONG TO ANOTHER CUSTOMER, SO THEY ARE NOT APPLIED TO THE STATE IN MEMORY
+        if max_id != self.watermark:
+            self.ledger_handler.check_single_customer()
+
+        if self.balance_entity is not None and max_id == self.watermark:
+            return
+
+        min_new_date = event_repository.get_min_date_after(self.watermark)
+
+        # THE NEW EVENTS CHANGED THE HISTORY ALREADY REPLAYED, SO THE STATE IS RESTORED AGAIN
+        if (
+            self.balance_entity is None
+            or self.last_event_date is not None and min_new_date < self.last_event_date
+        ):
+            self.__restore_state()
+
+        events = list(event_repository.get_events_after(self.last_event_date or date.min, self.last_event_id))
+
+        if events:
+            EventHandler(
+                events, None, balance_entity=self.balance_entity, start_date=self.last_event_date
+            ).handle_all_events()
+
+            self.last_event_date = date.fromordinal(events[-1][3])
+            self.last_event_id = events[-1][0]
+
+        self.watermark = max_id
+
+    def get_balances(
+        self, end_dates: List[date], engine: str = "decimal", with_advances: bool = True
+    ) -> List[BalanceEntity]:
+        """
+        Method to get the ledger balance as of each one of the end dates.
+
+        Parameters
+        ----------
+        end_dates : List[date]
+            The (exclusive) end dates, in ascending order.
+
+        engine : str
+            The name of the engine used to calculate the balances.
+
+        with_advances : bool
+            Whether the balances keep a copy of the advances, or only the summary totals.
+
+        Returns
+        --------
+        List[BalanceEntity]
+            An entity containing all the events balance as of each end date.
+
+        Raises
+        ------
+        ValueError
+            If the events belong to more than one customer.
+        """
+        self.refresh()
+
+        balance_entities: Dict[date, BalanceEntity] = {}
+
+        if engine == "decimal":
+            calculate_advances = CalculateAdvances(
+                [], None, balance_entity=self.balance_entity, start_date=self.last_event_date
+            )
+
+            for end_date in end_dates:
+                if self.last_event_date is None or end_date > self.last_event_date:
+                    balance_entities[end_date] = calculate_advances.take_snapshot(end_date, with_advances)
+
+        missing_end_dates = [end_date for end_date in end_dates if end_date not in balance_entities]
+
+        if missing_end_dates:
+            missing_balances = self.ledger_handler.get_balances(missing_end_dates, engine, with_advances)
+            balance_entities.update(zip(missing_end_dates, missing_balances))
+
+        return [balance_entities[end_date] for end_date in end_dates]
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Method to get the status of the state in memory.
+
+        Returns
+        --------
+        Dict[str, Any]
+            The database id, the watermark, the date of the last replayed event and how many advances are kept
+            in memory.
+        """
+        self.refresh()
+
+        return {
+            "database_id": self.database_id,
+            "watermark": self.watermark,
+            "last_event_date": self.last_event_date.isoformat() if self.last_event_date is not None else None,
+            "advances": len(self.balance_entity.advances),
+        }
+
+    def build_server(self, host: str, port: int) -> HTTPServer:
+        """
+        Method to build the HTTP server that answers the balance queries.
+
+        The server handles one request at a time, so the connection to the database is only used by one
+        thread at once.
+
+        Parameters
+        ----------
+        host : str
+            The host to listen on.
+
+        port : int
+            The port to listen on. If 0, any free port is used.
+
+        Returns
+        --------
+        HTTPServer
+            The server, already bound to the address.
+        """
+        server = HTTPServer((host, port), DaemonRequestHandler)
+        server.daemon_handler = self
+
+        return server
+
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """
+    Class to handle the HTTP requests made to the ledger daemon.
+
+    The following endpoints answer with JSON:
+    * GET /status: the status of the state in memory;
+    * GET /balances?date=YYYY-MM-DD[&date=...][&engine=decimal][&advances=0]: the balances as of the end of each
+      date, without the advances if `advances` is 0.
+    """
+
+    def __send_json(self, status: int, content: Dict[str, Any]) -> None:
+        """
+        Private Method to send a JSON response.
+
+        Parameters
+        ----------
+        status : int
+            The HTTP status code.
+
+        content : Dict[str, Any]
+            The response content.
+        """
+        body = json.dumps(content).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        """
+        Method to answer a GET request.
+        """
+        daemon_handler: DaemonHandler = self.server.daemon_handler
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == "/status":
+            self.__send_json(200, daemon_handler.get_status())
+            return
+
+        if url.path != "/balances":
+            self.__send_json(404, {"error": f"Unknown path {url.path}"})
+            return
+
+        engine = query.get("engine", ["decimal"])[0]
+        if engine not in LedgerHandler.ENGINES:
+            self.__send_json(400, {"error": f"Unknown engine {engine}"})
+            return
+
+        try:
+            output_dates = sorted({date.fromisoformat(output_date) for output_date in query.get("date", [])})
+
+        except ValueError as error:
+            self.__send_json(400, {"error": str(error)})
+            return
+
+        if not output_dates:
+            self.__send_json(400, {"error": "At least one date is required"})
+            return
+
+        with_advances = query.get("advances", ["1"])[0] != "0"
+
+        try:
+            balance_entities = daemon_handler.get_balances(
+                [output_date + timedelta(days=1) for output_date in output_dates], engine, with_advances
+            )
+
+        except ValueError as error:
+            self.__send_json(409, {"error": str(error)})
+            return
+
+        self.__send_json(200, {
+            "database_id": daemon_handler.database_id,
+            "balances": [
+                {"date": output_date.isoformat(), **balance_entity.to_dict()}
+                for output_date, balance_entity in zip(output_dates, balance_entities)
+            ]
+        })
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """
+        Method to silence the request log, which is written to stderr by default.
+        """
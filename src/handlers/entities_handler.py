@@ -2,60 +2,81 @@
 Module containing the 'EntitiesHandler' Class.
 """
 
-from decimal import Decimal
-from datetime import datetime, date
-from typing import Any, Dict, List, Tuple
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
 
-from ..entities import EventEntity
+from .instrumentation_handler import InstrumentationHandler
+from ..entities import EventEntity, ADVANCE_TYPE_CODE, PAYMENT_TYPE_CODE
 from ..builders import EntityBuilder, AdvanceEntityBuilder, PaymentEntityBuilder
+from ..repositories.event_repository import to_amount
 
 
 class EntitiesHandler():
     """
     Class containing all the functionalities to handle all the entities.
 
+    The entities are built lazily, one event at a time, so the events can be streamed straight from
+    the database without being held in memory.
+
     Attributes
     ----------
-    events : List[Tuple[Any]]
-        A list containing all the events coming from the database.
+    events : Iterable[Tuple[Any]]
+        An iterable over all the events coming from the database.
 
-    end_date : date
+    end_date : Optional[date]
         The processing end date.
 
-    entities : List[EventEntity]
-        A list containing all the build entities.
-
     advance_builder : AdvanceEntityBuilder
         A reference to build the advances entities.
 
     payment_builder : PaymentEntityBuilder
         A reference to build the payment entities.
+
+    entity_builders : Dict[int, EntityBuilder]
+        The builder of each event type code.
+
+    instrumentation : Optional[InstrumentationHandler]
+        A reference to record the fetched rows, the built entities and the time spent on them, if any.
     """
-    events: List[Tuple[Any]]
-    end_date: date
+    events: Iterable[Tuple[Any]]
+    end_date: Optional[date]
 
-    entities: List[EventEntity]
     advance_builder: AdvanceEntityBuilder
     payment_builder: PaymentEntityBuilder
-
-    def __init__(self, events: List[Tuple[Any]], end_date: date) -> None:
+    entity_builders: Dict[int, EntityBuilder]
+    instrumentation: Optional[InstrumentationHandler]
+
+    def __init__(
+        self,
+        events: Iterable[Tuple[Any]],
+        end_date: Optional[date],
+        first_advance_id: int = 1,
+        instrumentation: Optional[InstrumentationHandler] = None
+    ) -> None:
         """
         Constructor to set up some attributes.
 
         Parameters
         ----------
-        events : List[Tuple[Any]]
-            A list containing all the events coming from the database.
+        events : Iterable[Tuple[Any]]
+            An iterable over all the events coming from the database.
 
-        end_date : date
-            The processing end date.
+        end_date : Optional[date]
+            The processing end date. If None, all the events are built.
+
+        first_advance_id : int
+            The id of the first advance entity to be built.
+
+        instrumentation : Optional[InstrumentationHandler]
+            A reference to record the fetched rows, the built entities and the time spent on them, if any.
         """
         self.events = events
         self.end_date = end_date
 
-        self.entities = []
-        self.advance_builder = AdvanceEntityBuilder()
+        self.advance_builder = AdvanceEntityBuilder(first_advance_id)
         self.payment_builder = PaymentEntityBuilder()
+        self.entity_builders = {ADVANCE_TYPE_CODE: self.advance_builder, PAYMENT_TYPE_CODE: self.payment_builder}
+        self.instrumentation = instrumentation
 
     def __build_entity(self, entity_data: Tuple[Any]) -> EventEntity:
         """
@@ -71,18 +92,14 @@ class EntitiesHandler():
         EventEntity
             A reference to the event entity.
         """
-        entity_type = entity_data[1]
-        entity_amount = Decimal(entity_data[2])
-        entity_date = datetime.strptime(entity_data[3], '%Y-%m-%d').date()
-
-        entity_builders: Dict[str, EntityBuilder] = {
-            'advance': self.advance_builder,
-            'payment': self.payment_builder
-        }
+        # THE EVENTS ARE STORED ALREADY DECODED, SO NO STRING IS PARSED
+        entity_amount = to_amount(entity_data[2], entity_data[4])
+        entity_date = date.fromordinal(entity_data[3])
 
-        entity = entity_builders[entity_type].build_entity(
+        entity = self.entity_builders[entity_data[1]].build_entity(
             event_amount=entity_amount,
-            event_date=entity_date
+            event_date=entity_date,
+            event_id=entity_data[0]
         )
 
         return entity
@@ -102,28 +119,57 @@ class EntitiesHandler():
             - True if the current date is equal to or past the end date;
             - False otherwise
         """
-        if current_date >= self.end_date:
+        if self.end_date is not None and current_date >= self.end_date:
             return True
 
         return False
 
-    def build_entities(self) -> List[EventEntity]:
+    def __fetch_events(self) -> Iterator[Tuple[Any]]:
         """
-        Method to build all the entities.
+        Private Method to iterate over the events, recording how many were fetched and the time spent on it.
 
-        Returns
+        Yields
+        -------
+        Tuple[Any]
+            Each one of the events.
+        """
+        events = iter(self.events)
+
+        while True:
+            with self.instrumentation.stage("fetch rows"):
+                event_data = next(events, None)
+
+            if event_data is None:
+                return
+
+            self.instrumentation.count("rows fetched")
+            yield event_data
+
+    def build_entities(self) -> Iterator[EventEntity]:
+        """
+        Method to lazily build all the entities, until the end date.
+
+        Yields
         -------
-        List[EventEntity]
-            A list containing all the built event entities.
+        EventEntity
+            Each one of the built event entities.
         """
-        for event_data in self.events:
-            current_date = datetime.strptime(event_data[3], '%Y-%m-%d').date()
-            past_end_date = self.__is_past_end_date(current_date)
+        instrumentation = self.instrumentation
+        events = self.events if instrumentation is None else self.__fetch_events()
+
+        for event_data in events:
+            if instrumentation is None:
+                entity = self.__build_entity(event_data)
+            else:
+                with instrumentation.stage("build entities"):
+                    entity = self.__build_entity(event_data)
+
+            past_end_date = self.__is_past_end_date(entity.event_date)
 
             if past_end_date:
                 break
 
-            entity = self.__build_entity(event_data)
-            self.entities.append(entity)
+            if instrumentation is not None:
+                instrumentation.count("entities built")
 
-        return self.entities
+            yield entity
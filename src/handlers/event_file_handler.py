@@ -0,0 +1,140 @@
+"""
+Module containing the 'EventFileHandler' Class.
+"""
+
+import sqlite3
+from datetime import date
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from .event_handler import EventHandler
+from ..entities import BalanceEntity
+from ..repositories import EventFileRepository, EventRepository
+from ..repositories.event_file_repository import NUMPY_AVAILABLE
+from ..use_cases import FixedPointCalculateAdvances, VectorizedCalculateAdvances
+
+
+class EventFileHandler():
+    """
+    Class to export the events to a binary event file and to calculate the balances straight from it.
+
+    With the vector engine and NumPy installed, the balances are calculated from columns over the memory-mapped
+    records, so no Python object is created per event to read them. The other engines replay the records one by
+    one, as they do with the rows of the database.
+
+    Attributes
+    ----------
+    event_file_repository : EventFileRepository
+        A reference to write and read the event file.
+    """
+    event_file_repository: EventFileRepository
+
+    def __init__(self, path: str) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        path : str
+            The path of the event file.
+        """
+        self.event_file_repository = EventFileRepository(path)
+
+    def export_events(self, connection: sqlite3.Connection, customer_id: Optional[str] = None) -> Tuple[int, int]:
+        """
+        Method to export the events of the database to the event file.
+
+        The event file does not keep the customer of the events, so only the events of a single customer are
+        exported.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            The connection to the database.
+
+        customer_id : Optional[str]
+            The id of the customer to export the events of. If None, all the events are exported, as long as they
+            belong to a single customer.
+
+        Returns
+        --------
+        Tuple[int, int]
+            How many events were exported and how many of their amounts were rounded to whole cents.
+
+        Raises
+        ------
+        ValueError
+            If no customer is given and the events belong to more than one customer.
+        """
+        event_repository = EventRepository(connection)
+        rounded = 0
+
+        if customer_id is not None:
+            events = event_repository.get_customer_events(customer_id)
+
+        elif event_repository.has_many_customers():
+            raise ValueError("the events of more than one customer cannot be exported as a single ledger")
+
+        else:
+            events = event_repository.get_events()
+
+        def count_rounded(events: Iterable[Tuple[Any]]) -> Iterator[Tuple[Any]]:
+            nonlocal rounded
+
+            for event in events:
+                if event[4] is not None:
+                    rounded += 1
+
+                yield event
+
+        exported = self.event_file_repository.write_events(count_rounded(events))
+
+        return exported, rounded
+
+    def get_events(self) -> Iterator[Tuple[Any]]:
+        """
+        Method to get all the events of the event file.
+
+        Returns
+        --------
+        Iterator[Tuple[Any]]
+            An iterator over the events, as (id, type_code, cents, date_created, exact_amount) rows.
+        """
+        return self.event_file_repository.get_events()
+
+    def get_balances(
+        self, end_dates: List[date], engine: str = "decimal", with_advances: bool = True
+    ) -> List[BalanceEntity]:
+        """
+        Method to get the ledger balance as of each one of the end dates.
+
+        Parameters
+        ----------
+        end_dates : List[date]
+            The (exclusive) end dates, in ascending order.
+
+        engine : str
+            The name of the engine used to calculate the balances.
+
+        with_advances : bool
+            Whether the balances taken along a single replay keep a copy of the advances, or only the summary
+            totals.
+
+        Returns
+        --------
+        List[BalanceEntity]
+            An entity containing all the events balance as of each end date.
+        """
+        if engine == "decimal":
+            events = self.event_file_repository.get_events(end_dates[-1])
+            return EventHandler(events, end_dates[-1]).handle_all_events_as_of(end_dates, with_advances)
+
+        if engine == "vector" and NUMPY_AVAILABLE:
+            columns = self.event_file_repository.get_columns()
+            return [VectorizedCalculateAdvances([], end_date).get_columns_balance(*columns) for end_date in end_dates]
+
+        engines = {"fixed": FixedPointCalculateAdvances, "vector": VectorizedCalculateAdvances}
+
+        return [
+            engines[engine](self.event_file_repository.get_events(end_date), end_date).get_balance()
+            for end_date in end_dates
+        ]
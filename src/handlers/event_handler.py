@@ -4,15 +4,17 @@ Module containing the 'EventHandler' Class.
 
 # TYPING IMPORTS
 from __future__ import annotations
-from typing import Any, Tuple, List, TYPE_CHECKING
+from typing import Any, Iterable, Tuple, List, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from ..entities import EventEntity, BalanceEntity
+    from ..entities import BalanceEntity
+    from ..use_cases import LedgerObserver
 
 # MODULE IMPORTS
 from datetime import date
 
 from .entities_handler import EntitiesHandler
+from .instrumentation_handler import InstrumentationHandler, record_stage
 from ..use_cases import CalculateAdvances
 
 
@@ -22,47 +24,100 @@ class EventHandler():
 
     Attributes
     ----------
-    events : Tuple[Any]
-        The events to be handled.
+    events : Iterable[Tuple[Any]]
+        The events to be handled, in replay order.
 
-    end_date : date
+    end_date : Optional[date]
         The end date to process until it.
-    """
-    events: Tuple[Any]
-    end_date: date
 
-    def __init__(self, events: Tuple[Any], end_date: date) -> None:
+    balance_entity : Optional[BalanceEntity]
+        The balance to resume the processing from, if any.
+
+    start_date : Optional[date]
+        The date until which the interest of the given balance entity was already accrued.
+
+    observers : List[LedgerObserver]
+        The observers notified after each entity is processed.
+
+    instrumentation : Optional[InstrumentationHandler]
+        A reference to record the time spent on each stage and some counters, if any.
+    """
+    events: Iterable[Tuple[Any]]
+    end_date: Optional[date]
+
+    balance_entity: Optional[BalanceEntity]
+    start_date: Optional[date]
+    observers: List[LedgerObserver]
+    instrumentation: Optional[InstrumentationHandler]
+
+    def __init__(
+        self,
+        events: Iterable[Tuple[Any]],
+        end_date: Optional[date],
+        balance_entity: Optional[BalanceEntity] = None,
+        start_date: Optional[date] = None,
+        observers: Optional[List[LedgerObserver]] = None,
+        instrumentation: Optional[InstrumentationHandler] = None
+    ) -> None:
         """
         Constructor to set up some attributes.
 
         Parameters
         ----------
-        events : Tuple[Any]
-            The events to be handled.
+        events : Iterable[Tuple[Any]]
+            The events to be handled, in replay order.
 
-        end_date : date
+        end_date : Optional[date]
             The end date to process until it.
+
+        balance_entity : Optional[BalanceEntity]
+            The balance to resume the processing from, if any.
+
+        start_date : Optional[date]
+            The date until which the interest of the given balance entity was already accrued.
+
+        observers : Optional[List[LedgerObserver]]
+            The observers notified after each entity is processed.
+
+        instrumentation : Optional[InstrumentationHandler]
+            A reference to record the time spent on each stage and some counters, if any.
         """
         self.events = events
         self.end_date = end_date
 
-    def __process_all_entities(self, entities: List[EventEntity]) -> BalanceEntity:
-        """
-        Private Method to process all the entities.
+        self.balance_entity = balance_entity
+        self.start_date = start_date
+        self.observers = observers if observers is not None else []
+        self.instrumentation = instrumentation
 
-        Parameters
-        ----------
-        entities : List[EventEntity]
-            A list containing all the entities to be processed.
+    def __build_calculate_advances(self) -> CalculateAdvances:
+        """
+        Private Method to build the use case that processes all the entities.
 
         Returns
         -------
-        BalanceEntity
-            The balance entity after all entities were processed.
+        CalculateAdvances
+            The use case, over the lazily built entities.
         """
-        calculate_advances = CalculateAdvances(entities, self.end_date)
+        first_advance_id = 1
+        if self.balance_entity is not None:
+            first_advance_id = len(self.balance_entity.advances) + 1
 
-        return calculate_advances.get_balance()
+        entities_handler = EntitiesHandler(self.events, self.end_date, first_advance_id, self.instrumentation)
+
+        entities = entities_handler.build_entities()
+
+        observers = self.observers
+        if self.instrumentation is not None:
+            observers = observers + [self.instrumentation]
+
+        return CalculateAdvances(
+            entities,
+            self.end_date,
+            balance_entity=self.balance_entity,
+            start_date=self.start_date,
+            observers=observers
+        )
 
     def handle_all_events(self) -> BalanceEntity:
         """
@@ -73,8 +128,29 @@ class EventHandler():
         BalanceEntity
             An entity containing all the events balance.
         """
-        entities_handler = EntitiesHandler(self.events, self.end_date)
+        calculate_advances = self.__build_calculate_advances()
 
-        entities = entities_handler.build_entities()
+        with record_stage(self.instrumentation, "calculate advances"):
+            return calculate_advances.get_balance()
+
+    def handle_all_events_as_of(self, end_dates: List[date], with_advances: bool = True) -> List[BalanceEntity]:
+        """
+        Method to handle all the events once and return their balance as of each one of the end dates.
+
+        Parameters
+        ----------
+        end_dates : List[date]
+            The (exclusive) end dates, in ascending order. The last one must be the handler end date.
+
+        with_advances : bool
+            Whether each balance keeps a copy of the advances, or only the summary totals.
+
+        Returns
+        -------
+        List[BalanceEntity]
+            An entity containing all the events balance as of each end date.
+        """
+        calculate_advances = self.__build_calculate_advances()
 
-        return self.__process_all_entities(entities)
+        with record_stage(self.instrumentation, "calculate advances"):
+            return calculate_advances.get_balances(end_dates, with_advances)
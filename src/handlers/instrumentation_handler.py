@@ -0,0 +1,182 @@
+"""
+Module containing the 'InstrumentationHandler' Class.
+"""
+
+# TYPING IMPORTS
+from __future__ import annotations
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..entities import EventEntity, BalanceEntity
+
+# MODULE IMPORTS
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+from ..entities import PaymentEntity
+from ..use_cases import LedgerObserver
+
+try:
+    import resource
+
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+class InstrumentationHandler(LedgerObserver):
+    """
+    Class to record the wall time of each stage and some counters while the ledger is handled.
+
+    It is also a ledger observer, so it counts the processed entities and how many open advances each payment
+    scanned. Instrumentation is opt-in: the handlers only record anything when they are given an instance
+    of this class.
+
+    Attributes
+    ----------
+    stages : Dict[str, float]
+        The wall time spent in each stage, in seconds, by stage name, in the order the stages started.
+
+    counters : Dict[str, int]
+        The value of each counter, by counter name.
+    """
+    stages: Dict[str, float]
+    counters: Dict[str, int]
+
+    def __init__(self) -> None:
+        """
+        Constructor to set up some attributes.
+        """
+        self.stages = {}
+        self.counters = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Method to record the wall time spent inside a `with` block, adding it to the stage time.
+
+        Parameters
+        ----------
+        name : str
+            The stage name.
+        """
+        self.stages.setdefault(name, 0.0)
+        start = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.stages[name] += time.perf_counter() - start
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Method to increase a counter.
+
+        Parameters
+        ----------
+        name : str
+            The counter name.
+
+        amount : int
+            How much the counter is increased by.
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def on_entity_processed(self, entity: EventEntity, balance_entity: BalanceEntity) -> None:
+        """
+        Method to count the processed entities and the advances scanned by each payment.
+
+        Parameters
+        ----------
+        entity : EventEntity
+            A reference to the processed entity.
+
+        balance_entity : BalanceEntity
+            Entity containing all the current balances.
+        """
+        self.count("entities processed")
+
+        if isinstance(entity, PaymentEntity):
+            self.count("payments processed")
+            self.count("advances scanned", entity.advances_scanned)
+            self.counters["max advances scanned per payment"] = max(
+                self.counters.get("max advances scanned per payment", 0), entity.advances_scanned
+            )
+
+    def get_peak_memory(self) -> Optional[int]:
+        """
+        Method to get the peak resident memory of the process.
+
+        Returns
+        --------
+        Optional[int]
+            The peak resident memory, in bytes, or None if it is not available in this platform.
+        """
+        if resource is None:
+            return None
+
+        peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        # THE PEAK MEMORY IS REPORTED IN BYTES ON MACOS AND IN KILOBYTES ELSEWHERE
+        return peak_memory if sys.platform == "darwin" else peak_memory * 1024
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Method to get all the recorded values, in a JSON serializable format.
+
+        Returns
+        --------
+        Dict[str, Any]
+            The stage times, the counters and the peak memory.
+        """
+        return {
+            "stages": dict(self.stages),
+            "counters": dict(self.counters),
+            "peak_memory": self.get_peak_memory(),
+        }
+
+    def format_report(self) -> List[str]:
+        """
+        Method to format all the recorded values as human readable lines.
+
+        Returns
+        --------
+        List[str]
+            The report lines.
+        """
+        lines = [f"[Debug] stage {name}: {seconds:.3f}s" for name, seconds in self.stages.items()]
+        lines += [f"[Debug] {name}: {value}" for name, value in self.counters.items()]
+
+        payments = self.counters.get("payments processed")
+        if payments:
+            lines.append(f"[Debug] advances scanned per payment: {self.counters['advances scanned'] / payments:.2f}")
+
+        peak_memory = self.get_peak_memory()
+        if peak_memory is not None:
+            lines.append(f"[Debug] peak memory: {peak_memory / 1024 / 1024:.1f} MiB")
+
+        return lines
+
+
+def record_stage(instrumentation: Optional[InstrumentationHandler], name: str) -> ContextManager[None]:
+    """
+    Function to record the wall time spent on a stage, only if there is any instrumentation.
+
+    Parameters
+    ----------
+    instrumentation : Optional[InstrumentationHandler]
+        A reference to record the stage time, if any.
+
+    name : str
+        The stage name.
+
+    Returns
+    --------
+    ContextManager[None]
+        The context manager that records the stage time, or does nothing.
+    """
+    if instrumentation is None:
+        return nullcontext()
+
+    return instrumentation.stage(name)
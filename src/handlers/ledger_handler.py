@@ -0,0 +1,690 @@
+"""
+Module containing the 'LedgerHandler' Class.
+"""
+
+import sqlite3
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from .event_handler import EventHandler
+from .checkpoint_handler import CheckpointHandler
+from .allocation_handler import AllocationHandler
+from .rollup_handler import RollupHandler
+from .instrumentation_handler import InstrumentationHandler, record_stage
+from ..entities import AdvanceStore, AdvanceView, BalanceEntity, CheckpointEntity
+from ..repositories import (
+    AllocationRepository, EventRepository, CheckpointRepository, BalanceCacheRepository, RollupRepository
+)
+from ..repositories.event_repository import to_amount
+from ..use_cases import FixedPointCalculateAdvances, LedgerObserver, VectorizedCalculateAdvances
+
+
+class LedgerHandler():
+    """
+    Class to handle the ledger stored in the database.
+
+    Instead of replaying all the events from the very first one, the ledger is resumed from the latest
+    checkpoint available and only the remaining events are replayed. The calculated balances are cached
+    by end date and engine until new events change them.
+
+    The replays until the last event also keep the allocations index up to date, with the amounts each event
+    allocated to each advance, so the history of an advance is read without replaying the ledger, and the
+    monthly rollups, so the monthly report is read without replaying it either.
+
+    The ledger is the ledger of a single customer, so none of these methods replays a database holding the events
+    of more than one customer, as one customer's payments would pay down another customer's advances. Those ledgers
+    are replayed customer by customer by the 'PortfolioHandler' Class instead.
+
+    The balance can be calculated by one of the following engines:
+    * decimal: the 'CalculateAdvances' Decimal engine, which resumes from the checkpoints;
+    * fixed: the 'FixedPointCalculateAdvances' integer engine, which always replays the events from the first one;
+    * vector: the 'VectorizedCalculateAdvances' NumPy engine, which returns the same balance as the fixed engine
+      and falls back to it when NumPy is not installed.
+
+    Attributes
+    ----------
+    connection : sqlite3.Connection
+        The connection to the database.
+
+    checkpoint_interval : int
+        How many events are replayed between two checkpoints.
+
+    cache_size : int
+        The size limit of the balances cache, in bytes. If 0, the cache is not used.
+
+    read_only : bool
+        Whether the database is never written, so no checkpoint is saved and the cached balances are only read.
+
+    event_repository : EventRepository
+        A reference to query the events.
+
+    checkpoint_repository : CheckpointRepository
+        A reference to store and query the checkpoints.
+
+    balance_cache_repository : BalanceCacheRepository
+        A reference to store and query the cached balances.
+
+    allocation_repository : AllocationRepository
+        A reference to store and query the allocations of the events to the advances.
+
+    rollup_repository : RollupRepository
+        A reference to store and query the monthly rollups.
+
+    instrumentation : Optional[InstrumentationHandler]
+        A reference to record the time spent on each stage and some counters, if any.
+    """
+    connection: sqlite3.Connection
+    checkpoint_interval: int
+    cache_size: int
+    read_only: bool
+
+    event_repository: EventRepository
+    checkpoint_repository: CheckpointRepository
+    balance_cache_repository: BalanceCacheRepository
+    allocation_repository: AllocationRepository
+    rollup_repository: RollupRepository
+    instrumentation: Optional[InstrumentationHandler]
+
+    DEFAULT_CHECKPOINT_INTERVAL = 10000
+    DEFAULT_CACHE_SIZE = 64 * 1024 * 1024
+    ENGINES = ("decimal", "fixed", "vector")
+
+    def __init__(
+        self,
+        connection: sqlite3.Connection,
+        checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        instrumentation: Optional[InstrumentationHandler] = None,
+        read_only: bool = False
+    ) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            The connection to the database.
+
+        checkpoint_interval : int
+            How many events are replayed between two checkpoints.
+
+        cache_size : int
+            The size limit of the balances cache, in bytes. If 0, the cache is not used.
+
+        instrumentation : Optional[InstrumentationHandler]
+            A reference to record the time spent on each stage and some counters, if any.
+
+        read_only : bool
+            Whether the database is never written, as with read-only connections.
+        """
+        self.connection = connection
+        self.checkpoint_interval = checkpoint_interval
+        self.cache_size = cache_size
+        self.read_only = read_only
+
+        self.event_repository = EventRepository(connection)
+        self.checkpoint_repository = CheckpointRepository(connection)
+        self.balance_cache_repository = BalanceCacheRepository(connection)
+        self.allocation_repository = AllocationRepository(connection)
+        self.rollup_repository = RollupRepository(connection)
+        self.instrumentation = instrumentation
+
+    def check_single_customer(self) -> None:
+        """
+        Method to check that the events belong to a single customer, so they can be replayed as one ledger.
+
+        Raises
+        ------
+        ValueError
+            If the events belong to more than one customer.
+        """
+        if self.event_repository.has_many_customers():
+            raise ValueError("the events of more than one customer cannot be replayed as a single ledger")
+
+    def __restore_balance(self, checkpoint: CheckpointEntity, lean: bool = False) -> Optional[BalanceEntity]:
+        """
+        Private Method to restore the balance entity saved in a checkpoint.
+
+        Parameters
+        ----------
+        checkpoint : CheckpointEntity
+            The checkpoint to restore the balance from.
+
+        lean : bool
+            Whether only the open advances are restored, which is enough to keep replaying the ledger
+            but not to display all the advances.
+
+        Returns
+        --------
+        Optional[BalanceEntity]
+            The restored balance, or None if the checkpoint does not match the stored events.
+        """
+        offset = 0
+        if lean:
+            offset = min(checkpoint.open_advances, default=checkpoint.advance_count + 1) - 1
+
+        advance_events = self.event_repository.get_advances_until(
+            checkpoint.last_event_date, checkpoint.last_event_id, offset
+        )
+        advances = AdvanceStore(offset)
+
+        for advance_event in advance_events:
+            advance_id = len(advances) + 1
+            current_balance = checkpoint.open_advances.get(advance_id, Decimal(0))
+            advances.append(
+                date.fromordinal(advance_event[3]), to_amount(advance_event[2], advance_event[4]), current_balance
+            )
+
+        if len(advances) != checkpoint.advance_count:
+            return None
+
+        return BalanceEntity(
+            advance_balance=checkpoint.advance_balance,
+            interest_payable_balance=checkpoint.interest_payable_balance,
+            interest_paid=checkpoint.interest_paid,
+            payments_for_future=checkpoint.payments_for_future,
+            advances=advances
+        )
+
+    def __build_event_handler(
+        self,
+        resume_date: Optional[date],
+        end_date: Optional[date],
+        checkpoint_handler: CheckpointHandler,
+        lean: bool = False,
+        index_handlers: Optional[List[LedgerObserver]] = None
+    ) -> EventHandler:
+        """
+        Private Method to build an event handler resumed from the latest checkpoint before the resume date.
+
+        Parameters
+        ----------
+        resume_date : Optional[date]
+            The (exclusive) date to resume the ledger before it. If None, the latest checkpoint is used.
+
+        end_date : Optional[date]
+            The (exclusive) end date. If None, all the events are replayed.
+
+        checkpoint_handler : CheckpointHandler
+            The observer that saves new checkpoints along the replay.
+
+        lean : bool
+            Whether only the open advances of the checkpoint are restored.
+
+        index_handlers : Optional[List[LedgerObserver]]
+            The observers that save the allocations and the rollups along the replay, if any.
+
+        Returns
+        --------
+        EventHandler
+            The event handler over the remaining events.
+        """
+        with record_stage(self.instrumentation, "restore checkpoint"):
+            checkpoint = self.checkpoint_repository.get_latest_checkpoint(resume_date)
+            balance_entity = None
+
+            if checkpoint is not None:
+                balance_entity = self.__restore_balance(checkpoint, lean)
+
+        if balance_entity is None:
+            checkpoint = None
+            events = self.event_repository.get_events(end_date)
+        else:
+            events = self.event_repository.get_events_after(
+                checkpoint.last_event_date, checkpoint.last_event_id, end_date
+            )
+
+        return EventHandler(
+            events,
+            end_date,
+            balance_entity=balance_entity,
+            start_date=checkpoint.last_event_date if checkpoint is not None else None,
+            observers=[checkpoint_handler, *(index_handlers or [])] if not self.read_only else [],
+            instrumentation=self.instrumentation
+        )
+
+    @staticmethod
+    def __get_stale_date(until: Optional[int], max_date: Optional[date]) -> Optional[date]:
+        """
+        Private Method to get the date an index is missing the events from.
+
+        Parameters
+        ----------
+        until : Optional[int]
+            The (exclusive) day ordinal the index is complete before, or None if it was never saved.
+
+        max_date : Optional[date]
+            The date of the last event, if any.
+
+        Returns
+        --------
+        Optional[date]
+            The date of the first event missing from the index, or None if the index is up to date.
+        """
+        if max_date is None or until is not None and until > max_date.toordinal():
+            return None
+
+        return date.fromordinal(until) if until is not None else date.min
+
+    def __replay(self, end_date: Optional[date], lean: bool = False) -> BalanceEntity:
+        """
+        Private Method to replay the ledger from the latest checkpoint before the end date.
+
+        Parameters
+        ----------
+        end_date : Optional[date]
+            The (exclusive) end date. If None, all the events are replayed and a checkpoint
+            of the last one is saved.
+
+        lean : bool
+            Whether only the open advances of the checkpoint are restored, so the returned balance
+            does not keep the closed advances restored from it.
+
+        Returns
+        --------
+        BalanceEntity
+            An entity containing all the events balance.
+
+        Raises
+        ------
+        ValueError
+            If the events belong to more than one customer.
+        """
+        self.check_single_customer()
+
+        checkpoint_handler = CheckpointHandler(self.checkpoint_repository, self.checkpoint_interval)
+        allocation_handler = None
+        rollup_handler = None
+        resume_date = end_date
+
+        # THE REPLAYS UNTIL THE LAST EVENT RESUME BEFORE THE FIRST EVENT MISSING FROM THE INDEXES
+        if end_date is None and not self.read_only:
+            max_date = self.event_repository.get_max_date()
+            allocations_date = self.__get_stale_date(self.allocation_repository.get_indexed_until(), max_date)
+            rollups_date = self.__get_stale_date(self.rollup_repository.get_rolled_up_until(), max_date)
+
+            if allocations_date is not None:
+                allocation_handler = AllocationHandler(self.allocation_repository)
+                self.allocation_repository.delete_allocations_from(allocations_date)
+
+            # THE ROLLUPS ARE TAKEN AGAIN FROM THE START OF THE MONTH OF THE LAST ROLLED UP DAY, SINCE THE INTEREST
+            # AFTER THE LAST ROLLED UP EVENT IS ONLY SPLIT ACROSS THE MONTHS WHEN THE NEXT EVENT ARRIVES
+            if rollups_date is not None:
+                if rollups_date > date.min:
+                    rollups_date -= timedelta(days=1)
+                rollups_date = rollups_date.replace(day=1)
+                rollup_handler = RollupHandler(self.rollup_repository, rollups_date)
+
+            resume_date = min(
+                (stale_date for stale_date in (allocations_date, rollups_date) if stale_date is not None),
+                default=None
+            )
+
+        index_handlers = [handler for handler in (allocation_handler, rollup_handler) if handler is not None]
+        event_handler = self.__build_event_handler(resume_date, end_date, checkpoint_handler, lean, index_handlers)
+
+        if rollup_handler is not None:
+            rollup_handler.resume(event_handler.balance_entity, event_handler.start_date)
+
+        balance_entity = event_handler.handle_all_events()
+
+        if allocation_handler is not None:
+            allocation_handler.flush()
+            self.allocation_repository.save_indexed_until(max_date.toordinal() + 1)
+
+        if rollup_handler is not None:
+            rollup_handler.flush()
+            self.rollup_repository.save_rolled_up_until(max_date.toordinal() + 1)
+
+        if end_date is None and not self.read_only:
+            checkpoint_handler.flush(balance_entity)
+
+        self.connection.commit()
+
+        return balance_entity
+
+    def __calculate_balance(self, end_date: date, engine: str) -> BalanceEntity:
+        """
+        Private Method to calculate the ledger balance as of the end date.
+
+        Parameters
+        ----------
+        end_date : date
+            The (exclusive) end date.
+
+        engine : str
+            The name of the engine used to calculate the balance.
+
+        Returns
+        --------
+        BalanceEntity
+            An entity containing all the events balance.
+        """
+        if engine == "decimal":
+            return self.__replay(end_date)
+
+        engines = {"fixed": FixedPointCalculateAdvances, "vector": VectorizedCalculateAdvances}
+
+        with record_stage(self.instrumentation, "calculate advances"):
+            return engines[engine](self.event_repository.get_events(end_date), end_date).get_balance()
+
+    def get_balance(self, end_date: date, engine: str = "decimal") -> BalanceEntity:
+        """
+        Method to get the ledger balance as of the end date.
+
+        Parameters
+        ----------
+        end_date : date
+            The (exclusive) end date.
+
+        engine : str
+            The name of the engine used to calculate the balance.
+
+        Returns
+        --------
+        BalanceEntity
+            An entity containing all the events balance.
+
+        Raises
+        ------
+        ValueError
+            If the events belong to more than one customer.
+        """
+        return self.get_balances([end_date], engine)[0]
+
+    def get_balances(
+        self, end_dates: List[date], engine: str = "decimal", with_advances: bool = True
+    ) -> List[BalanceEntity]:
+        """
+        Method to get the ledger balance as of each one of the end dates.
+
+        The balances found in the cache are not calculated again. With the decimal engine, the ledger is resumed
+        from the latest checkpoint before the first missing end date and all the missing balances are taken along
+        a single replay. The other engines calculate each missing balance on its own.
+
+        Parameters
+        ----------
+        end_dates : List[date]
+            The (exclusive) end dates, in ascending order.
+
+        engine : str
+            The name of the engine used to calculate the balances.
+
+        with_advances : bool
+            Whether the balances taken along a single replay keep a copy of the advances. If not, they only have
+            the summary totals and are not saved to the cache.
+
+        Returns
+        --------
+        List[BalanceEntity]
+            An entity containing all the events balance as of each end date.
+
+        Raises
+        ------
+        ValueError
+            If the events belong to more than one customer.
+        """
+        self.check_single_customer()
+
+        balance_entities: Dict[date, BalanceEntity] = {}
+        fingerprint = self.event_repository.get_fingerprint() if self.cache_size else None
+
+        if fingerprint is not None:
+            with record_stage(self.instrumentation, "cache lookup"):
+                for end_date in end_dates:
+                    cached_balance = self.balance_cache_repository.get_balance(
+                        end_date, engine, fingerprint, touch=not self.read_only
+                    )
+
+                    if cached_balance is not None:
+                        balance_entities[end_date] = cached_balance
+
+        missing_end_dates = sorted(set(end_dates) - set(balance_entities))
+
+        if fingerprint is not None and self.instrumentation is not None:
+            self.instrumentation.count("cache hits", len(balance_entities))
+            self.instrumentation.count("cache misses", len(missing_end_dates))
+
+        if engine == "decimal" and len(missing_end_dates) > 1:
+            checkpoint_handler = CheckpointHandler(self.checkpoint_repository, self.checkpoint_interval)
+            event_handler = self.__build_event_handler(
+                missing_end_dates[0], missing_end_dates[-1], checkpoint_handler
+            )
+            missing_balances = event_handler.handle_all_events_as_of(missing_end_dates, with_advances)
+
+        else:
+            missing_balances = [self.__calculate_balance(end_date, engine) for end_date in missing_end_dates]
+
+        for end_date, balance_entity in zip(missing_end_dates, missing_balances):
+            balance_entities[end_date] = balance_entity
+
+            # THE BALANCES WITHOUT THE ADVANCES WOULD BE INCOMPLETE IN THE CACHE
+            if fingerprint is not None and not self.read_only and with_advances:
+                with record_stage(self.instrumentation, "cache save"):
+                    self.balance_cache_repository.save_balance(
+                        end_date, engine, fingerprint, balance_entity, self.cache_size
+                    )
+
+        self.connection.commit()
+
+        return [balance_entities[end_date] for end_date in end_dates]
+
+    def get_latest_balance(self, lean: bool = False) -> Tuple[BalanceEntity, Optional[CheckpointEntity]]:
+        """
+        Method to get the ledger balance right after its last event, without accruing any interest after it.
+
+        The ledger is replayed from the latest checkpoint and a checkpoint of its last event is saved, which is
+        returned along with the balance to tell which event the balance was taken after.
+
+        Parameters
+        ----------
+        lean : bool
+            Whether only the open advances of the checkpoint are restored, so the returned balance does not keep
+            the closed advances restored from it.
+
+        Returns
+        --------
+        Tuple[BalanceEntity, Optional[CheckpointEntity]]
+            An entity containing all the events balance, and the checkpoint of the last event, if any.
+
+        Raises
+        ------
+        ValueError
+            If the events belong to more than one customer.
+        """
+        balance_entity = self.__replay(None, lean)
+
+        return balance_entity, self.checkpoint_repository.get_latest_checkpoint()
+
+    def get_checkpoint_balance(self, lean: bool = False) -> Tuple[BalanceEntity, Optional[CheckpointEntity]]:
+        """
+        Method to get the ledger balance saved in the latest checkpoint, without replaying nor saving anything.
+
+        The events after the returned checkpoint are left for the caller to replay, so it also serves read-only
+        connections.
+
+        Parameters
+        ----------
+        lean : bool
+            Whether only the open advances of the checkpoint are restored.
+
+        Returns
+        --------
+        Tuple[BalanceEntity, Optional[CheckpointEntity]]
+            An entity containing the balance saved in the checkpoint, and the checkpoint itself. If there is no
+            checkpoint matching the stored events, an empty balance and None are returned.
+        """
+        with record_stage(self.instrumentation, "restore checkpoint"):
+            checkpoint = self.checkpoint_repository.get_latest_checkpoint()
+            balance_entity = self.__restore_balance(checkpoint, lean) if checkpoint is not None else None
+
+        if balance_entity is None:
+            return BalanceEntity(), None
+
+        return balance_entity, checkpoint
+
+    def refresh_checkpoints(self, last_event_id: int) -> None:
+        """
+        Method to refresh the checkpoints after new events were inserted.
+
+        Checkpoints placed after the earliest new event are deleted, as the history they were taken from changed,
+        and the ledger is replayed until its last event, saving new checkpoints along the way and a final one with
+        the ledger state as of the last event.
+
+        Since events are only appended, the latest checkpoint usually is the state saved by the previous load, and
+        only its open advances are restored, so the time taken is proportional to the new events.
+
+        Nothing is replayed once the events belong to more than one customer.
+
+        Parameters
+        ----------
+        last_event_id : int
+            The greatest event id before the new events were inserted.
+        """
+        min_new_date = self.event_repository.get_min_date_after(last_event_id)
+
+        if min_new_date is None:
+            return
+
+        self.checkpoint_repository.delete_checkpoints_after(min_new_date)
+
+        # THE LEDGERS OF MANY CUSTOMERS ARE ONLY REPLAYED CUSTOMER BY CUSTOMER, WITHOUT ANY CHECKPOINT
+        if self.event_repository.has_many_customers():
+            self.connection.commit()
+            return
+
+        # THE ALLOCATIONS AND THE ROLLUPS OF THE EVENTS SINCE THE EARLIEST NEW ONE ARE SAVED AGAIN
+        indexed_until = self.allocation_repository.get_indexed_until()
+        if indexed_until is not None and indexed_until > min_new_date.toordinal():
+            self.allocation_repository.save_indexed_until(min_new_date.toordinal())
+
+        rolled_up_until = self.rollup_repository.get_rolled_up_until()
+        if rolled_up_until is not None and rolled_up_until > min_new_date.toordinal():
+            self.rollup_repository.save_rolled_up_until(min_new_date.toordinal())
+
+        self.__replay(None, lean=True)
+
+    def refresh_indexes(self) -> None:
+        """
+        Method to save the allocations and the rollups of the events missing from them, if any.
+
+        The indexes are kept up to date by every load, so only the databases created before them need a replay.
+
+        Raises
+        ------
+        ValueError
+            If the events belong to more than one customer.
+        """
+        max_date = self.event_repository.get_max_date()
+        until_days = (self.allocation_repository.get_indexed_until(), self.rollup_repository.get_rolled_up_until())
+
+        if all(self.__get_stale_date(until, max_date) is None for until in until_days):
+            return
+
+        self.__replay(None, lean=True)
+
+    def get_advance_history(
+        self, advance_id: int
+    ) -> Optional[Tuple[AdvanceView, List[Tuple[int, date, Decimal, Decimal]]]]:
+        """
+        Method to get how an advance was paid down, from the allocations index.
+
+        Parameters
+        ----------
+        advance_id : int
+            The advance id.
+
+        Returns
+        --------
+        Optional[Tuple[AdvanceView, List[Tuple[int, date, Decimal, Decimal]]]]
+            A view of the advance, with its balance after its last event, and the (event_id, event_date, amount,
+            balance) of each allocation to it, starting from the advance event itself, with the balance left after
+            each one. The payments that allocated less than half a cent to it are left out. None if there is no such
+            advance.
+
+        Raises
+        ------
+        ValueError
+            If the events belong to more than one customer.
+        """
+        self.check_single_customer()
+        self.refresh_indexes()
+
+        allocations = self.allocation_repository.get_allocations(advance_id)
+        if not allocations:
+            return None
+
+        advance_event = self.event_repository.get_event(allocations[0][0])
+        initial_amount = to_amount(advance_event[2], advance_event[4])
+        current_balance = initial_amount
+        history = []
+
+        for index, (event_id, event_date, amount) in enumerate(allocations):
+            current_balance -= amount
+
+            # A PAYMENT THAT ONLY COVERED THE INTEREST MAY LEAVE LESS THAN HALF A CENT, WHICH IS NOT LISTED
+            if index and not amount.quantize(Decimal("0.01")):
+                continue
+
+            history.append((event_id, event_date, amount, current_balance))
+
+        return AdvanceView(advance_id, allocations[0][1], initial_amount, current_balance), history
+
+    def get_monthly_rollups(
+        self,
+        from_month: Optional[date] = None,
+        to_month: Optional[date] = None
+    ) -> List[Tuple[date, Decimal, Decimal, Decimal, Decimal]]:
+        """
+        Method to get the monthly rollups between two months, from the rollups table.
+
+        The interest is rolled up as it is accrued by the events, so no interest is accrued after the last event.
+
+        Parameters
+        ----------
+        from_month : Optional[date]
+            The first day of the first month. If None, the rollups start from the first one.
+
+        to_month : Optional[date]
+            The first day of the last (inclusive) month. If None, the rollups go until the last one.
+
+        Returns
+        --------
+        List[Tuple[date, Decimal, Decimal, Decimal, Decimal]]
+            The (month, principal_advanced, principal_repaid, interest_accrued, interest_paid) of each month with
+            any event or accrued interest.
+
+        Raises
+        ------
+        ValueError
+            If the events belong to more than one customer.
+        """
+        self.check_single_customer()
+
+        if not self.read_only:
+            self.refresh_indexes()
+
+        return self.rollup_repository.get_rollups(from_month, to_month)
+
+    def refresh_cache(self, last_event_id: int, previous_fingerprint: str) -> None:
+        """
+        Method to invalidate the cached balances that changed after new events were inserted.
+
+        Parameters
+        ----------
+        last_event_id : int
+            The greatest event id before the new events were inserted.
+
+        previous_fingerprint : str
+            The events fingerprint before the new events were inserted.
+        """
+        min_new_date = self.event_repository.get_min_date_after(last_event_id)
+
+        if min_new_date is None:
+            return
+
+        self.balance_cache_repository.invalidate_after(
+            min_new_date, previous_fingerprint, self.event_repository.get_fingerprint()
+        )
+        self.connection.commit()
@@ -0,0 +1,702 @@
+"""
+Module containing the 'LoadHandler' Class.
+"""
+
+import bz2
+import contextlib
+import csv
+import gzip
+import io
+import lzma
+import os
+import sqlite3
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ..repositories import EventRepository, LoadOffsetRepository
+from ..repositories.event_repository import encode_event
+
+
+# A PARSED CHUNK OF A CSV FILE: THE ENCODED EVENTS, THE REJECTED LINES, HOW MANY EVENTS ARE DATED BEFORE A PREVIOUS
+# EVENT OF THE CHUNK AND THE DATES OF ALL THE OTHER EVENTS, WHICH ARE IN ORDER
+ParsedChunk = Tuple[List[Tuple[Any, ...]], List[Tuple[int, str, str]], int, array]
+
+# THE MAGIC BYTES THE SUPPORTED COMPRESSED FILES START WITH, AND THE MODULE THAT DECOMPRESSES THEM
+COMPRESSIONS = ((b"\x1f\x8b", gzip), (b"BZh", bz2), (b"\xfd7zXZ\x00", lzma))
+
+# THE SOURCE PATH THAT MEANS THE STANDARD INPUT
+STDIN_PATH = "-"
+
+
+def encode_row(row: Sequence[str]) -> Tuple[Any, ...]:
+    """
+    Function to validate a CSV row and encode it as the event is stored.
+
+    Parameters
+    ----------
+    row : Sequence[str]
+        The CSV row, in the `TYPE,DATE,AMOUNT[,CUSTOMER]` format. Rows without a customer belong to the default
+        customer.
+
+    Returns
+    --------
+    Tuple[Any, ...]
+        The (type_code, cents, date_created, exact_amount, customer_id) of the event.
+
+    Raises
+    ------
+    ValueError
+        If the row does not have 3 or 4 fields, or if the event is invalid.
+    """
+    if len(row) not in (3, 4):
+        raise ValueError(f"expected 3 or 4 fields, found {len(row)}")
+
+    customer_id = row[3] if len(row) > 3 and row[3] else EventRepository.DEFAULT_CUSTOMER_ID
+
+    return encode_event(row[0], row[2], row[1], customer_id)
+
+
+def parse_lines(lines: Iterable[Tuple[int, bytes]]) -> ParsedChunk:
+    """
+    Function to parse, validate and encode some lines of a CSV file.
+
+    Blank lines are skipped. Events dated before a previous event are still valid, as the ledger is replayed in date
+    order, but they are counted.
+
+    Parameters
+    ----------
+    lines : Iterable[Tuple[int, bytes]]
+        The byte offset of each line in the file and the line itself.
+
+    Returns
+    --------
+    ParsedChunk
+        The encoded events, the (offset, reason, line) of each rejected line, how many events are dated before a
+        previous event and the dates of all the other events.
+    """
+    events = []
+    rejects = []
+    out_of_order = 0
+    in_order_dates = array("i")
+
+    for offset, line in lines:
+        try:
+            text = line.decode().rstrip("\r\n")
+
+        except UnicodeDecodeError:
+            rejects.append((offset, "invalid UTF-8 text", line.decode(errors="replace").rstrip("\r\n")))
+            continue
+
+        if not text.strip():
+            continue
+
+        try:
+            event = encode_row(next(csv.reader([text])))
+
+        except (ValueError, csv.Error) as error:
+            rejects.append((offset, str(error), text))
+            continue
+
+        events.append(event)
+
+        if in_order_dates and event[2] < in_order_dates[-1]:
+            out_of_order += 1
+        else:
+            in_order_dates.append(event[2])
+
+    return events, rejects, out_of_order, in_order_dates
+
+
+def parse_chunk(source_path: str, start: int, end: int) -> ParsedChunk:
+    """
+    Function to parse, validate and encode the lines in a byte range of a CSV file, in a worker process.
+
+    Parameters
+    ----------
+    source_path : str
+        The path of the CSV file.
+
+    start : int
+        The byte offset of the first line of the chunk.
+
+    end : int
+        The byte offset right after the last line of the chunk.
+
+    Returns
+    --------
+    ParsedChunk
+        The parsed chunk, as returned by `parse_lines`.
+    """
+    with open(source_path, "rb") as source_f:
+        source_f.seek(start)
+        data = source_f.read(end - start)
+
+    def iter_lines() -> Iterator[Tuple[int, bytes]]:
+        offset = start
+
+        for line in data.split(b"\n"):
+            yield offset, line
+            offset += len(line) + 1
+
+    return parse_lines(iter_lines())
+
+
+def get_chunks(source_path: str, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Function to split a file in byte ranges of about the same size, each one ending at the end of a line.
+
+    Parameters
+    ----------
+    source_path : str
+        The path of the file.
+
+    chunk_size : int
+        The approximate size of each range, in bytes.
+
+    Returns
+    --------
+    List[Tuple[int, int]]
+        The (start, end) byte offsets of each range, in order.
+    """
+    chunks = []
+
+    with open(source_path, "rb") as source_f:
+        size = os.fstat(source_f.fileno()).st_size
+        start = 0
+
+        while start < size:
+            source_f.seek(min(start + chunk_size, size))
+            source_f.readline()
+            end = min(source_f.tell(), size)
+
+            chunks.append((start, end))
+            start = end
+
+    return chunks
+
+
+def open_compressed(source_f: BinaryIO) -> Optional[BinaryIO]:
+    """
+    Function to open a stream that decompresses a file, if the file is compressed.
+
+    The compression is found from the first bytes of the file, so it does not depend on the file name and it works
+    for pipes as well.
+
+    Parameters
+    ----------
+    source_f : BinaryIO
+        The file, open for buffered binary reading. Nothing is consumed from it.
+
+    Returns
+    --------
+    Optional[BinaryIO]
+        A stream over the decompressed file, or None if the file is not compressed.
+    """
+    magic = source_f.peek(max(len(signature) for signature, _ in COMPRESSIONS))
+
+    for signature, module in COMPRESSIONS:
+        if magic.startswith(signature):
+            return module.open(source_f, "rb")
+
+    return None
+
+
+def read_chunks(source_f: BinaryIO, chunk_size: int) -> Iterator[Tuple[List[Tuple[int, bytes]]]]:
+    """
+    Function to read a stream in chunks of whole lines.
+
+    Parameters
+    ----------
+    source_f : BinaryIO
+        The stream, open for binary reading.
+
+    chunk_size : int
+        The approximate size of each chunk, in bytes.
+
+    Yields
+    -------
+    Tuple[List[Tuple[int, bytes]]]
+        The byte offset of each line of the chunk in the stream and the line itself, as the only argument of
+        `parse_lines`.
+    """
+    offset = 0
+    lines = source_f.readlines(chunk_size)
+
+    while lines:
+        chunk = []
+
+        for line in lines:
+            chunk.append((offset, line))
+            offset += len(line)
+
+        yield (chunk,)
+        lines = source_f.readlines(chunk_size)
+
+
+class LoadHandler():
+    """
+    Class to bulk load events into the database.
+
+    Large files are split in byte ranges, which are parsed, validated and encoded in a pool of worker processes,
+    while this process is the single writer that inserts the encoded events in the order of the file. The events are
+    inserted in batches, each one with a single `executemany` call inside its own transaction, while the database
+    runs with relaxed durability pragmas that are restored once the load is over.
+
+    Files compressed with gzip, bzip2 or xz, and the standard input, are read as a stream instead, and decompressed
+    as they are read, so they are never written to the disk uncompressed. The chunks of lines read from the stream
+    are parsed in the pool in the same way.
+
+    Invalid lines are not loaded, but reported with their byte offset in the (decompressed) file. Events dated
+    before a previous event of the file are loaded, since the ledger is replayed in date order anyway, but they are
+    counted, across the boundaries of the ranges as well.
+
+    Attributes
+    ----------
+    connection : sqlite3.Connection
+        The connection to the database.
+
+    batch_size : int
+        How many events are inserted in each batch.
+
+    defer_index : bool
+        Whether the events date index is dropped during the load and built again at the end.
+
+    max_workers : Optional[int]
+        How many worker processes parse the files. If 1, they are parsed in this process.
+
+    chunk_size : int
+        The approximate size, in bytes, of the ranges the files are split in.
+
+    event_repository : EventRepository
+        A reference to insert the events.
+
+    load_offset_repository : LoadOffsetRepository
+        A reference to remember how many bytes of each source file were already loaded.
+
+    rejected : int
+        How many lines the last load rejected.
+
+    out_of_order : int
+        How many events of the last load are dated before a previous event of it.
+
+    last_date : Optional[int]
+        The day ordinal of the latest event of the last load, if any.
+    """
+    connection: sqlite3.Connection
+    batch_size: int
+    defer_index: bool
+    max_workers: Optional[int]
+    chunk_size: int
+
+    event_repository: EventRepository
+    load_offset_repository: LoadOffsetRepository
+
+    rejected: int
+    out_of_order: int
+    last_date: Optional[int]
+
+    DEFAULT_BATCH_SIZE = 10000
+    DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+    LOAD_PRAGMAS = {"journal_mode": "memory", "synchronous": "off"}
+
+    def __init__(
+        self,
+        connection: sqlite3.Connection,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        defer_index: bool = False,
+        max_workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            The connection to the database.
+
+        batch_size : int
+            How many events are inserted in each batch.
+
+        defer_index : bool
+            Whether the events date index is dropped during the load and built again at the end.
+
+        max_workers : Optional[int]
+            How many worker processes parse the files. If None, one per CPU is used.
+
+        chunk_size : int
+            The approximate size, in bytes, of the ranges the files are split in.
+        """
+        self.connection = connection
+        self.batch_size = batch_size
+        self.defer_index = defer_index
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+
+        self.event_repository = EventRepository(connection)
+        self.load_offset_repository = LoadOffsetRepository(connection)
+
+        self.rejected = 0
+        self.out_of_order = 0
+        self.last_date = None
+
+    def __set_pragmas(self, pragmas: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Private Method to set some pragmas of the connection.
+
+        Parameters
+        ----------
+        pragmas : Dict[str, Any]
+            The values of the pragmas to be set, by pragma name.
+
+        Returns
+        --------
+        Dict[str, Any]
+            The previous values of the pragmas, by pragma name.
+        """
+        previous = {}
+
+        for pragma, value in pragmas.items():
+            previous[pragma] = self.connection.execute(f"pragma {pragma};").fetchone()[0]
+            self.connection.execute(f"pragma {pragma} = {value};")
+
+        return previous
+
+    def __load(
+        self,
+        rows: Iterable[Any],
+        insert_batch: Callable[[List[Any]], int],
+        on_batch: Optional[Callable[[int, float], None]] = None
+    ) -> int:
+        """
+        Private Method to insert the given rows in batches, with the load pragmas set.
+
+        Parameters
+        ----------
+        rows : Iterable[Any]
+            The rows to be inserted.
+
+        insert_batch : Callable[[List[Any]], int]
+            A function that inserts a batch of rows and returns how many events it inserted.
+
+        on_batch : Optional[Callable[[int, float], None]]
+            A function called after each batch with the number of loaded events and the elapsed seconds.
+
+        Returns
+        --------
+        int
+            How many events were loaded.
+        """
+        loaded = 0
+        start = time.perf_counter()
+
+        self.connection.commit()
+        previous_pragmas = self.__set_pragmas(self.LOAD_PRAGMAS)
+
+        if self.defer_index:
+            self.event_repository.drop_date_index()
+
+        try:
+            rows = iter(rows)
+            batch: List[Any] = list(islice(rows, self.batch_size))
+
+            while batch:
+                loaded += insert_batch(batch)
+                self.connection.commit()
+
+                if on_batch is not None:
+                    on_batch(loaded, time.perf_counter() - start)
+
+                batch = list(islice(rows, self.batch_size))
+
+        finally:
+            if self.defer_index:
+                self.event_repository.create_date_index()
+
+            self.connection.commit()
+            self.__set_pragmas(previous_pragmas)
+
+        return loaded
+
+    def __insert_rows(self, rows: List[Tuple[Any, ...]]) -> int:
+        """
+        Private Method to insert a batch of encoded events.
+
+        Parameters
+        ----------
+        rows : List[Tuple[Any, ...]]
+            The (type_code, cents, date_created, exact_amount, customer_id) of each event.
+
+        Returns
+        --------
+        int
+            How many events were inserted.
+        """
+        self.event_repository.insert_rows(rows)
+
+        return len(rows)
+
+    def __reset_checks(self) -> None:
+        """
+        Private Method to reset the counters and the latest date checked, before a new load.
+        """
+        self.rejected = 0
+        self.out_of_order = 0
+        self.last_date = None
+
+    def __check_chunk(
+        self,
+        parsed_chunk: ParsedChunk,
+        on_reject: Optional[Callable[[int, str, str], None]] = None
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Private Method to report the rejected lines of a parsed chunk and count its events out of order.
+
+        Parameters
+        ----------
+        parsed_chunk : ParsedChunk
+            The parsed chunk, which must come right after the chunks checked before in the same load.
+
+        on_reject : Optional[Callable[[int, str, str], None]]
+            A function called with the byte offset, the reason and the text of each rejected line.
+
+        Returns
+        --------
+        List[Tuple[Any, ...]]
+            The encoded events of the chunk.
+        """
+        events, rejects, out_of_order, in_order_dates = parsed_chunk
+
+        self.rejected += len(rejects)
+        if on_reject is not None:
+            for reject in rejects:
+                on_reject(*reject)
+
+        # THE EVENTS IN ORDER INSIDE THE CHUNK ARE SORTED, SO THE ONES BEFORE THE PREVIOUS CHUNKS ARE A PREFIX
+        self.out_of_order += out_of_order
+        if self.last_date is not None:
+            self.out_of_order += bisect_left(in_order_dates, self.last_date)
+
+        if in_order_dates and (self.last_date is None or in_order_dates[-1] > self.last_date):
+            self.last_date = in_order_dates[-1]
+
+        return events
+
+    @staticmethod
+    def __parse_chunks(
+        parse: Callable[..., ParsedChunk],
+        chunks: Iterable[Tuple[Any, ...]],
+        max_workers: int
+    ) -> Iterator[ParsedChunk]:
+        """
+        Private Method to parse chunks of a CSV file, in a pool of worker processes if there are many workers.
+
+        Parameters
+        ----------
+        parse : Callable[..., ParsedChunk]
+            The function that parses a chunk.
+
+        chunks : Iterable[Tuple[Any, ...]]
+            The arguments of the function for each chunk, in the order of the file.
+
+        max_workers : int
+            How many worker processes parse the chunks. If 1, they are parsed in this process.
+
+        Yields
+        -------
+        ParsedChunk
+            Each parsed chunk, in the order of the file.
+        """
+        if max_workers <= 1:
+            for chunk in chunks:
+                yield parse(*chunk)
+
+            return
+
+        with ProcessPoolExecutor(max_workers) as executor:
+            # ONLY A FEW CHUNKS ARE PARSED AHEAD OF THE WRITER, SO THE FILE IS NEVER HELD IN MEMORY AT ONCE
+            chunks = iter(chunks)
+            pending = deque(executor.submit(parse, *chunk) for chunk in islice(chunks, 2 * max_workers))
+
+            while pending:
+                parsed_chunk = pending.popleft().result()
+
+                for chunk in islice(chunks, 1):
+                    pending.append(executor.submit(parse, *chunk))
+
+                yield parsed_chunk
+
+    def __parse_file(self, source_path: str) -> Iterator[ParsedChunk]:
+        """
+        Private Method to parse the chunks of a CSV file, a compressed CSV file or the standard input.
+
+        Parameters
+        ----------
+        source_path : str
+            The path of the file, or `-` for the standard input.
+
+        Yields
+        -------
+        ParsedChunk
+            Each parsed chunk, in the order of the file.
+        """
+        max_workers = self.max_workers or os.cpu_count() or 1
+
+        with contextlib.ExitStack() as stack:
+            if source_path == STDIN_PATH:
+                source_f = sys.stdin.buffer
+
+                # THE STANDARD INPUT MAY NOT BE BUFFERED, BUT ITS FIRST BYTES MUST BE PEEKED AT
+                if not hasattr(source_f, "peek"):
+                    source_f = io.BufferedReader(source_f)
+
+            else:
+                source_f = stack.enter_context(open(source_path, "rb"))
+
+            stream = open_compressed(source_f)
+
+            if stream is None and source_path != STDIN_PATH:
+                chunks = [(source_path, *chunk) for chunk in get_chunks(source_path, self.chunk_size)]
+                yield from self.__parse_chunks(parse_chunk, chunks, min(max_workers, len(chunks)))
+                return
+
+            if stream is not None:
+                source_f = stack.enter_context(stream)
+
+            yield from self.__parse_chunks(parse_lines, read_chunks(source_f, self.chunk_size), max_workers)
+
+    def load(
+        self,
+        source_path: str,
+        on_batch: Optional[Callable[[int, float], None]] = None,
+        on_reject: Optional[Callable[[int, str, str], None]] = None
+    ) -> int:
+        """
+        Method to load the events of a CSV file.
+
+        Parameters
+        ----------
+        source_path : str
+            The path of the CSV file, with `TYPE,DATE,AMOUNT[,CUSTOMER]` rows, or `-` for the standard input. The
+            file may be compressed with gzip, bzip2 or xz. Rows without a customer are loaded to the default
+            customer.
+
+        on_batch : Optional[Callable[[int, float], None]]
+            A function called after each batch with the number of loaded events and the elapsed seconds.
+
+        on_reject : Optional[Callable[[int, str, str], None]]
+            A function called with the byte offset, the reason and the text of each rejected line.
+
+        Returns
+        --------
+        int
+            How many events were loaded.
+        """
+        self.__reset_checks()
+        events = (
+            event
+            for parsed_chunk in self.__parse_file(source_path)
+            for event in self.__check_chunk(parsed_chunk, on_reject)
+        )
+
+        return self.__load(events, self.__insert_rows, on_batch)
+
+    def load_encoded(
+        self,
+        events: Iterable[Tuple[Any]],
+        on_batch: Optional[Callable[[int, float], None]] = None
+    ) -> int:
+        """
+        Method to load events that are already encoded, to the default customer.
+
+        Parameters
+        ----------
+        events : Iterable[Tuple[Any]]
+            The (id, type_code, cents, date_created, exact_amount) rows of the events. Their ids are not kept.
+
+        on_batch : Optional[Callable[[int, float], None]]
+            A function called after each batch with the number of loaded events and the elapsed seconds.
+
+        Returns
+        --------
+        int
+            How many events were loaded.
+        """
+        def insert_batch(batch: List[Tuple[Any]]) -> int:
+            self.event_repository.insert_encoded_events(batch)
+            return len(batch)
+
+        return self.__load(events, insert_batch, on_batch)
+
+    def load_appended(
+        self,
+        source_path: str,
+        on_batch: Optional[Callable[[int, float], None]] = None,
+        on_reject: Optional[Callable[[int, str, str], None]] = None
+    ) -> int:
+        """
+        Method to load only the lines appended to a CSV file since the previous time it was loaded by this method.
+
+        Only complete lines are loaded, so a line that is still being written is left for the next time. The byte
+        offset the next load starts from is saved in the same transaction as each batch, so a load that is
+        interrupted never loads any line twice. A file shorter than its saved offset was replaced, so it is
+        loaded again from its start.
+
+        Parameters
+        ----------
+        source_path : str
+            The path of the CSV file, with `TYPE,DATE,AMOUNT[,CUSTOMER]` rows.
+
+        on_batch : Optional[Callable[[int, float], None]]
+            A function called after each batch with the number of loaded events and the elapsed seconds.
+
+        on_reject : Optional[Callable[[int, str, str], None]]
+            A function called with the byte offset, the reason and the text of each rejected line.
+
+        Returns
+        --------
+        int
+            How many events were loaded.
+
+        Raises
+        ------
+        ValueError
+            If the file is compressed, since its appended lines can not be found by their offset.
+        """
+        source_path = os.path.realpath(source_path)
+        self.__reset_checks()
+
+        def read_lines(source_f: Any, offset: int) -> Iterator[Tuple[int, bytes]]:
+            source_f.seek(offset)
+
+            for line in source_f:
+                if not line.endswith(b"\n"):
+                    return
+
+                yield offset, line
+                offset += len(line)
+
+        def insert_batch(batch: List[Tuple[int, bytes]]) -> int:
+            events = self.__check_chunk(parse_lines(batch), on_reject)
+
+            self.event_repository.insert_rows(events)
+            self.load_offset_repository.save_offset(source_path, batch[-1][0] + len(batch[-1][1]))
+
+            return len(events)
+
+        with open(source_path, "rb") as source_f:
+            if open_compressed(source_f) is not None:
+                raise ValueError(f"{source_path} is compressed, so its appended lines can not be loaded")
+
+            offset = self.load_offset_repository.get_offset(source_path)
+
+            if os.fstat(source_f.fileno()).st_size < offset:
+                offset = 0
+
+            return self.__load(read_lines(source_f, offset), insert_batch, on_batch)
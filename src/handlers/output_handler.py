@@ -0,0 +1,337 @@
+"""
+Module containing the 'OutputHandler' Class.
+"""
+
+import csv
+import json
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional
+
+from .portfolio_handler import PortfolioHandler
+from ..entities import BalanceEntity
+
+
+class OutputHandler():
+    """
+    Class to write the balances in a fixed-width table, in CSV or in JSON Lines.
+
+    The output is buffered and written in chunks of many lines, instead of one write per line, so large ledgers
+    are streamed without paying a write call per advance.
+
+    The CSV and JSON Lines formats write one record per line: an `advance` record for each displayed advance, a
+    `customer` record for each customer and a `summary` record for each balance, all of them with the date the
+    balance is as of. The CSV columns are always the same, so the fields that do not apply to a record are empty,
+    and the JSON Lines records only have the fields that apply to them. Amounts are written with two decimal
+    places, as in the table.
+
+    Attributes
+    ----------
+    writer : Callable[[str], None]
+        The function that writes a chunk of the output.
+
+    output_format : str
+        The name of the output format.
+
+    open_only : bool
+        Whether only the advances with a current balance are displayed.
+
+    limit : Optional[int]
+        The maximum number of advances displayed for each balance, if any.
+
+    buffer_size : int
+        How many pieces of the output are buffered before they are written.
+
+    buffer : List[str]
+        The pieces of the output that were not written yet.
+
+    csv_writer : Optional[Any]
+        The CSV writer over this handler, if the output format is CSV.
+
+    advances_written : int
+        How many advances were displayed.
+    """
+    writer: Callable[[str], None]
+    output_format: str
+    open_only: bool
+    limit: Optional[int]
+    buffer_size: int
+
+    buffer: List[str]
+    csv_writer: Optional[Any]
+    advances_written: int
+
+    FORMATS = ("table", "csv", "jsonl")
+    DEFAULT_BUFFER_SIZE = 4096
+    CSV_FIELDS = (
+        "as_of",
+        "record",
+        "customer",
+        "identifier",
+        "date",
+        "initial_amount",
+        "current_balance",
+        "advance_balance",
+        "interest_payable_balance",
+        "interest_paid",
+        "payments_for_future",
+    )
+
+    def __init__(
+        self,
+        writer: Callable[[str], None],
+        output_format: str = "table",
+        open_only: bool = False,
+        limit: Optional[int] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE
+    ) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        writer : Callable[[str], None]
+            The function that writes a chunk of the output.
+
+        output_format : str
+            The name of the output format.
+
+        open_only : bool
+            Whether only the advances with a current balance are displayed.
+
+        limit : Optional[int]
+            The maximum number of advances displayed for each balance, if any.
+
+        buffer_size : int
+            How many pieces of the output are buffered before they are written.
+        """
+        self.writer = writer
+        self.output_format = output_format
+        self.open_only = open_only
+        self.limit = limit
+        self.buffer_size = buffer_size
+
+        self.buffer = []
+        self.advances_written = 0
+
+        self.csv_writer = csv.writer(self, lineterminator="\n") if output_format == "csv" else None
+        if self.csv_writer is not None:
+            self.csv_writer.writerow(self.CSV_FIELDS)
+
+    def write(self, text: str) -> None:
+        """
+        Method to buffer a piece of the output, writing the buffer when it is full.
+
+        Parameters
+        ----------
+        text : str
+            The piece of the output.
+        """
+        self.buffer.append(text)
+
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Method to write all the buffered output.
+        """
+        if self.buffer:
+            self.writer("".join(self.buffer))
+            self.buffer = []
+
+    def __write_record(self, record: Dict[str, Any]) -> None:
+        """
+        Private Method to write a record in the CSV or in the JSON Lines format.
+
+        Parameters
+        ----------
+        record : Dict[str, Any]
+            The fields of the record, by name.
+        """
+        if self.csv_writer is not None:
+            self.csv_writer.writerow([record.get(field, "") for field in self.CSV_FIELDS])
+
+        else:
+            self.write(json.dumps(record) + "\n")
+
+    def __get_advance_rows(self, balance_entity: BalanceEntity) -> Any:
+        """
+        Private Method to get the advances to be displayed.
+
+        Parameters
+        ----------
+        balance_entity : BalanceEntity
+            The balance with the advances.
+
+        Returns
+        --------
+        Any
+            An iterator over the (id, event_date, initial_amount, current_balance) of each advance displayed.
+        """
+        rows = balance_entity.advances.rows(self.open_only)
+
+        return islice(rows, self.limit) if self.limit is not None else rows
+
+    def __write_summary(self, balance_entity: BalanceEntity, title: str) -> None:
+        """
+        Private Method to write the summary statistics of a balance as a table.
+
+        Parameters
+        ----------
+        balance_entity : BalanceEntity
+            The balance to be written.
+
+        title : str
+            The title of the summary.
+        """
+        self.write(
+            f"\n{title}:\n"
+            "----------------------------------------------------------\n"
+            f"Aggregate Advance Balance: {balance_entity.advance_balance:31.2f}\n"
+            f"Interest Payable Balance: {balance_entity.interest_payable_balance:32.2f}\n"
+            f"Total Interest Paid: {balance_entity.interest_paid:37.2f}\n"
+            f"Balance Applicable to Future Advances: {balance_entity.payments_for_future:>19.2f}\n"
+        )
+
+    @staticmethod
+    def __get_summary_fields(balance_entity: BalanceEntity) -> Dict[str, str]:
+        """
+        Private Method to get the summary statistics of a balance as record fields.
+
+        Parameters
+        ----------
+        balance_entity : BalanceEntity
+            The balance.
+
+        Returns
+        --------
+        Dict[str, str]
+            The summary statistics, by field name.
+        """
+        return {
+            "advance_balance": f"{balance_entity.advance_balance:.2f}",
+            "interest_payable_balance": f"{balance_entity.interest_payable_balance:.2f}",
+            "interest_paid": f"{balance_entity.interest_paid:.2f}",
+            "payments_for_future": f"{balance_entity.payments_for_future:.2f}",
+        }
+
+    def write_heading(self, as_of: date, index: int) -> None:
+        """
+        Method to write the heading of the balances as of a date, when there are many dates.
+
+        Only the table has headings, since every record of the other formats has its date.
+
+        Parameters
+        ----------
+        as_of : date
+            The date the balances are as of.
+
+        index : int
+            The position of the date, so the headings after the first one are separated by a blank line.
+        """
+        if self.output_format != "table":
+            return
+
+        if index:
+            self.write("\n")
+
+        self.write(
+            f"Balances as of {as_of.isoformat()}\n"
+            "==========================================================\n"
+        )
+
+    def write_balance(self, balance_entity: BalanceEntity, as_of: date) -> None:
+        """
+        Method to write the advances and the summary statistics of a balance.
+
+        Parameters
+        ----------
+        balance_entity : BalanceEntity
+            The balance to be written.
+
+        as_of : date
+            The date the balance is as of.
+        """
+        rows = self.__get_advance_rows(balance_entity)
+
+        if self.output_format == "table":
+            self.write(
+                "Advances:\n"
+                "----------------------------------------------------------\n"
+                f"{'Identifier':>10}{'Date':>11}{'Initial Amt':>17}{'Current Balance':>20}\n"
+            )
+
+            for advance_id, advance_date, initial_amount, current_balance in rows:
+                # THE ISO FORMAT IS THE SAME AS `strftime`, BUT MUCH FASTER, FOR THE YEARS WITH FOUR DIGITS
+                formatted_date = (
+                    advance_date.isoformat() if advance_date.year >= 1000
+                    else datetime.strftime(advance_date, "%Y-%m-%d")
+                )
+
+                self.write(
+                    f"{advance_id:>10}{formatted_date:>11}"
+                    f"{initial_amount:>17.2f}{current_balance:>20.2f}\n"
+                )
+                self.advances_written += 1
+
+            self.__write_summary(balance_entity, "Summary Statistics")
+            return
+
+        as_of = as_of.isoformat()
+
+        for advance_id, advance_date, initial_amount, current_balance in rows:
+            self.__write_record({
+                "as_of": as_of,
+                "record": "advance",
+                "identifier": advance_id,
+                "date": advance_date.isoformat(),
+                "initial_amount": f"{initial_amount:.2f}",
+                "current_balance": f"{current_balance:.2f}",
+            })
+            self.advances_written += 1
+
+        self.__write_record({"as_of": as_of, "record": "summary", **self.__get_summary_fields(balance_entity)})
+
+    def write_customer_balances(self, customer_balances: Dict[str, BalanceEntity], as_of: date) -> None:
+        """
+        Method to write the summary statistics of each customer and of the whole portfolio.
+
+        Parameters
+        ----------
+        customer_balances : Dict[str, BalanceEntity]
+            The balance of each customer, by customer id.
+
+        as_of : date
+            The date the balances are as of.
+        """
+        totals = PortfolioHandler.get_totals(list(customer_balances.values()))
+
+        if self.output_format == "table":
+            self.write(
+                "Customers:\n"
+                "----------------------------------------------------------\n"
+                f"{'Customer':<16}{'Advance Bal':>15}{'Interest Due':>15}{'Interest Paid':>15}{'Future':>15}\n"
+            )
+
+            for customer_id, balance_entity in customer_balances.items():
+                self.write(
+                    f"{customer_id:<16}{balance_entity.advance_balance:>15.2f}"
+                    f"{balance_entity.interest_payable_balance:>15.2f}"
+                    f"{balance_entity.interest_paid:>15.2f}{balance_entity.payments_for_future:>15.2f}\n"
+                )
+
+            self.__write_summary(totals, "Portfolio Totals")
+            return
+
+        as_of = as_of.isoformat()
+
+        for customer_id, balance_entity in customer_balances.items():
+            self.__write_record({
+                "as_of": as_of,
+                "record": "customer",
+                "customer": customer_id,
+                **self.__get_summary_fields(balance_entity)
+            })
+
+        self.__write_record({"as_of": as_of, "record": "summary", **self.__get_summary_fields(totals)})
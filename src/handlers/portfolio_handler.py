@@ -0,0 +1,224 @@
+"""
+Module containing the 'PortfolioHandler' Class.
+"""
+
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional
+from urllib.request import pathname2url
+
+from .event_handler import EventHandler
+from ..entities import BalanceEntity
+from ..repositories import EventRepository
+from ..use_cases import FixedPointCalculateAdvances, VectorizedCalculateAdvances
+
+
+# CONNECTION OF EACH WORKER PROCESS, OPENED ONCE BY `connect_worker`
+worker_connection: Optional[sqlite3.Connection] = None
+
+
+def calculate_customer_balances(
+    connection: sqlite3.Connection,
+    customer_id: str,
+    end_dates: List[date],
+    engine: str = "decimal",
+    with_advances: bool = True
+) -> List[BalanceEntity]:
+    """
+    Function to calculate the balances of a single customer, replaying only the events of that customer.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        The connection to the database.
+
+    customer_id : str
+        The id of the customer.
+
+    end_dates : List[date]
+        The (exclusive) end dates, in ascending order.
+
+    engine : str
+        The name of the engine used to calculate the balances.
+
+    with_advances : bool
+        Whether the balances taken along a single replay keep a copy of the advances, or only the summary totals.
+
+    Returns
+    --------
+    List[BalanceEntity]
+        An entity containing all the customer events balance as of each end date.
+    """
+    event_repository = EventRepository(connection)
+
+    if engine == "decimal":
+        events = event_repository.get_customer_events(customer_id, end_dates[-1])
+        return EventHandler(events, end_dates[-1]).handle_all_events_as_of(end_dates, with_advances)
+
+    engines = {"fixed": FixedPointCalculateAdvances, "vector": VectorizedCalculateAdvances}
+
+    return [
+        engines[engine](event_repository.get_customer_events(customer_id, end_date), end_date).get_balance()
+        for end_date in end_dates
+    ]
+
+
+def connect_worker(db_path: str) -> None:
+    """
+    Function to open the read-only connection of a worker process.
+
+    Parameters
+    ----------
+    db_path : str
+        The path of the database.
+    """
+    global worker_connection
+    worker_connection = sqlite3.connect(f"file:{pathname2url(db_path)}?mode=ro", uri=True)
+
+
+def calculate_worker_balances(
+    customer_id: str, end_dates: List[date], engine: str, with_advances: bool
+) -> List[BalanceEntity]:
+    """
+    Function to calculate the balances of a single customer in a worker process.
+
+    Parameters
+    ----------
+    customer_id : str
+        The id of the customer.
+
+    end_dates : List[date]
+        The (exclusive) end dates, in ascending order.
+
+    engine : str
+        The name of the engine used to calculate the balances.
+
+    with_advances : bool
+        Whether the balances taken along a single replay keep a copy of the advances, or only the summary totals.
+
+    Returns
+    --------
+    List[BalanceEntity]
+        An entity containing all the customer events balance as of each end date.
+    """
+    return calculate_customer_balances(worker_connection, customer_id, end_dates, engine, with_advances)
+
+
+class PortfolioHandler():
+    """
+    Class to handle the ledgers of all the customers.
+
+    The ledger of each customer is independent from the other ones, so each customer is replayed on its own,
+    in a pool of worker processes, each one with its own read-only connection to the database. The customer
+    ledgers are replayed from their first event, without the checkpoints and the balances cache, which are only
+    kept for databases holding the events of a single customer.
+
+    Attributes
+    ----------
+    db_path : str
+        The path of the database.
+
+    max_workers : Optional[int]
+        How many worker processes replay the customer ledgers. If 1, they are replayed in this process.
+    """
+    db_path: str
+    max_workers: Optional[int]
+
+    def __init__(self, db_path: str, max_workers: Optional[int] = None) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        db_path : str
+            The path of the database.
+
+        max_workers : Optional[int]
+            How many worker processes replay the customer ledgers. If None, one per CPU is used.
+        """
+        self.db_path = db_path
+        self.max_workers = max_workers
+
+    def get_balances(
+        self,
+        end_dates: List[date],
+        engine: str = "decimal",
+        customer_ids: Optional[List[str]] = None,
+        with_advances: bool = True
+    ) -> Dict[str, List[BalanceEntity]]:
+        """
+        Method to get the balances of each customer as of each one of the end dates.
+
+        Parameters
+        ----------
+        end_dates : List[date]
+            The (exclusive) end dates, in ascending order.
+
+        engine : str
+            The name of the engine used to calculate the balances.
+
+        customer_ids : Optional[List[str]]
+            The ids of the customers. If None, all the customers with any event are used.
+
+        with_advances : bool
+            Whether the balances taken along a single replay keep a copy of the advances, or only the summary
+            totals, which is all the worker processes send back then.
+
+        Returns
+        --------
+        Dict[str, List[BalanceEntity]]
+            An entity containing all the customer events balance as of each end date, by customer id.
+        """
+        if customer_ids is None:
+            with closing(sqlite3.connect(self.db_path)) as connection:
+                customer_ids = EventRepository(connection).get_customer_ids()
+
+        if self.max_workers == 1 or len(customer_ids) <= 1:
+            with closing(sqlite3.connect(self.db_path)) as connection:
+                return {
+                    customer_id: calculate_customer_balances(connection, customer_id, end_dates, engine, with_advances)
+                    for customer_id in customer_ids
+                }
+
+        max_workers = min(self.max_workers or os.cpu_count() or 1, len(customer_ids))
+
+        with ProcessPoolExecutor(max_workers, initializer=connect_worker, initargs=(self.db_path,)) as executor:
+            # SENDING THE CUSTOMERS IN CHUNKS, SO SMALL LEDGERS DO NOT PAY ONE ROUND TRIP EACH
+            balances = executor.map(
+                calculate_worker_balances,
+                customer_ids,
+                [end_dates] * len(customer_ids),
+                [engine] * len(customer_ids),
+                [with_advances] * len(customer_ids),
+                chunksize=max(1, len(customer_ids) // (4 * max_workers))
+            )
+
+            return dict(zip(customer_ids, balances))
+
+    @staticmethod
+    def get_totals(balance_entities: List[BalanceEntity]) -> BalanceEntity:
+        """
+        Method to add up the summary balances of many ledgers.
+
+        Parameters
+        ----------
+        balance_entities : List[BalanceEntity]
+            The balances to be added up.
+
+        Returns
+        --------
+        BalanceEntity
+            An entity with the total of each summary balance, without any advance.
+        """
+        return BalanceEntity(
+            advance_balance=sum((balance.advance_balance for balance in balance_entities), Decimal(0)),
+            interest_payable_balance=sum(
+                (balance.interest_payable_balance for balance in balance_entities), Decimal(0)
+            ),
+            interest_paid=sum((balance.interest_paid for balance in balance_entities), Decimal(0)),
+            payments_for_future=sum((balance.payments_for_future for balance in balance_entities), Decimal(0))
+        )
@@ -0,0 +1,189 @@
+"""
+Module containing the 'RollupHandler' Class.
+"""
+
+# TYPING IMPORTS
+from __future__ import annotations
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..repositories import RollupRepository
+
+# MODULE IMPORTS
+from ..entities import AdvanceEntity, EventEntity, BalanceEntity, PaymentEntity
+from ..use_cases import LedgerObserver
+
+
+class RollupHandler(LedgerObserver):
+    """
+    Class to roll up the principal and the interest of each month while the ledger is replayed.
+
+    This class implements the 'LedgerObserver' Interface, so it implements the following methods:
+    * on_entity_processed(entity: EventEntity, balance_entity: BalanceEntity) -> None
+
+    The interest accrued between two events is the growth of the interest payable and paid balances, so it is
+    exactly the interest the ledger accrued, and it is split between the months it spans by their number of days.
+    The months before the start month are not rolled up, since the replay may resume some events before it.
+
+    Attributes
+    ----------
+    rollup_repository : RollupRepository
+        A reference to store the rollups.
+
+    start_month : date
+        The first day of the first month rolled up.
+
+    rollups : Dict[date, List[Decimal]]
+        The principal advanced, the principal repaid, the interest accrued and the interest paid of each month,
+        by the first day of the month.
+
+    last_date : Optional[date]
+        The date of the last processed entity, if any.
+
+    interest_paid : Decimal
+        The total interest paid after the last processed entity.
+
+    interest_total : Decimal
+        The total interest payable and paid after the last processed entity.
+    """
+    rollup_repository: RollupRepository
+    start_month: date
+
+    rollups: Dict[date, List[Decimal]]
+    last_date: Optional[date]
+    interest_paid: Decimal
+    interest_total: Decimal
+
+    def __init__(self, rollup_repository: RollupRepository, start_month: date) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        rollup_repository : RollupRepository
+            A reference to store the rollups.
+
+        start_month : date
+            The first day of the first month rolled up.
+        """
+        self.rollup_repository = rollup_repository
+        self.start_month = start_month
+
+        self.rollups = {}
+        self.resume(None, None)
+
+    def resume(self, balance_entity: Optional[BalanceEntity], last_date: Optional[date]) -> None:
+        """
+        Method to set the balance the replay resumes from, before any entity is processed.
+
+        Parameters
+        ----------
+        balance_entity : Optional[BalanceEntity]
+            The balance the replay resumes from, if any.
+
+        last_date : Optional[date]
+            The date until which the interest of the balance was already accrued.
+        """
+        self.last_date = last_date
+        self.interest_paid = balance_entity.interest_paid if balance_entity is not None else Decimal(0)
+        self.interest_total = self.interest_paid
+        if balance_entity is not None:
+            self.interest_total += balance_entity.interest_payable_balance
+
+    def __get_rollup(self, month: date) -> Optional[List[Decimal]]:
+        """
+        Private Method to get the rollup of a month, creating it if needed.
+
+        Parameters
+        ----------
+        month : date
+            Any date of the month.
+
+        Returns
+        --------
+        Optional[List[Decimal]]
+            The rollup of the month, or None if the month is before the start month.
+        """
+        month = month.replace(day=1)
+
+        if month < self.start_month:
+            return None
+
+        if month not in self.rollups:
+            self.rollups[month] = [Decimal(0), Decimal(0), Decimal(0), Decimal(0)]
+
+        return self.rollups[month]
+
+    def __add_interest(self, start_date: date, end_date: date, accrued_interest: Decimal) -> None:
+        """
+        Private Method to split the interest accrued between two dates among the months they span.
+
+        Parameters
+        ----------
+        start_date : date
+            The date the interest started being accrued.
+
+        end_date : date
+            The (exclusive) date the interest was accrued until.
+
+        accrued_interest : Decimal
+            The interest accrued between the two dates.
+        """
+        days = (end_date - start_date).days
+        remaining_interest = accrued_interest
+
+        # THE LAST MONTH TAKES WHAT IS LEFT, SO THE SPLIT ADDS UP TO THE ACCRUED INTEREST
+        while (start_date.year, start_date.month) != (end_date.year, end_date.month):
+            next_month = (start_date.replace(day=28) + timedelta(days=4)).replace(day=1)
+            month_interest = accrued_interest * (next_month - start_date).days / days
+
+            rollup = self.__get_rollup(start_date)
+            if rollup is not None:
+                rollup[2] += month_interest
+
+            remaining_interest -= month_interest
+            start_date = next_month
+
+        rollup = self.__get_rollup(start_date)
+        if rollup is not None and remaining_interest:
+            rollup[2] += remaining_interest
+
+    def on_entity_processed(self, entity: EventEntity, balance_entity: BalanceEntity) -> None:
+        """
+        Method to add the principal and the interest of the processed entity to the rollup of its month.
+
+        Parameters
+        ----------
+        entity : EventEntity
+            A reference to the processed entity.
+
+        balance_entity : BalanceEntity
+            Entity containing all the current balances.
+        """
+        interest_total = balance_entity.interest_payable_balance + balance_entity.interest_paid
+
+        if self.last_date is not None and interest_total != self.interest_total:
+            self.__add_interest(self.last_date, entity.event_date, interest_total - self.interest_total)
+
+        rollup = self.__get_rollup(entity.event_date)
+
+        if rollup is not None and isinstance(entity, AdvanceEntity):
+            rollup[0] += entity.initial_amount
+            rollup[1] += entity.initial_amount - entity.current_balance
+
+        elif rollup is not None and isinstance(entity, PaymentEntity):
+            rollup[1] += sum(amount for _, amount in entity.allocations)
+            rollup[3] += balance_entity.interest_paid - self.interest_paid
+
+        self.last_date = entity.event_date
+        self.interest_paid = balance_entity.interest_paid
+        self.interest_total = interest_total
+
+    def flush(self) -> None:
+        """
+        Method to save the rollups of all the months from the start month on, replacing the saved ones.
+        """
+        self.rollup_repository.delete_rollups_from(self.start_month)
+        self.rollup_repository.save_rollups((month, *amounts) for month, amounts in sorted(self.rollups.items()))
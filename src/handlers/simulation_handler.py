@@ -0,0 +1,177 @@
+"""
+Module containing the 'SimulationHandler' Class.
+"""
+
+from dataclasses import replace
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_CEILING
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from .entities_handler import EntitiesHandler
+from .load_handler import encode_row
+from ..entities import BalanceEntity
+from ..use_cases import CalculateAdvances
+
+
+class SimulationHandler():
+    """
+    Class to apply hypothetical events on top of the ledger balance, in memory.
+
+    The hypothetical events are processed by the same entities as the stored ones, resumed from the balance right
+    after the last stored event, so the time taken is proportional to the hypothetical events and not to the
+    history of the ledger. Neither the given balance nor the database are ever changed.
+
+    Attributes
+    ----------
+    balance_entity : BalanceEntity
+        The balance right after the last stored event.
+
+    last_event_date : Optional[date]
+        The date of the last stored event, if any.
+
+    events : List[Tuple[Any]]
+        The hypothetical events, as (id, type_code, cents, date_created, exact_amount) rows sorted by date.
+    """
+    balance_entity: BalanceEntity
+    last_event_date: Optional[date]
+    events: List[Tuple[Any]]
+
+    def __init__(
+        self,
+        balance_entity: BalanceEntity,
+        last_event_date: Optional[date],
+        events: Iterable[Sequence[str]] = ()
+    ) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        balance_entity : BalanceEntity
+            The balance right after the last stored event.
+
+        last_event_date : Optional[date]
+            The date of the last stored event, if any.
+
+        events : Iterable[Sequence[str]]
+            The hypothetical events, as `TYPE,DATE,AMOUNT` CSV rows, in any order.
+
+        Raises
+        ------
+        ValueError
+            If any hypothetical event is invalid or dated before the last stored event.
+        """
+        self.balance_entity = balance_entity
+        self.last_event_date = last_event_date
+
+        rows = []
+        for row in events:
+            type_code, cents, date_created, exact_amount, _ = encode_row(row)
+
+            if self.__is_before_last_event(date_created):
+                raise ValueError(
+                    f"the event on {date.fromordinal(date_created).isoformat()} is before the last event of the "
+                    f"ledger, on {self.last_event_date.isoformat()}"
+                )
+
+            # THE HYPOTHETICAL EVENTS HAVE NO ID, AS THEY ARE NEVER STORED
+            rows.append((0, type_code, cents, date_created, exact_amount))
+
+        # THE EVENTS OF THE SAME DATE ARE PROCESSED IN THE GIVEN ORDER, AS THE STORED ONES ARE
+        self.events = sorted(rows, key=lambda row: row[3])
+
+    def __is_before_last_event(self, date_ordinal: int) -> bool:
+        """
+        Private Method to check whether a date is before the last stored event or not.
+
+        Parameters
+        ----------
+        date_ordinal : int
+            The day ordinal of the date.
+
+        Returns
+        --------
+        bool
+            - True if the date is before the last stored event;
+            - False otherwise
+        """
+        return self.last_event_date is not None and date_ordinal < self.last_event_date.toordinal()
+
+    def __apply_events(self, end_date: date, accrual_date: date) -> BalanceEntity:
+        """
+        Private Method to apply the hypothetical events before the end date to a copy of the balance.
+
+        Parameters
+        ----------
+        end_date : date
+            The (exclusive) end date of the applied events.
+
+        accrual_date : date
+            The date to accrue the interest until it.
+
+        Returns
+        --------
+        BalanceEntity
+            The copy of the balance, with the events applied.
+        """
+        balance_entity = replace(self.balance_entity, advances=self.balance_entity.advances.copy())
+
+        entities = EntitiesHandler(self.events, end_date, len(balance_entity.advances) + 1).build_entities()
+
+        return CalculateAdvances(
+            entities, accrual_date, balance_entity=balance_entity, start_date=self.last_event_date
+        ).get_balance()
+
+    def get_balance(self, end_date: date) -> BalanceEntity:
+        """
+        Method to get the balance as of the end date, with the hypothetical events before it applied.
+
+        Parameters
+        ----------
+        end_date : date
+            The (exclusive) end date.
+
+        Returns
+        --------
+        BalanceEntity
+            An entity containing the stored and the hypothetical events balance.
+
+        Raises
+        ------
+        ValueError
+            If the end date is not after the last stored event.
+        """
+        if self.__is_before_last_event(end_date.toordinal() - 1):
+            raise ValueError(f"the balance can only be simulated as of {self.last_event_date.isoformat()} or later")
+
+        return self.__apply_events(end_date, end_date)
+
+    def get_payoff(self, payoff_date: date) -> Tuple[BalanceEntity, Decimal]:
+        """
+        Method to get how much a payment on the payoff date must be to pay off all the advances and the interest.
+
+        The hypothetical events of the payoff date itself are applied before the payment. The amount is rounded
+        up to whole cents, so paying it always closes the ledger.
+
+        Parameters
+        ----------
+        payoff_date : date
+            The date of the payment.
+
+        Returns
+        --------
+        Tuple[BalanceEntity, Decimal]
+            The balance right before the payment, with the interest accrued until its date, and the payment amount.
+
+        Raises
+        ------
+        ValueError
+            If the payoff date is before the last stored event.
+        """
+        if self.__is_before_last_event(payoff_date.toordinal()):
+            raise ValueError(f"the payoff can only be quoted as of {self.last_event_date.isoformat()} or later")
+
+        balance_entity = self.__apply_events(payoff_date + timedelta(days=1), payoff_date)
+        payoff_amount = balance_entity.advance_balance + balance_entity.interest_payable_balance
+
+        return balance_entity, payoff_amount.quantize(Decimal("0.01"), rounding=ROUND_CEILING)
@@ -0,0 +1,10 @@
+""""""
+
+from .event_repository import EventRepository
+from .checkpoint_repository import CheckpointRepository
+from .schema_repository import SchemaRepository
+from .balance_cache_repository import BalanceCacheRepository
+from .event_file_repository import EventFileRepository
+from .load_offset_repository import LoadOffsetRepository
+from .allocation_repository import AllocationRepository
+from .rollup_repository import RollupRepository
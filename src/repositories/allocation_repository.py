@@ -0,0 +1,124 @@
+"""
+Module containing the 'AllocationRepository' Class.
+"""
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple
+
+
+class AllocationRepository():
+    """
+    Class to store and query the amounts each event allocated to each advance.
+
+    Every advance has an allocation of its own event, with the credit for future advances it took when it was
+    made, even if there was none, and every payment has an allocation to each advance it paid down. Decimal
+    values are stored as text, so the allocations are read with exactly the same values they were saved with.
+
+    The allocations are only complete for the events dated before the `indexed_until` day, which is moved back
+    when events are inserted before it.
+
+    Attributes
+    ----------
+    connection : sqlite3.Connection
+        The connection to the database.
+    """
+    connection: sqlite3.Connection
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            The connection to the database.
+        """
+        self.connection = connection
+
+    def save_allocations(self, allocations: Iterable[Tuple[int, int, int, Decimal]]) -> None:
+        """
+        Method to save some allocations, replacing any other allocation of the same event to the same advance.
+
+        Parameters
+        ----------
+        allocations : Iterable[Tuple[int, int, int, Decimal]]
+            The (advance_id, event_date, event_id, amount) of each allocation, with the event date as a day ordinal.
+        """
+        cursor = self.connection.cursor()
+        cursor.executemany(
+            "insert or replace into allocations (advance_id, event_date, event_id, amount) values (?, ?, ?, ?);",
+            (
+                (advance_id, event_date, event_id, str(amount))
+                for advance_id, event_date, event_id, amount in allocations
+            )
+        )
+
+    def get_allocations(self, advance_id: int) -> List[Tuple[int, date, Decimal]]:
+        """
+        Method to get all the allocations to an advance, in replay order.
+
+        Parameters
+        ----------
+        advance_id : int
+            The advance id.
+
+        Returns
+        --------
+        List[Tuple[int, date, Decimal]]
+            The (event_id, event_date, amount) of each allocation. The first one is the allocation of the advance
+            event itself, if the advance exists.
+        """
+        cursor = self.connection.cursor()
+        result = cursor.execute(
+            """
+            select event_id, event_date, amount from allocations
+            where advance_id = ?
+            order by event_date, event_id;
+            """,
+            (advance_id,)
+        )
+
+        return [(event_id, date.fromordinal(event_date), Decimal(amount)) for event_id, event_date, amount in result]
+
+    def delete_allocations_from(self, event_date: date) -> None:
+        """
+        Method to delete all the allocations of the events dated on or after the given date.
+
+        Parameters
+        ----------
+        event_date : date
+            The date to delete the allocations from.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("delete from allocations where event_date >= ?;", (event_date.toordinal(),))
+
+    def get_indexed_until(self) -> Optional[int]:
+        """
+        Method to get the day the allocations are complete before.
+
+        Returns
+        --------
+        Optional[int]
+            The (exclusive) day ordinal the allocations of all the events before it are saved, or None if no
+            allocation was ever saved.
+        """
+        cursor = self.connection.cursor()
+        row = cursor.execute("select indexed_until from allocation_watermark;").fetchone()
+
+        return row[0] if row is not None else None
+
+    def save_indexed_until(self, indexed_until: int) -> None:
+        """
+        Method to save the day the allocations are complete before, without committing it.
+
+        Parameters
+        ----------
+        indexed_until : int
+            The (exclusive) day ordinal the allocations of all the events before it are saved.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "insert or replace into allocation_watermark (id, indexed_until) values (1, ?);", (indexed_until,)
+        )
@@ -0,0 +1,212 @@
+"""
+Module containing the 'BalanceCacheRepository' Class.
+"""
+
+import json
+import sqlite3
+from array import array
+from collections import deque
+from datetime import date
+from decimal import Decimal
+from typing import Any, Optional, Tuple
+
+from ..entities import AdvanceStore, BalanceEntity
+
+
+class BalanceCacheRepository():
+    """
+    Class to store and query the cached balances.
+
+    Each balance is cached by its end date and engine, along with the fingerprint of the events it was calculated
+    from, so it is only returned while the events are still the same. The advance store columns are stored as raw
+    bytes and Decimal values as text, so a cached balance is restored with exactly the same values it was saved with.
+    The least recently used balances are evicted once the cache grows past its size limit.
+
+    Attributes
+    ----------
+    connection : sqlite3.Connection
+        The connection to the database.
+    """
+    connection: sqlite3.Connection
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            The connection to the database.
+        """
+        self.connection = connection
+
+    def get_balance(
+        self, end_date: date, engine: str, fingerprint: str, touch: bool = True
+    ) -> Optional[BalanceEntity]:
+        """
+        Method to get a cached balance, marking it as the most recently used one.
+
+        Parameters
+        ----------
+        end_date : date
+            The (exclusive) end date of the balance.
+
+        engine : str
+            The name of the engine that calculated the balance.
+
+        fingerprint : str
+            The fingerprint of the current events.
+
+        touch : bool
+            Whether the balance is marked as the most recently used one, which writes to the database.
+
+        Returns
+        --------
+        Optional[BalanceEntity]
+            The cached balance, or None if there is no such balance for the current events.
+        """
+        key = {"end_date": end_date.isoformat(), "engine": engine, "fingerprint": fingerprint}
+
+        cursor = self.connection.cursor()
+        row = cursor.execute(
+            """
+            select * from balance_cache
+            where end_date = :end_date and engine = :engine and fingerprint = :fingerprint;
+            """,
+            key
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        if touch:
+            cursor.execute(
+                """
+                update balance_cache set last_used = (select max(last_used) + 1 from balance_cache)
+                where end_date = :end_date and engine = :engine;
+                """,
+                key
+            )
+
+        return self.__build_balance(row)
+
+    def save_balance(
+        self, end_date: date, engine: str, fingerprint: str, balance_entity: BalanceEntity, max_size: int
+    ) -> None:
+        """
+        Method to cache a balance, evicting the least recently used ones that do not fit the size limit.
+
+        Parameters
+        ----------
+        end_date : date
+            The (exclusive) end date of the balance.
+
+        engine : str
+            The name of the engine that calculated the balance.
+
+        fingerprint : str
+            The fingerprint of the events the balance was calculated from.
+
+        balance_entity : BalanceEntity
+            The balance to be cached.
+
+        max_size : int
+            The size limit of the whole cache, in bytes.
+        """
+        advances = balance_entity.advances
+        values = [
+            str(balance_entity.advance_balance),
+            str(balance_entity.interest_payable_balance),
+            str(balance_entity.interest_paid),
+            str(balance_entity.payments_for_future),
+            advances.offset,
+            advances.dates.tobytes(),
+            advances.amounts.tobytes(),
+            json.dumps([[index, str(amount)] for index, amount in advances.inexact_amounts.items()]),
+            json.dumps([str(balance) for balance in advances.open_balances])
+        ]
+        size = sum(len(value) for value in values if not isinstance(value, int))
+
+        cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            insert or replace into balance_cache values (
+                ?, ?, ?, (select coalesce(max(last_used), 0) + 1 from balance_cache), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+            );
+            """,
+            (end_date.isoformat(), engine, fingerprint, size, *values)
+        )
+
+        self.evict(max_size)
+
+    def evict(self, max_size: int) -> None:
+        """
+        Method to evict the least recently used balances until the cache fits the size limit.
+
+        Parameters
+        ----------
+        max_size : int
+            The size limit of the whole cache, in bytes.
+        """
+        cursor = self.connection.cursor()
+        rows = cursor.execute("select end_date, engine, size from balance_cache order by last_used desc;").fetchall()
+
+        total_size = 0
+        for end_date, engine, size in rows:
+            total_size += size
+
+            if total_size > max_size:
+                cursor.execute("delete from balance_cache where end_date = ? and engine = ?;", (end_date, engine))
+
+    def invalidate_after(self, event_date: date, previous_fingerprint: str, fingerprint: str) -> None:
+        """
+        Method to invalidate the cached balances after new events were inserted.
+
+        A balance only depends on the events before its end date, so the balances whose end date is not after the
+        earliest new event are still valid and take the new fingerprint. All the other ones are deleted.
+
+        Parameters
+        ----------
+        event_date : date
+            The date of the earliest new event.
+
+        previous_fingerprint : str
+            The fingerprint of the events before the new ones were inserted.
+
+        fingerprint : str
+            The fingerprint of the events after the new ones were inserted.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "delete from balance_cache where end_date > ? or fingerprint != ?;",
+            (event_date.isoformat(), previous_fingerprint)
+        )
+        cursor.execute("update balance_cache set fingerprint = ?;", (fingerprint,))
+
+    def __build_balance(self, row: Tuple[Any]) -> BalanceEntity:
+        """
+        Private Method to build a balance entity from a database row.
+
+        Parameters
+        ----------
+        row : Tuple[Any]
+            The cached balance row.
+
+        Returns
+        --------
+        BalanceEntity
+            The built balance entity.
+        """
+        advances = AdvanceStore(row[9])
+        advances.dates = array("i", row[10])
+        advances.amounts = array("q", row[11])
+        advances.inexact_amounts = {index: Decimal(amount) for index, amount in json.loads(row[12])}
+        advances.open_balances = deque(Decimal(balance) for balance in json.loads(row[13]))
+
+        return BalanceEntity(
+            advance_balance=Decimal(row[5]),
+            interest_payable_balance=Decimal(row[6]),
+            interest_paid=Decimal(row[7]),
+            payments_for_future=Decimal(row[8]),
+            advances=advances
+        )
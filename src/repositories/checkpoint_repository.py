@@ -0,0 +1,134 @@
+"""
+Module containing the 'CheckpointRepository' Class.
+"""
+
+import json
+import sqlite3
+from datetime import date
+from decimal import Decimal
+from typing import Any, Optional, Tuple
+
+from ..entities import CheckpointEntity
+
+
+class CheckpointRepository():
+    """
+    Class to store and query the ledger checkpoints.
+
+    Decimal values are stored as text, so a checkpoint is restored with exactly the same values it was saved with.
+
+    Attributes
+    ----------
+    connection : sqlite3.Connection
+        The connection to the database.
+    """
+    connection: sqlite3.Connection
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            The connection to the database.
+        """
+        self.connection = connection
+
+    def save_checkpoint(self, checkpoint: CheckpointEntity) -> None:
+        """
+        Method to save a checkpoint, replacing any other checkpoint of the same event.
+
+        Parameters
+        ----------
+        checkpoint : CheckpointEntity
+            The checkpoint to be saved.
+        """
+        open_advances = [[advance_id, str(balance)] for advance_id, balance in checkpoint.open_advances.items()]
+
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "insert or replace into checkpoints values (?, ?, ?, ?, ?, ?, ?, ?);",
+            (
+                checkpoint.last_event_id,
+                checkpoint.last_event_date.isoformat(),
+                checkpoint.advance_count,
+                str(checkpoint.advance_balance),
+                str(checkpoint.interest_payable_balance),
+                str(checkpoint.interest_paid),
+                str(checkpoint.payments_for_future),
+                json.dumps(open_advances)
+            )
+        )
+
+    def get_latest_checkpoint(self, end_date: Optional[date] = None) -> Optional[CheckpointEntity]:
+        """
+        Method to get the latest checkpoint whose last event happened before the end date.
+
+        Parameters
+        ----------
+        end_date : Optional[date]
+            The (exclusive) end date. If None, the latest checkpoint is returned.
+
+        Returns
+        --------
+        Optional[CheckpointEntity]
+            The latest checkpoint, or None if there is no such checkpoint.
+        """
+        end_date = date.max if end_date is None else end_date
+
+        cursor = self.connection.cursor()
+        result = cursor.execute(
+            """
+            select * from checkpoints
+            where last_event_date < ?
+            order by last_event_date desc, last_event_id desc
+            limit 1;
+            """,
+            (end_date.isoformat(),)
+        )
+        row = result.fetchone()
+
+        if row is None:
+            return None
+
+        return self.__build_checkpoint(row)
+
+    def delete_checkpoints_after(self, event_date: date) -> None:
+        """
+        Method to delete all the checkpoints whose last event happened after the given date.
+
+        Parameters
+        ----------
+        event_date : date
+            The date to delete the checkpoints after it.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("delete from checkpoints where last_event_date > ?;", (event_date.isoformat(),))
+
+    def __build_checkpoint(self, row: Tuple[Any]) -> CheckpointEntity:
+        """
+        Private Method to build a checkpoint entity from a database row.
+
+        Parameters
+        ----------
+        row : Tuple[Any]
+            The checkpoint row.
+
+        Returns
+        --------
+        CheckpointEntity
+            The built checkpoint entity.
+        """
+        open_advances = {advance_id: Decimal(balance) for advance_id, balance in json.loads(row[7])}
+
+        return CheckpointEntity(
+            last_event_id=row[0],
+            last_event_date=date.fromisoformat(row[1]),
+            advance_count=row[2],
+            advance_balance=Decimal(row[3]),
+            interest_payable_balance=Decimal(row[4]),
+            interest_paid=Decimal(row[5]),
+            payments_for_future=Decimal(row[6]),
+            open_advances=open_advances
+        )
@@ -0,0 +1,186 @@
+"""
+Module containing the 'EventFileRepository' Class.
+"""
+
+import mmap
+import os
+import struct
+from datetime import date
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+
+except ImportError:  # pragma: no cover
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+# HEADER OF THE EVENT FILES: MAGIC, FORMAT VERSION AND RECORD SIZE
+EVENT_FILE_MAGIC = b"LEDGEREV"
+EVENT_FILE_VERSION = 1
+EVENT_FILE_HEADER = struct.Struct("<8sII")
+
+# FIXED-WIDTH RECORD OF EACH EVENT: DAY ORDINAL, TYPE CODE, 3 PADDING BYTES AND CENTS, SO THE CENTS ARE ALIGNED
+EVENT_RECORD = struct.Struct("<iB3xq")
+
+
+class EventFileRepository():
+    """
+    Class to write and read the events of a ledger in a binary file, with one fixed-width record per event.
+
+    After a small header, the file holds a packed (date_created, type_code, cents) record for each event, in replay
+    order, using the same encoding as the events table. The records are memory-mapped when read, so the operating
+    system pages them in on demand and, with NumPy, they are exposed as columns over the mapped buffer without
+    copying them nor creating any Python object per event.
+
+    The records only keep whole cents, so amounts that are not a whole number of cents are rounded, as the fixed
+    and vectorized engines do, and the customer of the events is not kept.
+
+    Attributes
+    ----------
+    path : str
+        The path of the event file.
+    """
+    path: str
+
+    def __init__(self, path: str) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        path : str
+            The path of the event file.
+        """
+        self.path = path
+
+    def write_events(self, events: Iterable[Tuple[Any]]) -> int:
+        """
+        Method to write the events to the file, replacing its content.
+
+        Parameters
+        ----------
+        events : Iterable[Tuple[Any]]
+            The (id, type_code, cents, date_created, exact_amount) rows of the events, in replay order.
+
+        Returns
+        --------
+        int
+            How many events were written.
+        """
+        written = 0
+
+        with open(self.path, "wb") as event_f:
+            event_f.write(EVENT_FILE_HEADER.pack(EVENT_FILE_MAGIC, EVENT_FILE_VERSION, EVENT_RECORD.size))
+
+            for _, type_code, cents, date_created, _ in events:
+                event_f.write(EVENT_RECORD.pack(date_created, type_code, cents))
+                written += 1
+
+        return written
+
+    def map_records(self) -> memoryview:
+        """
+        Method to memory-map the records of the file.
+
+        The map is released once the returned view, and every other view over it, are no longer referenced.
+
+        Returns
+        --------
+        memoryview
+            A read-only view over the packed records.
+
+        Raises
+        ------
+        ValueError
+            If the file is not an event file or if its format version is not supported.
+        """
+        with open(self.path, "rb") as event_f:
+            header = event_f.read(EVENT_FILE_HEADER.size)
+
+            if len(header) < EVENT_FILE_HEADER.size or not header.startswith(EVENT_FILE_MAGIC):
+                raise ValueError(f"{self.path} is not a ledger event file")
+
+            _, version, record_size = EVENT_FILE_HEADER.unpack(header)
+            if version != EVENT_FILE_VERSION or record_size != EVENT_RECORD.size:
+                raise ValueError(f"{self.path} has the unsupported event file version {version}")
+
+            size = os.fstat(event_f.fileno()).st_size
+            if (size - EVENT_FILE_HEADER.size) % EVENT_RECORD.size:
+                raise ValueError(f"{self.path} is truncated")
+
+            # EMPTY FILES CAN NOT BE MAPPED
+            if size == EVENT_FILE_HEADER.size:
+                return memoryview(b"")
+
+            mapped = mmap.mmap(event_f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return memoryview(mapped)[EVENT_FILE_HEADER.size:]
+
+    @staticmethod
+    def __iter_events(records: memoryview, end_date: Optional[date]) -> Iterator[Tuple[Any]]:
+        """
+        Private Method to lazily unpack the records before the end date.
+
+        Parameters
+        ----------
+        records : memoryview
+            The packed records.
+
+        end_date : Optional[date]
+            The (exclusive) end date. If None, all the records are unpacked.
+
+        Yields
+        -------
+        Tuple[Any]
+            Each one of the events, as an (id, type_code, cents, date_created, exact_amount) row.
+        """
+        end_ordinal = end_date.toordinal() if end_date is not None else None
+
+        for event_id, (date_created, type_code, cents) in enumerate(EVENT_RECORD.iter_unpack(records), 1):
+            if end_ordinal is not None and date_created >= end_ordinal:
+                return
+
+            yield event_id, type_code, cents, date_created, None
+
+    def get_events(self, end_date: Optional[date] = None) -> Iterator[Tuple[Any]]:
+        """
+        Method to get all the events before the end date.
+
+        The file is checked right away, but the records are only unpacked as they are iterated over. The ids of
+        the events are their position in the file, starting from 1.
+
+        Parameters
+        ----------
+        end_date : Optional[date]
+            The (exclusive) end date. If None, all the events are returned.
+
+        Returns
+        --------
+        Iterator[Tuple[Any]]
+            An iterator over the events, as (id, type_code, cents, date_created, exact_amount) rows.
+        """
+        return self.__iter_events(self.map_records(), end_date)
+
+    def get_columns(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Method to get the events as NumPy columns over the mapped records, without copying them.
+
+        Returns
+        --------
+        Tuple[np.ndarray, np.ndarray, np.ndarray]
+            The read-only type_code, cents and date_created columns, in replay order.
+        """
+        records = np.frombuffer(
+            self.map_records(),
+            dtype=np.dtype({
+                "names": ["date_created", "type_code", "cents"],
+                "formats": ["<i4", "u1", "<i8"],
+                "offsets": [0, 4, 8],
+                "itemsize": EVENT_RECORD.size
+            })
+        )
+
+        return records["type_code"], records["cents"], records["date_created"]
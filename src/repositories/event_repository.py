@@ -0,0 +1,540 @@
+"""
+Module containing the 'EventRepository' Class.
+"""
+
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..entities import EVENT_TYPE_CODES
+
+
+# COLUMNS OF THE EVENT ROWS RETURNED BY THE QUERIES
+EVENT_COLUMNS = "id, type_code, cents, date_created, exact_amount"
+
+
+def to_cents(amount: Any) -> int:
+    """
+    Function to convert an event amount, as written in the CSV file, to an integer number of cents.
+
+    Parameters
+    ----------
+    amount : Any
+        The amount, as an int, a float or a string.
+
+    Returns
+    --------
+    int
+        The amount in cents, rounded half to even.
+    """
+    if isinstance(amount, int):
+        return amount * 100
+
+    cents = Decimal(str(amount)) * 100
+
+    return int(cents.to_integral_value(ROUND_HALF_EVEN))
+
+
+def to_exact_amount(amount: Any) -> Optional[str]:
+    """
+    Function to keep the exact text of an event amount that is not a whole number of cents.
+
+    Parameters
+    ----------
+    amount : Any
+        The amount, as an int, a float or a string.
+
+    Returns
+    --------
+    Optional[str]
+        The exact amount, or None if it is a whole number of cents.
+    """
+    if isinstance(amount, int):
+        return None
+
+    exact_amount = Decimal(str(amount))
+    if exact_amount * 100 == int(exact_amount * 100):
+        return None
+
+    return str(exact_amount)
+
+
+def to_day_ordinal(event_date: str) -> int:
+    """
+    Function to convert an event date, as written in the CSV file, to its day ordinal.
+
+    Parameters
+    ----------
+    event_date : str
+        The date, in the `YYYY-MM-DD` format, with or without leading zeros.
+
+    Returns
+    --------
+    int
+        The day ordinal of the date, as in `date.toordinal`.
+    """
+    try:
+        return date.fromisoformat(event_date).toordinal()
+
+    except ValueError:
+        return datetime.strptime(event_date, "%Y-%m-%d").toordinal()
+
+
+def encode_event(
+    event_type: str, amount: str, event_date: str, customer_id: str
+) -> Tuple[int, int, int, Optional[str], str]:
+    """
+    Function to validate an event, as written in the CSV file, and encode it as it is stored.
+
+    The amount is parsed only once, but it is encoded exactly as `to_cents` and `to_exact_amount` do.
+
+    Parameters
+    ----------
+    event_type : str
+        The event type, `advance` or `payment`.
+
+    amount : str
+        The amount, which must be a positive number.
+
+    event_date : str
+        The date, in the `YYYY-MM-DD` format, with or without leading zeros.
+
+    customer_id : str
+        The id of the customer.
+
+    Returns
+    --------
+    Tuple[int, int, int, Optional[str], str]
+        The (type_code, cents, date_created, exact_amount, customer_id) of the event.
+
+    Raises
+    ------
+    ValueError
+        If the type is unknown, the date is invalid or the amount is not a positive number.
+    """
+    type_code = EVENT_TYPE_CODES.get(event_type)
+    if type_code is None:
+        raise ValueError(f"unknown event type {event_type!r}")
+
+    try:
+        date_created = to_day_ordinal(event_date)
+
+    except ValueError:
+        raise ValueError(f"invalid date {event_date!r}") from None
+
+    try:
+        exact_amount = Decimal(amount)
+
+    except InvalidOperation:
+        raise ValueError(f"invalid amount {amount!r}") from None
+
+    if not exact_amount.is_finite() or exact_amount <= 0:
+        raise ValueError(f"amount {amount!r} is not positive")
+
+    cents = exact_amount * 100
+    integral_cents = int(cents.to_integral_value(ROUND_HALF_EVEN))
+
+    return type_code, integral_cents, date_created, str(exact_amount) if cents != integral_cents else None, customer_id
+
+
+def to_amount(cents: int, exact_amount: Optional[str]) -> Decimal:
+    """
+    Function to convert the stored amount of an event back to Decimal.
+
+    Parameters
+    ----------
+    cents : int
+        The amount in cents.
+
+    exact_amount : Optional[str]
+        The exact amount, if it is not a whole number of cents.
+
+    Returns
+    --------
+    Decimal
+        The event amount.
+    """
+    if exact_amount is not None:
+        return Decimal(exact_amount)
+
+    return Decimal(cents).scaleb(-2)
+
+
+class EventRepository():
+    """
+    Class to query the events stored in the database.
+
+    Events are always returned in replay order, that is, ordered by their date and then by their id,
+    and are streamed from the database cursor in batches instead of being fetched all at once.
+
+    Events are stored already decoded, so they are read without parsing any string: the type as a code, the
+    amount in cents and the date as its day ordinal. Amounts that are not a whole number of cents also keep their
+    exact text. The queries return (id, type_code, cents, date_created, exact_amount) rows.
+    The end date cutoff is part of the queries, so the `events_date_created_idx` index makes the database
+    read only the events before it.
+
+    Attributes
+    ----------
+    connection : sqlite3.Connection
+        The connection to the database.
+
+    fetch_size : int
+        How many rows are fetched from the cursor at a time.
+    """
+    connection: sqlite3.Connection
+    fetch_size: int
+
+    DEFAULT_FETCH_SIZE = 1000
+    DEFAULT_CUSTOMER_ID = "default"
+
+    def __init__(self, connection: sqlite3.Connection, fetch_size: int = DEFAULT_FETCH_SIZE) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            The connection to the database.
+
+        fetch_size : int
+            How many rows are fetched from the cursor at a time.
+        """
+        self.connection = connection
+        self.fetch_size = fetch_size
+
+    @staticmethod
+    def __format_end_date(end_date: Optional[date]) -> int:
+        """
+        Private Method to format an optional end date as a query parameter.
+
+        Parameters
+        ----------
+        end_date : Optional[date]
+            The (exclusive) end date. If None, the greatest possible date is used.
+
+        Returns
+        --------
+        int
+            The day ordinal of the end date.
+        """
+        return (date.max if end_date is None else end_date).toordinal()
+
+    def __iter_rows(self, query: str, parameters: Dict[str, Any]) -> Iterator[Tuple[Any]]:
+        """
+        Private Method to lazily iterate over the rows of a query.
+
+        Parameters
+        ----------
+        query : str
+            The query to be executed.
+
+        parameters : Dict[str, Any]
+            The query parameters.
+
+        Yields
+        -------
+        Tuple[Any]
+            Each one of the query rows.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(query, parameters)
+
+        rows = cursor.fetchmany(self.fetch_size)
+        while rows:
+            yield from rows
+            rows = cursor.fetchmany(self.fetch_size)
+
+    def get_events(self, end_date: Optional[date] = None) -> Iterator[Tuple[Any]]:
+        """
+        Method to get all the events before the end date.
+
+        Parameters
+        ----------
+        end_date : Optional[date]
+            The (exclusive) end date. If None, all the events are returned.
+
+        Returns
+        --------
+        Iterator[Tuple[Any]]
+            An iterator over the events, as (id, type_code, cents, date_created, exact_amount) rows.
+        """
+        return self.__iter_rows(
+            f"select {EVENT_COLUMNS} from events where date_created < :end_date order by date_created, id;",
+            {"end_date": self.__format_end_date(end_date)}
+        )
+
+    def get_customer_events(self, customer_id: str, end_date: Optional[date] = None) -> Iterator[Tuple[Any]]:
+        """
+        Method to get all the events of a single customer before the end date.
+
+        Parameters
+        ----------
+        customer_id : str
+            The id of the customer.
+
+        end_date : Optional[date]
+            The (exclusive) end date. If None, all the events of the customer are returned.
+
+        Returns
+        --------
+        Iterator[Tuple[Any]]
+            An iterator over the events, as (id, type_code, cents, date_created, exact_amount) rows.
+        """
+        return self.__iter_rows(
+            f"""
+            select {EVENT_COLUMNS} from events
+            where customer_id = :customer_id and date_created < :end_date
+            order by date_created, id;
+            """,
+            {"customer_id": customer_id, "end_date": self.__format_end_date(end_date)}
+        )
+
+    def get_customer_ids(self) -> List[str]:
+        """
+        Method to get the ids of all the customers that have any event.
+
+        Returns
+        --------
+        List[str]
+            The customer ids, in ascending order.
+        """
+        cursor = self.connection.cursor()
+        result = cursor.execute("select distinct customer_id from events order by customer_id;")
+
+        return [row[0] for row in result.fetchall()]
+
+    def has_many_customers(self) -> bool:
+        """
+        Method to check whether the events belong to more than one customer or not, with two index lookups.
+
+        Returns
+        --------
+        bool
+            - True if the events belong to more than one customer;
+            - False otherwise
+        """
+        cursor = self.connection.cursor()
+        row = cursor.execute(
+            "select exists (select 1 from events where customer_id > (select min(customer_id) from events));"
+        ).fetchone()
+
+        return bool(row[0])
+
+    def get_events_after(
+        self,
+        event_date: date,
+        event_id: int,
+        end_date: Optional[date] = None
+    ) -> Iterator[Tuple[Any]]:
+        """
+        Method to get all the events that come after the given event in replay order, before the end date.
+
+        Parameters
+        ----------
+        event_date : date
+            The date of the event to start after.
+
+        event_id : int
+            The id of the event to start after.
+
+        end_date : Optional[date]
+            The (exclusive) end date. If None, all the events after the given one are returned.
+
+        Returns
+        --------
+        Iterator[Tuple[Any]]
+            An iterator over the events, as (id, type_code, cents, date_created, exact_amount) rows.
+        """
+        return self.__iter_rows(
+            f"""
+            select {EVENT_COLUMNS} from events
+            where (date_created > :date or (date_created = :date and id > :id)) and date_created < :end_date
+            order by date_created, id;
+            """,
+            {"date": event_date.toordinal(), "id": event_id, "end_date": self.__format_end_date(end_date)}
+        )
+
+    def get_advances_until(self, event_date: date, event_id: int, offset: int = 0) -> Iterator[Tuple[Any]]:
+        """
+        Method to get all the advance events until the given event (inclusive) in replay order.
+
+        Parameters
+        ----------
+        event_date : date
+            The date of the last event.
+
+        event_id : int
+            The id of the last event.
+
+        offset : int
+            How many of the oldest advance events are skipped.
+
+        Returns
+        --------
+        Iterator[Tuple[Any]]
+            An iterator over the advance events, as (id, type_code, cents, date_created, exact_amount) rows.
+        """
+        return self.__iter_rows(
+            f"""
+            select {EVENT_COLUMNS} from events
+            where type_code = :type_code and (date_created < :date or (date_created = :date and id <= :id))
+            order by date_created, id
+            limit -1 offset :offset;
+            """,
+            {
+                "type_code": EVENT_TYPE_CODES["advance"],
+                "date": event_date.toordinal(),
+                "id": event_id,
+                "offset": offset
+            }
+        )
+
+    def get_min_date_after(self, event_id: int) -> Optional[date]:
+        """
+        Method to get the earliest date of the events inserted after the given event id.
+
+        Parameters
+        ----------
+        event_id : int
+            The id of the last event that existed before.
+
+        Returns
+        --------
+        Optional[date]
+            The earliest date, or None if there is no such event.
+        """
+        cursor = self.connection.cursor()
+        result = cursor.execute("select min(date_created) from events where id > ?;", (event_id,))
+        min_date = result.fetchone()[0]
+
+        return date.fromordinal(min_date) if min_date is not None else None
+
+    def get_max_id(self) -> int:
+        """
+        Method to get the greatest event id.
+
+        Returns
+        --------
+        int
+            The greatest event id, or 0 if there are no events.
+        """
+        cursor = self.connection.cursor()
+        result = cursor.execute("select coalesce(max(id), 0) from events;")
+
+        return result.fetchone()[0]
+
+    def get_max_date(self) -> Optional[date]:
+        """
+        Method to get the date of the latest event.
+
+        Returns
+        --------
+        Optional[date]
+            The date of the latest event, or None if there are no events.
+        """
+        cursor = self.connection.cursor()
+        result = cursor.execute("select max(date_created) from events;")
+        max_date = result.fetchone()[0]
+
+        return date.fromordinal(max_date) if max_date is not None else None
+
+    def get_event(self, event_id: int) -> Optional[Tuple[Any]]:
+        """
+        Method to get a single event.
+
+        Parameters
+        ----------
+        event_id : int
+            The id of the event.
+
+        Returns
+        --------
+        Optional[Tuple[Any]]
+            The event, as an (id, type_code, cents, date_created, exact_amount) row, or None if there is no such
+            event.
+        """
+        cursor = self.connection.cursor()
+        result = cursor.execute(f"select {EVENT_COLUMNS} from events where id = ?;", (event_id,))
+
+        return result.fetchone()
+
+    def get_fingerprint(self) -> str:
+        """
+        Method to get a cheap fingerprint of the events, which changes whenever new events are inserted.
+
+        Events are never changed after they are loaded and their ids are never reused, so the greatest event id
+        is enough to tell them apart, and it is read straight from the primary key, without counting the events.
+
+        Returns
+        --------
+        str
+            The fingerprint of the events.
+        """
+        return f"events:{self.get_max_id()}"
+
+    def insert_rows(self, rows: Iterable[Tuple[int, int, int, Optional[str], str]]) -> None:
+        """
+        Method to insert events already encoded as they are stored, with a single `executemany` call.
+
+        Parameters
+        ----------
+        rows : Iterable[Tuple[int, int, int, Optional[str], str]]
+            The (type_code, cents, date_created, exact_amount, customer_id) of each event.
+        """
+        cursor = self.connection.cursor()
+        cursor.executemany(
+            """
+            insert into events (type_code, cents, date_created, exact_amount, customer_id)
+            values (?, ?, ?, ?, ?);
+            """,
+            rows
+        )
+
+    def insert_events(self, events: Iterable[Tuple[str, str, str, str]]) -> None:
+        """
+        Method to validate, encode and insert events with a single `executemany` call.
+
+        Parameters
+        ----------
+        events : Iterable[Tuple[str, str, str, str]]
+            The (type, amount, date_created, customer_id) of each event, as written in the CSV file.
+
+        Raises
+        ------
+        ValueError
+            If any of the events is invalid.
+        """
+        self.insert_rows(
+            encode_event(event_type, amount, event_date, customer_id)
+            for event_type, amount, event_date, customer_id in events
+        )
+
+    def insert_encoded_events(self, events: Iterable[Tuple[Any]], customer_id: str = DEFAULT_CUSTOMER_ID) -> None:
+        """
+        Method to insert events read back from the database or from an event file, with a single `executemany` call.
+
+        Parameters
+        ----------
+        events : Iterable[Tuple[Any]]
+            The (id, type_code, cents, date_created, exact_amount) rows of the events. Their ids are not kept.
+
+        customer_id : str
+            The id of the customer of all the events.
+        """
+        self.insert_rows(
+            (type_code, cents, date_created, exact_amount, customer_id)
+            for _, type_code, cents, date_created, exact_amount in events
+        )
+
+    def drop_date_index(self) -> None:
+        """
+        Method to drop the index of the events by their date.
+        """
+        self.connection.execute("drop index if exists events_date_created_idx;")
+
+    def create_date_index(self) -> None:
+        """
+        Method to create the index of the events by their date.
+        """
+        self.connection.execute("create index if not exists events_date_created_idx on events (date_created, id);")
@@ -0,0 +1,65 @@
+"""
+Module containing the 'LoadOffsetRepository' Class.
+"""
+
+import sqlite3
+
+
+class LoadOffsetRepository():
+    """
+    Class to store how many bytes of each source file were already loaded.
+
+    Attributes
+    ----------
+    connection : sqlite3.Connection
+        The connection to the database.
+    """
+    connection: sqlite3.Connection
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            The connection to the database.
+        """
+        self.connection = connection
+
+    def get_offset(self, source_path: str) -> int:
+        """
+        Method to get how many bytes of a source file were already loaded.
+
+        Parameters
+        ----------
+        source_path : str
+            The absolute path of the source file.
+
+        Returns
+        --------
+        int
+            The byte offset the next load starts from, or 0 if the file was never loaded.
+        """
+        cursor = self.connection.cursor()
+        result = cursor.execute("select byte_offset from load_offsets where source_path = ?;", (source_path,))
+        row = result.fetchone()
+
+        return row[0] if row is not None else 0
+
+    def save_offset(self, source_path: str, byte_offset: int) -> None:
+        """
+        Method to save how many bytes of a source file were already loaded, without committing it.
+
+        Parameters
+        ----------
+        source_path : str
+            The absolute path of the source file.
+
+        byte_offset : int
+            The byte offset the next load starts from.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "insert or replace into load_offsets (source_path, byte_offset) values (?, ?);", (source_path, byte_offset)
+        )
@@ -0,0 +1,131 @@
+"""
+Module containing the 'RollupRepository' Class.
+"""
+
+import sqlite3
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple
+
+
+class RollupRepository():
+    """
+    Class to store and query the monthly rollups of the ledger.
+
+    Each rollup has the principal advanced, the principal repaid, the interest accrued and the interest paid in
+    a month, keyed by the first day of the month. Decimal values are stored as text, so the rollups are read with
+    exactly the same values they were saved with.
+
+    The rollups are only complete for the events dated before the `rolled_up_until` day, which is moved back when
+    events are inserted before it.
+
+    Attributes
+    ----------
+    connection : sqlite3.Connection
+        The connection to the database.
+    """
+    connection: sqlite3.Connection
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            The connection to the database.
+        """
+        self.connection = connection
+
+    def save_rollups(self, rollups: Iterable[Tuple[date, Decimal, Decimal, Decimal, Decimal]]) -> None:
+        """
+        Method to save some monthly rollups, replacing any other rollup of the same months.
+
+        Parameters
+        ----------
+        rollups : Iterable[Tuple[date, Decimal, Decimal, Decimal, Decimal]]
+            The (month, principal_advanced, principal_repaid, interest_accrued, interest_paid) of each rollup, with
+            the first day of the month.
+        """
+        cursor = self.connection.cursor()
+        cursor.executemany(
+            "insert or replace into monthly_rollups values (?, ?, ?, ?, ?);",
+            ((month.toordinal(), *(str(amount) for amount in amounts)) for month, *amounts in rollups)
+        )
+
+    def get_rollups(
+        self,
+        from_month: Optional[date] = None,
+        to_month: Optional[date] = None
+    ) -> List[Tuple[date, Decimal, Decimal, Decimal, Decimal]]:
+        """
+        Method to get the monthly rollups between two months, in order.
+
+        Parameters
+        ----------
+        from_month : Optional[date]
+            The first day of the first month. If None, the rollups start from the first one.
+
+        to_month : Optional[date]
+            The first day of the last (inclusive) month. If None, the rollups go until the last one.
+
+        Returns
+        --------
+        List[Tuple[date, Decimal, Decimal, Decimal, Decimal]]
+            The (month, principal_advanced, principal_repaid, interest_accrued, interest_paid) of each rollup. The
+            months without any rollup are not returned.
+        """
+        cursor = self.connection.cursor()
+        result = cursor.execute(
+            """
+            select * from monthly_rollups
+            where month >= ? and month <= ?
+            order by month;
+            """,
+            (
+                from_month.toordinal() if from_month is not None else date.min.toordinal(),
+                to_month.toordinal() if to_month is not None else date.max.toordinal()
+            )
+        )
+
+        return [(date.fromordinal(month), *(Decimal(amount) for amount in amounts)) for month, *amounts in result]
+
+    def delete_rollups_from(self, month: date) -> None:
+        """
+        Method to delete all the monthly rollups from the given month on.
+
+        Parameters
+        ----------
+        month : date
+            The first day of the month to delete the rollups from.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("delete from monthly_rollups where month >= ?;", (month.toordinal(),))
+
+    def get_rolled_up_until(self) -> Optional[int]:
+        """
+        Method to get the day the rollups are complete before.
+
+        Returns
+        --------
+        Optional[int]
+            The (exclusive) day ordinal the events before it are rolled up, or None if no rollup was ever saved.
+        """
+        cursor = self.connection.cursor()
+        row = cursor.execute("select rolled_up_until from rollup_watermark;").fetchone()
+
+        return row[0] if row is not None else None
+
+    def save_rolled_up_until(self, rolled_up_until: int) -> None:
+        """
+        Method to save the day the rollups are complete before, without committing it.
+
+        Parameters
+        ----------
+        rolled_up_until : int
+            The (exclusive) day ordinal the events before it are rolled up.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "insert or replace into rollup_watermark (id, rolled_up_until) values (1, ?);", (rolled_up_until,)
+        )
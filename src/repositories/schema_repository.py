@@ -0,0 +1,282 @@
+"""
+Module containing the 'SchemaRepository' Class.
+"""
+
+import sqlite3
+from typing import List, Optional, Tuple
+
+from .event_repository import to_cents, to_day_ordinal, to_exact_amount
+
+
+class SchemaRepository():
+    """
+    Class to create the database schema and keep existing databases up to date with it.
+
+    The schema version of a database is stored in its `user_version` pragma. Each migration brings a database
+    from the previous version to the next one, so a new database is created by creating the original `events`
+    table and then applying all the migrations, exactly as an existing database would be upgraded.
+
+    Attributes
+    ----------
+    connection : sqlite3.Connection
+        The connection to the database.
+    """
+    connection: sqlite3.Connection
+
+    MIGRATIONS: List[Tuple[str, List[str]]] = [
+        (
+            "create the ledger checkpoints table",
+            [
+                """
+                create table if not exists checkpoints
+                (
+                    last_event_id integer not null primary key,
+                    last_event_date date not null,
+                    advance_count integer not null,
+                    advance_balance text not null,
+                    interest_payable_balance text not null,
+                    interest_paid text not null,
+                    payments_for_future text not null,
+                    open_advances text not null
+                );
+                """,
+                """
+                create index if not exists checkpoints_last_event_date_idx
+                on checkpoints (last_event_date, last_event_id);
+                """,
+            ]
+        ),
+        (
+            "index the events by their date",
+            [
+                "create index if not exists events_date_created_idx on events (date_created, id);",
+            ]
+        ),
+        (
+            "create the balances cache table",
+            [
+                """
+                create table if not exists balance_cache
+                (
+                    end_date date not null,
+                    engine varchar(32) not null,
+                    fingerprint text not null,
+                    last_used integer not null,
+                    size integer not null,
+                    advance_balance text not null,
+                    interest_payable_balance text not null,
+                    interest_paid text not null,
+                    payments_for_future text not null,
+                    advance_offset integer not null,
+                    advance_dates blob not null,
+                    advance_amounts blob not null,
+                    inexact_amounts text not null,
+                    open_balances text not null,
+                    primary key (end_date, engine)
+                );
+                """,
+            ]
+        ),
+        (
+            "add the customer of the events",
+            [
+                "alter table events add column customer_id varchar(64) not null default 'default';",
+                "create index if not exists events_customer_id_idx on events (customer_id, date_created, id);",
+            ]
+        ),
+        (
+            "store the events as type codes, integer cents and day ordinals",
+            [
+                """
+                create table events_v2
+                (
+                    id integer not null primary key autoincrement,
+                    type_code integer not null,
+                    cents integer not null,
+                    date_created integer not null,
+                    exact_amount text,
+                    customer_id varchar(64) not null default 'default'
+                    CHECK (type_code IN (1, 2))
+                );
+                """,
+                """
+                insert into events_v2 (id, type_code, cents, date_created, exact_amount, customer_id)
+                select
+                    id,
+                    case type when 'advance' then 1 when 'payment' then 2 end,
+                    to_cents(amount),
+                    to_day_ordinal(date_created),
+                    to_exact_amount(amount),
+                    customer_id
+                from events
+                order by id;
+                """,
+                "drop table events;",
+                "alter table events_v2 rename to events;",
+                "create index events_date_created_idx on events (date_created, id);",
+                "create index events_customer_id_idx on events (customer_id, date_created, id);",
+            ]
+        ),
+        (
+            "create the load offsets table",
+            [
+                """
+                create table if not exists load_offsets
+                (
+                    source_path text not null primary key,
+                    byte_offset integer not null
+                );
+                """,
+            ]
+        ),
+        (
+            "create the advance allocations table",
+            [
+                """
+                create table if not exists allocations
+                (
+                    advance_id integer not null,
+                    event_date integer not null,
+                    event_id integer not null,
+                    amount text not null,
+                    primary key (advance_id, event_date, event_id)
+                ) without rowid;
+                """,
+                "create index if not exists allocations_event_date_idx on allocations (event_date);",
+                """
+                create table if not exists allocation_watermark
+                (
+                    id integer not null primary key CHECK (id = 1),
+                    indexed_until integer not null
+                );
+                """,
+            ]
+        ),
+        (
+            "create the monthly rollups table",
+            [
+                """
+                create table if not exists monthly_rollups
+                (
+                    month integer not null primary key,
+                    principal_advanced text not null,
+                    principal_repaid text not null,
+                    interest_accrued text not null,
+                    interest_paid text not null
+                );
+                """,
+                """
+                create table if not exists rollup_watermark
+                (
+                    id integer not null primary key CHECK (id = 1),
+                    rolled_up_until integer not null
+                );
+                """,
+            ]
+        ),
+        (
+            "identify the database",
+            [
+                """
+                create table if not exists database_identity
+                (
+                    id integer not null primary key CHECK (id = 1),
+                    database_id text not null
+                );
+                """,
+                "insert or ignore into database_identity (id, database_id) values (1, lower(hex(randomblob(16))));",
+            ]
+        ),
+    ]
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        connection : sqlite3.Connection
+            The connection to the database.
+        """
+        self.connection = connection
+
+    def get_version(self) -> int:
+        """
+        Method to get the schema version of the database.
+
+        Returns
+        --------
+        int
+            The schema version.
+        """
+        return self.connection.execute("pragma user_version;").fetchone()[0]
+
+    def get_database_id(self) -> Optional[str]:
+        """
+        Method to get the random id given to the database when it was created or migrated.
+
+        A database created again at the same path gets a new id, so the id tells it apart from the previous one.
+
+        Returns
+        --------
+        Optional[str]
+            The database id, or None if the database was not migrated yet.
+        """
+        try:
+            row = self.connection.execute("select database_id from database_identity where id = 1;").fetchone()
+
+        except sqlite3.OperationalError:
+            return None
+
+        return row[0] if row is not None else None
+
+    def create_schema(self) -> None:
+        """
+        Method to create the schema of a new database.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            create table events
+            (
+                id integer not null primary key autoincrement,
+                type varchar(32) not null,
+                amount decimal not null,
+                date_created date not null
+                CHECK (type IN ("advance", "payment"))
+            );
+            """
+        )
+        self.migrate()
+
+    def migrate(self) -> List[str]:
+        """
+        Method to apply all the pending migrations, each one in its own transaction.
+
+        Returns
+        --------
+        List[str]
+            The description of each applied migration.
+        """
+        applied = []
+        version = self.get_version()
+
+        # FUNCTIONS THAT ENCODE THE EVENTS EXACTLY AS THEY ARE ENCODED WHEN LOADED
+        for name, function in (
+            ("to_cents", to_cents), ("to_day_ordinal", to_day_ordinal), ("to_exact_amount", to_exact_amount)
+        ):
+            self.connection.create_function(name, 1, function, deterministic=True)
+
+        for next_version, (description, statements) in enumerate(self.MIGRATIONS[version:], start=version + 1):
+            cursor = self.connection.cursor()
+            if not self.connection.in_transaction:
+                cursor.execute("begin;")
+
+            for statement in statements:
+                cursor.execute(statement)
+
+            cursor.execute(f"pragma user_version = {next_version};")
+            self.connection.commit()
+            applied.append(description)
+
+        return applied
@@ -1,3 +1,6 @@
 """"""
 
-from .calculate_advances_stats import CalculateAdvances
\ No newline at end of file
+from .interfaces import LedgerObserver
+from .calculate_advances_stats import CalculateAdvances
+from .fixed_point_calculate_advances import FixedPointCalculateAdvances
+from .vectorized_calculate_advances import VectorizedCalculateAdvances
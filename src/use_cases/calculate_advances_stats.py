@@ -5,53 +5,84 @@ Module containing the 'CalculateAdvances' Class.
 # TYPING IMPORTS
 from __future__ import annotations
 from datetime import date
-from typing import List, TYPE_CHECKING
+from typing import Iterable, List, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..entities import EventEntity
+    from .interfaces import LedgerObserver
 
 # MODULE IMPORTS
+from dataclasses import replace
 from decimal import Decimal
 
-from ..entities import BalanceEntity
+from ..entities import AdvanceStore, BalanceEntity
 
 
 class CalculateAdvances():
     """
     Class to calculate all the advances.
 
+    The interest is accrued lazily, up to each entity date right before the entity is processed, so the entities
+    can be streamed one at a time without looking ahead for the next entity date.
+
     Attributes
     ----------
-    entities : List[EventEntity]
-        A list containing all the entities to be calculated.
+    entities : Iterable[EventEntity]
+        The entities to be calculated, in replay order. They are consumed only once.
 
-    end_date : date
-        The end date to process until it.
+    end_date : Optional[date]
+        The end date to process until it. If None, the interest is accrued only until the last entity date.
 
     balance_entity : BalanceEntity
         An entity containing all the events balance.
+
+    last_date : Optional[date]
+        The date until which the interest payable balance was accrued.
+
+    observers : List[LedgerObserver]
+        The observers notified after each entity is processed.
     """
-    entities: List[EventEntity]
-    end_date: date
+    entities: Iterable[EventEntity]
+    end_date: Optional[date]
 
     balance_entity: BalanceEntity
-
-    def __init__(self, entities: List[EventEntity], end_date: date) -> None:
+    last_date: Optional[date]
+    observers: List[LedgerObserver]
+
+    def __init__(
+        self,
+        entities: Iterable[EventEntity],
+        end_date: Optional[date],
+        balance_entity: Optional[BalanceEntity] = None,
+        start_date: Optional[date] = None,
+        observers: Optional[List[LedgerObserver]] = None
+    ) -> None:
         """
         Constructor to set up some attributes.
 
         Parameters
         ----------
-        entities : List[EventEntity]
-            A list containing all the entities to be calculated.
+        entities : Iterable[EventEntity]
+            The entities to be calculated, in replay order. They are consumed only once.
 
-        end_date: date
+        end_date: Optional[date]
             The end date to process until it.
+
+        balance_entity : Optional[BalanceEntity]
+            The balance to resume the calculation from. A new one is created if not given.
+
+        start_date : Optional[date]
+            The date until which the interest of the given balance entity was already accrued.
+
+        observers : Optional[List[LedgerObserver]]
+            The observers notified after each entity is processed.
         """
         self.entities = entities
         self.end_date = end_date
 
-        self.balance_entity = BalanceEntity()
+        self.balance_entity = balance_entity if balance_entity is not None else BalanceEntity()
+        self.last_date = start_date
+        self.observers = observers if observers is not None else []
 
     def get_balance(self) -> BalanceEntity:
         """
@@ -62,47 +93,115 @@ class CalculateAdvances():
         BalanceEntity
             A reference to all the events balance.
         """
-        for current_entity, next_entity in zip(self.entities, self.entities[1:]):
+        for current_entity in self.entities:
+            self.process_entity(current_entity)
 
-            next_entity_date = next_entity.event_date
+        # ACCRUING THE INTEREST AFTER THE LAST EVENT
+        if self.end_date is not None and self.last_date is not None:
+            self.calculate_interest_payable_balance(self.end_date)
 
-            self.process_entity(current_entity, next_entity_date)
+        return self.balance_entity
 
-        # PROCESSING THE LAST EVENT
-        current_entity = self.entities[-1]
-        self.process_entity(current_entity, self.end_date)
+    def get_balances(self, end_dates: List[date], with_advances: bool = True) -> List[BalanceEntity]:
+        """
+        Method to get the balance as of each one of the end dates, in a single pass over the entities.
 
-        return self.balance_entity
+        Parameters
+        ----------
+        end_dates : List[date]
+            The (exclusive) end dates, in ascending order. The entities must not go past the last one.
+
+        with_advances : bool
+            Whether each snapshot keeps a copy of the advances. If not, only the summary totals are taken, so
+            the snapshots do not grow with the number of advances.
 
-    def process_entity(self, entity: EventEntity, next_entity_date: date) -> None:
+        Returns
+        --------
+        List[BalanceEntity]
+            A snapshot of all the events balance as of each end date.
+        """
+        snapshots: List[BalanceEntity] = []
+
+        for current_entity in self.entities:
+            # TAKING THE SNAPSHOTS OF THE END DATES THE ENTITY IS NOT BEFORE
+            while len(snapshots) < len(end_dates) and current_entity.event_date >= end_dates[len(snapshots)]:
+                snapshots.append(self.take_snapshot(end_dates[len(snapshots)], with_advances))
+
+            self.process_entity(current_entity)
+
+        while len(snapshots) < len(end_dates):
+            snapshots.append(self.take_snapshot(end_dates[len(snapshots)], with_advances))
+
+        return snapshots
+
+    def take_snapshot(self, end_date: date, with_advances: bool = True) -> BalanceEntity:
+        """
+        Method to take a copy of the current balance, with the interest accrued until the end date.
+
+        The current balance itself is not changed, so the interest keeps being accrued exactly as if there
+        was no snapshot.
+
+        Parameters
+        ----------
+        end_date : date
+            The (exclusive) end date to accrue the interest until it.
+
+        with_advances : bool
+            Whether the advances are copied. If not, the copy only counts them, without keeping any of them.
+
+        Returns
+        --------
+        BalanceEntity
+            A copy of the current balance as of the end date.
+        """
+        interest_payable_balance = self.balance_entity.interest_payable_balance
+
+        if self.last_date is not None:
+            days_between_end_date = (end_date - self.last_date).days
+            interest_payable_balance += (
+                Decimal(0.00035) * self.balance_entity.advance_balance * days_between_end_date
+            )
+
+        advances = self.balance_entity.advances
+
+        return replace(
+            self.balance_entity,
+            interest_payable_balance=interest_payable_balance,
+            advances=advances.copy() if with_advances else AdvanceStore(len(advances))
+        )
+
+    def process_entity(self, entity: EventEntity) -> None:
         """
         Method to process a single entity.
 
+        The interest is accrued up to the entity date before the entity itself is processed.
+
         Parameters
         ----------
         entity : EventEntity
             A reference to the entity to be processed.
-
-        next_entity_date : date
-            The next entity date.
         """
+        if self.last_date is not None:
+            self.calculate_interest_payable_balance(entity.event_date)
+
+        self.last_date = entity.event_date
         entity.process_entity(self.balance_entity)
-        self.calculate_interest_payable_balance(entity, next_entity_date)
 
-    def calculate_interest_payable_balance(self, entity: EventEntity, next_entity_date: date) -> None:
+        for observer in self.observers:
+            observer.on_entity_processed(entity, self.balance_entity)
+
+    def calculate_interest_payable_balance(self, next_date: date) -> None:
         """
-        Method to calculate the interest payable balance of that current entity.
+        Method to accrue the interest payable balance from the last accrued date until the next date.
 
         Parameters
         -----------
-        entity : EventEntity
-            A reference to the entity to be processed.
-
-        next_entity_date : date
-            The next entity date.
+        next_date : date
+            The date to accrue the interest until it.
         """
-        days_between_end_date = (next_entity_date - entity.event_date).days
+        days_between_end_date = (next_date - self.last_date).days
 
         accrued_interest = Decimal(0.00035) * self.balance_entity.advance_balance * days_between_end_date
 
         self.balance_entity.interest_payable_balance += accrued_interest
+        self.last_date = next_date
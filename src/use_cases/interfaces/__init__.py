@@ -0,0 +1,3 @@
+""""""
+
+from .ledger_observer_interface import LedgerObserver
@@ -0,0 +1,38 @@
+"""
+Module containing the 'LedgerObserver' Interface.
+"""
+
+# TYPING IMPORTS
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ...entities import EventEntity, BalanceEntity
+
+# MODULE IMPORTS
+from abc import ABC, abstractmethod
+
+
+class LedgerObserver(ABC):
+    """
+    Interface to define that all classes that wants to be notified while the ledger is replayed
+    must implement the following methods:
+
+    * on_entity_processed(entity: EventEntity, balance_entity: BalanceEntity) -> None
+    """
+
+    @abstractmethod
+    def on_entity_processed(self, entity: EventEntity, balance_entity: BalanceEntity) -> None:
+        """
+        Abstract method called right after an entity was processed.
+
+        At this point the interest payable balance is accrued up to the entity date.
+
+        Parameters
+        ----------
+        entity : EventEntity
+            A reference to the processed entity.
+
+        balance_entity : BalanceEntity
+            Entity containing all the current balances.
+        """
@@ -0,0 +1,251 @@
+"""
+Module containing the 'VectorizedCalculateAdvances' Class.
+
+This engine needs NumPy, which is an optional dependency. When it is not installed, `NUMPY_AVAILABLE` is False
+and the 'VectorizedCalculateAdvances' Class falls back to the 'FixedPointCalculateAdvances' Class, which applies
+exactly the same arithmetic in pure Python.
+"""
+
+from array import array
+from collections import deque
+from datetime import date
+from typing import Any, Iterable, Optional, Tuple
+
+from ..entities import AdvanceStore, BalanceEntity, ADVANCE_TYPE_CODE
+from .fixed_point_calculate_advances import (
+    FixedPointCalculateAdvances,
+    INTEREST_RATE_DENOMINATOR,
+    INTEREST_RATE_NUMERATOR,
+    UNITS_PER_CENT,
+    units_to_decimal
+)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+
+except ImportError:  # pragma: no cover
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+class VectorizedCalculateAdvances():
+    """
+    Class to calculate all the advances with NumPy vectorized passes.
+
+    Since payments are applied to the oldest advances first, the money paid towards the principal is always
+    applied to the advances in order. So, instead of keeping every advance balance up to date along the replay:
+    * the advanced total is the prefix sum of the advance amounts;
+    * the aggregate advance balance is the advanced total minus the money paid towards the principal, and the
+      balance applicable to future advances is whatever is left of that money;
+    * the advance balances are derived at the end, with a single search over the prefix sums: every advance whose
+      prefix sum is covered by the principal paid is closed, the next one is partially paid and the other ones
+      are still whole.
+
+    Payments always go to the interest first, so the interest accrued before a payment decides how much of it goes
+    to the principal, which in turn decides the interest accrued after it. While there is no advance balance nor
+    interest payable, though, no interest is accrued and the payments go straight to the principal, so the whole
+    stretch of events until the advance balance is positive over a day gap is applied at once from the prefix sums.
+    Only the events while interest is accrued or payable are replayed one by one, over plain integers.
+
+    The amounts and the rounding policy are the same as the 'FixedPointCalculateAdvances' Class, so both engines
+    return exactly the same balance.
+
+    Attributes
+    ----------
+    events : Iterable[Tuple[Any]]
+        The (id, type_code, cents, date_created, exact_amount) rows of the events, in replay order.
+
+    end_date : Optional[date]
+        The (exclusive) end date to process until it. If None, the interest is accrued only until the last event.
+    """
+    events: Iterable[Tuple[Any]]
+    end_date: Optional[date]
+
+    # HOW MANY EVENTS ARE FIRST SEARCHED OR REPLAYED AT ONCE, DOUBLED WHILE THE STRETCH GOES ON
+    BLOCK_SIZE = 256
+
+    def __init__(self, events: Iterable[Tuple[Any]], end_date: Optional[date]) -> None:
+        """
+        Constructor to set up some attributes.
+
+        Parameters
+        ----------
+        events : Iterable[Tuple[Any]]
+            The (id, type_code, cents, date_created, exact_amount) rows of the events, in replay order.
+
+        end_date : Optional[date]
+            The (exclusive) end date to process until it.
+        """
+        self.events = events
+        self.end_date = end_date
+
+    def get_balance(self) -> BalanceEntity:
+        """
+        Method to get the final balance.
+
+        Returns
+        --------
+        BalanceEntity
+            A reference to all the events balance, with the amounts converted back to Decimal.
+        """
+        if not NUMPY_AVAILABLE:
+            return FixedPointCalculateAdvances(self.events, self.end_date).get_balance()
+
+        # READING THE ROWS STRAIGHT INTO COLUMNS, WITHOUT KEEPING THE ROWS THEMSELVES
+        columns = np.fromiter(
+            ((row[1], row[2], row[3]) for row in self.events),
+            dtype=[("type_code", np.int64), ("cents", np.int64), ("date_created", np.int64)]
+        )
+
+        return self.get_columns_balance(columns["type_code"], columns["cents"], columns["date_created"])
+
+    def get_columns_balance(self, types: "np.ndarray", cents: "np.ndarray", ordinals: "np.ndarray") -> BalanceEntity:
+        """
+        Method to get the final balance from the columns of the events, instead of their rows.
+
+        The columns are only read, so they can be views over a buffer shared with other calculations.
+
+        Parameters
+        ----------
+        types : np.ndarray
+            The type code of each event, in replay order.
+
+        cents : np.ndarray
+            The amount in cents of each event, in replay order.
+
+        ordinals : np.ndarray
+            The day ordinal of each event, in replay order.
+
+        Returns
+        --------
+        BalanceEntity
+            A reference to all the events balance, with the amounts converted back to Decimal.
+        """
+        end_ordinal = self.end_date.toordinal() if self.end_date is not None else None
+
+        # DROPPING THE EVENTS ON OR AFTER THE END DATE
+        if end_ordinal is not None:
+            count = int(np.searchsorted(ordinals, end_ordinal))
+            ordinals = ordinals[:count]
+            types = types[:count]
+            cents = cents[:count]
+
+        if not len(ordinals):
+            return BalanceEntity()
+
+        is_advance = types == ADVANCE_TYPE_CODE
+        gaps = np.diff(ordinals, prepend=ordinals[0])
+
+        # THE CENTS ADVANCED, PAID AND ADVANCED NET OF THE PAYMENTS BEFORE EACH EVENT
+        advance_amounts = np.where(is_advance, cents, 0)
+        advanced_prefix = np.concatenate(([0], np.cumsum(advance_amounts)))
+        paid_prefix = np.concatenate(([0], np.cumsum(cents - advance_amounts)))
+        net_prefix = advanced_prefix - paid_prefix
+
+        count = len(ordinals)
+        max_cents = np.iinfo(np.int64).max
+
+        advanced = 0
+        principal_paid = 0
+        interest_accrued = 0
+        interest_paid = 0
+
+        index = 0
+        while index < count:
+            # APPLYING AT ONCE THE EVENTS UNTIL THE ADVANCE BALANCE IS POSITIVE OVER A DAY GAP
+            if interest_accrued == interest_paid and advanced <= principal_paid:
+                # THE BALANCE IS POSITIVE ONCE THE NET CENTS ADVANCED SINCE THE INDEX ARE ABOVE THE LIMIT
+                limit = int(net_prefix[index]) + (principal_paid - advanced) // UNITS_PER_CENT
+                stop = count
+
+                if limit < max_cents:
+                    block_start = index + 1
+                    block_size = self.BLOCK_SIZE
+
+                    while block_start < count:
+                        block_end = min(block_start + block_size, count)
+                        accruing = (net_prefix[block_start:block_end] > limit) & (gaps[block_start:block_end] > 0)
+
+                        if accruing.any():
+                            stop = block_start + int(accruing.argmax())
+                            break
+
+                        block_start = block_end
+                        block_size *= 2
+
+                advanced += int(advanced_prefix[stop] - advanced_prefix[index]) * UNITS_PER_CENT
+                principal_paid += int(paid_prefix[stop] - paid_prefix[index]) * UNITS_PER_CENT
+                index = stop
+                continue
+
+            # REPLAYING THE INTEREST FIRST ALLOCATION OF THE PAYMENTS, UNTIL NO INTEREST IS ACCRUED NOR PAYABLE
+            block_size = self.BLOCK_SIZE
+            replaying = True
+
+            while replaying and index < count:
+                block_end = min(index + block_size, count)
+                block = zip(
+                    is_advance[index:block_end].tolist(),
+                    cents[index:block_end].tolist(),
+                    gaps[index:block_end].tolist()
+                )
+                block_size *= 2
+
+                for advance, amount, days in block:
+                    index += 1
+                    amount *= UNITS_PER_CENT
+
+                    if days and advanced > principal_paid:
+                        interest_accrued += (
+                            (advanced - principal_paid) * INTEREST_RATE_NUMERATOR * days // INTEREST_RATE_DENOMINATOR
+                        )
+
+                    if advance:
+                        advanced += amount
+
+                    elif amount <= interest_accrued - interest_paid:
+                        # PAYING ONLY A PORTION OF THE INTEREST BALANCE AMOUNT
+                        interest_paid += amount
+
+                    else:
+                        # PAYING THE INTEREST BALANCE AMOUNT IN TOTALLY, THE REST GOES TO THE PRINCIPAL
+                        principal_paid += amount - (interest_accrued - interest_paid)
+                        interest_paid = interest_accrued
+
+                    if interest_accrued == interest_paid and advanced <= principal_paid:
+                        replaying = False
+                        break
+
+        # ACCRUING THE INTEREST AFTER THE LAST EVENT
+        advance_balance = max(advanced - principal_paid, 0)
+        if end_ordinal is not None:
+            interest_accrued += (
+                advance_balance * INTEREST_RATE_NUMERATOR * (end_ordinal - int(ordinals[-1]))
+                // INTEREST_RATE_DENOMINATOR
+            )
+
+        # DERIVING THE ADVANCE BALANCES FROM THE PREFIX SUMS OF THE ADVANCED AMOUNTS
+        advance_cents = cents[is_advance]
+        advanced_cents = np.cumsum(advance_cents)
+        first_open_index = int(np.searchsorted(advanced_cents, principal_paid // UNITS_PER_CENT, side="right"))
+
+        advances = AdvanceStore()
+        advances.dates = array("i", ordinals[is_advance].astype(np.int32).tobytes())
+        advances.amounts = array("q", advance_cents.tobytes())
+
+        if first_open_index < len(advance_cents):
+            partial_balance = int(advanced_cents[first_open_index]) * UNITS_PER_CENT - principal_paid
+            advances.open_balances = deque([units_to_decimal(partial_balance)])
+            advances.open_balances.extend(
+                units_to_decimal(amount * UNITS_PER_CENT)
+                for amount in advance_cents[first_open_index + 1:].tolist()
+            )
+
+        return BalanceEntity(
+            advance_balance=units_to_decimal(advance_balance),
+            interest_payable_balance=units_to_decimal(interest_accrued - interest_paid),
+            interest_paid=units_to_decimal(interest_paid),
+            payments_for_future=units_to_decimal(max(principal_paid - advanced, 0)),
+            advances=advances
+        )
@@ -1,7 +1,18 @@
 #!/usr/bin/env python3
 from cli import interface
+from src.handlers import AsyncQueryHandler, DaemonClient, DaemonHandler, LedgerHandler
+from src.repositories import SchemaRepository
 from click.testing import CliRunner
+from datetime import date
+import asyncio
+import bz2
+import csv
+import gzip
+import json
+import lzma
 import os
+import sqlite3
+import threading
 import unittest
 
 
@@ -108,6 +119,74 @@ class CLITest(unittest.TestCase):
             self.assertEqual(0, result.exit_code)
             self.assertEqual(False, os.path.exists(os.path.join(os.getcwd(), "db.sqlite3")))
 
+    def test_migrate_db(self):
+        """Test migration of a DB created before the schema versioning."""
+        test_file_1 = os.path.join(self.test_dir, "test1.csv")
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            with sqlite3.connect("db.sqlite3") as connection:
+                connection.execute(
+                    """
+                    create table events
+                    (
+                        id integer not null primary key autoincrement,
+                        type varchar(32) not null,
+                        amount decimal not null,
+                        date_created date not null
+                        CHECK (type IN ("advance", "payment"))
+                    );
+                    """
+                )
+            result = self.runner.invoke(interface, ["migrate-db"])
+            self.assertEqual(0, result.exit_code)
+            self.assertEqual(
+                "".join(f"Applied migration: {description}\n" for description, _ in SchemaRepository.MIGRATIONS)
+                + f"Database at {os.path.join(os.getcwd(), 'db.sqlite3')} is at schema version "
+                f"{len(SchemaRepository.MIGRATIONS)}\n",
+                result.output,
+            )
+            with sqlite3.connect("db.sqlite3") as connection:
+                indexes = connection.execute("select name from sqlite_master where type = 'index';").fetchall()
+            self.assertIn(("events_date_created_idx",), indexes)
+
+            self.runner.invoke(interface, ["load", test_file_1])
+            result = self.runner.invoke(interface, ["balances", "2021-05-25"])
+            self.assertEqual(0, result.exit_code)
+            with open(os.path.join(self.test_dir, "test1.correct.2021-05-25.txt"), "r") as correct_f:
+                self.assertEqual(correct_f.read(), result.output)
+
+    def test_migrate_db_events(self):
+        """Test that the events of an existing DB are converted to type codes, integer cents and day ordinals."""
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            with sqlite3.connect("db.sqlite3") as connection:
+                connection.execute(
+                    """
+                    create table events
+                    (
+                        id integer not null primary key autoincrement,
+                        type varchar(32) not null,
+                        amount decimal not null,
+                        date_created date not null
+                        CHECK (type IN ("advance", "payment"))
+                    );
+                    """
+                )
+                with open(os.path.join(self.test_dir, "test2.csv"), "r") as test_f:
+                    connection.executemany(
+                        "insert into events (type, date_created, amount) values (?, ?, ?);",
+                        [line.strip().split(",") for line in test_f if line.strip()]
+                    )
+
+            result = self.runner.invoke(interface, ["migrate-db"])
+            self.assertEqual(0, result.exit_code)
+            with sqlite3.connect("db.sqlite3") as connection:
+                self.assertEqual(
+                    (1, 1, 225000, 737932, None, "default"), connection.execute("select * from events;").fetchone()
+                )
+
+            result = self.runner.invoke(interface, ["balances", "2021-10-01"])
+            with open(os.path.join(self.test_dir, "test2.correct.2021-10-01.txt"), "r") as correct_f:
+                self.assertEqual(correct_f.read(), result.output)
+
     def test_load(self):
         """
         Test load command against test1 & test7 input files.
@@ -132,6 +211,26 @@ class CLITest(unittest.TestCase):
             self.assertEqual(0, result.exit_code)
             self.assertEqual(f"Loaded 500 events from {test_file_7}\n", result.output)
 
+    def test_load_batches(self):
+        """Test the batched load path with deferred index build and progress report."""
+        test_file_7 = os.path.join(self.test_dir, "test7.csv")
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+            result = self.runner.invoke(
+                interface, ["load", test_file_7, "--batch-size", "64", "--defer-index", "--progress"]
+            )
+            self.assertEqual(0, result.exit_code)
+            self.assertEqual(8, result.output.count("rows/s"))
+            self.assertTrue(result.output.endswith(f"Loaded 500 events from {test_file_7}\n"))
+            with sqlite3.connect("db.sqlite3") as connection:
+                self.assertEqual(500, connection.execute("select count(*) from events;").fetchone()[0])
+                indexes = connection.execute("select name from sqlite_master where type = 'index';").fetchall()
+            self.assertIn(("events_date_created_idx",), indexes)
+
+            result = self.runner.invoke(interface, ["balances", "2022-01-11"])
+            with open(os.path.join(self.test_dir, "test7.correct.2022-01-11.txt"), "r") as correct_f:
+                self.assertEqual(correct_f.read(), result.output)
+
     def test_results(self):
         """Test `balances` results against suite of correct output."""
         for test_filename, output_date, output in TEST_INPUTS:
@@ -149,6 +248,665 @@ class CLITest(unittest.TestCase):
                 with open(output_path, "r") as correct_f:
                     self.assertEqual(correct_f.read(), result.output)
 
+    def test_results_fixed_point_engine(self):
+        """Test `balances` results of the fixed-point engine against suite of correct output."""
+        for test_filename, output_date, output in TEST_INPUTS:
+            msg = f"Testing :: {test_filename} fixed-point results of {output_date}"
+            with self.runner.isolated_filesystem(temp_dir="/tmp"), self.subTest(msg=msg):
+                self.runner.invoke(interface, ["create-db"])
+                self.runner.invoke(interface, ["load", os.path.join(self.test_dir, test_filename)])
+                result = self.runner.invoke(interface, ["balances", output_date, "--engine", "fixed"])
+                self.assertEqual(0, result.exit_code)
+                with open(os.path.join(self.test_dir, output), "r") as correct_f:
+                    self.assertEqual(correct_f.read(), result.output)
+
+    def test_results_vectorized_engine(self):
+        """Test `balances` results of the vectorized engine against suite of correct output."""
+        for test_filename, output_date, output in TEST_INPUTS:
+            msg = f"Testing :: {test_filename} vectorized results of {output_date}"
+            with self.runner.isolated_filesystem(temp_dir="/tmp"), self.subTest(msg=msg):
+                self.runner.invoke(interface, ["create-db"])
+                self.runner.invoke(interface, ["load", os.path.join(self.test_dir, test_filename)])
+                result = self.runner.invoke(interface, ["balances", output_date, "--engine", "vector"])
+                self.assertEqual(0, result.exit_code)
+                with open(os.path.join(self.test_dir, output), "r") as correct_f:
+                    self.assertEqual(correct_f.read(), result.output)
+
+    def test_results_multiple_dates(self):
+        """Test `balances` results of several end dates computed in a single replay."""
+        test_file_2 = os.path.join(self.test_dir, "test2.csv")
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+            self.runner.invoke(interface, ["load", test_file_2])
+            result = self.runner.invoke(interface, ["balances", "2021-10-01", "2021-07-08"])
+            self.assertEqual(0, result.exit_code)
+            expected = []
+            for output_date in ["2021-07-08", "2021-10-01"]:
+                with open(os.path.join(self.test_dir, f"test2.correct.{output_date}.txt"), "r") as correct_f:
+                    expected.append(
+                        f"Balances as of {output_date}\n"
+                        "==========================================================\n" + correct_f.read()
+                    )
+            self.assertEqual("\n".join(expected), result.output)
+
+            result = self.runner.invoke(
+                interface, ["balances", "--every", "month", "--from", "2021-05-15", "--to", "2021-10-01"]
+            )
+            self.assertEqual(0, result.exit_code)
+            headers = [line for line in result.output.splitlines() if line.startswith("Balances as of")]
+            self.assertEqual(
+                [f"Balances as of {output_date}" for output_date in
+                 ["2021-05-31", "2021-06-30", "2021-07-31", "2021-08-31", "2021-09-30"]],
+                headers,
+            )
+
+            # WITHOUT ANY ADVANCE DISPLAYED, ONLY THE SUMMARIES ARE TAKEN, AND THEY ARE NOT CACHED
+            arguments = ["balances", "--every", "week", "--from", "2021-05-15", "--to", "2021-10-01", "--format", "csv"]
+            summaries = self.runner.invoke(interface, [*arguments, "--limit", "0"]).output
+            result = self.runner.invoke(interface, arguments)
+            self.assertEqual(
+                [line for line in result.output.splitlines() if ",summary," in line], summaries.splitlines()[1:]
+            )
+            self.assertIn(",advance,", result.output)
+
+    def test_checkpoints(self):
+        """Test `balances` results when resuming from periodic checkpoints."""
+        test_file_7 = os.path.join(self.test_dir, "test7.csv")
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+            result = self.runner.invoke(interface, ["load", test_file_7, "--checkpoint-interval", "50"])
+            self.assertEqual(0, result.exit_code)
+            with sqlite3.connect("db.sqlite3") as connection:
+                checkpoints = connection.execute("select count(*) from checkpoints;").fetchone()[0]
+            self.assertEqual(10, checkpoints)
+
+            for output_date, output in [("2021-10-01", "test7.correct.2021-10-01.txt"),
+                                        ("2022-01-11", "test7.correct.2022-01-11.txt")]:
+                result = self.runner.invoke(interface, ["balances", output_date])
+                self.assertEqual(0, result.exit_code)
+                with open(os.path.join(self.test_dir, output), "r") as correct_f:
+                    self.assertEqual(correct_f.read(), result.output)
+
+    def test_incremental_load(self):
+        """Test that each load advances the ledger state up to its last event."""
+        with open(os.path.join(self.test_dir, "test7.csv"), "r") as test_f:
+            lines = test_f.readlines()
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            with open("first.csv", "w") as first_f:
+                first_f.writelines(lines[:300])
+            with open("second.csv", "w") as second_f:
+                second_f.writelines(lines[300:])
+
+            self.runner.invoke(interface, ["create-db"])
+            for filename in ["first.csv", "second.csv"]:
+                result = self.runner.invoke(interface, ["load", filename])
+                self.assertEqual(0, result.exit_code)
+                with sqlite3.connect("db.sqlite3") as connection:
+                    watermark = connection.execute("select max(last_event_id) from checkpoints;").fetchone()[0]
+                    last_event_id = connection.execute("select max(id) from events;").fetchone()[0]
+                self.assertEqual(last_event_id, watermark)
+
+            result = self.runner.invoke(interface, ["balances", "2022-01-11"])
+            self.assertEqual(0, result.exit_code)
+            with open(os.path.join(self.test_dir, "test7.correct.2022-01-11.txt"), "r") as correct_f:
+                self.assertEqual(correct_f.read(), result.output)
+
+    def test_checkpoints_invalidation(self):
+        """Test that loading events older than the checkpoints invalidates them."""
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            with open("late.csv", "w") as late_f:
+                late_f.write(
+                    "advance,2021-05-22,2250.00\nadvance,2021-07-05,1200.00\n"
+                    "payment,2021-07-28,4000.00\nadvance,2021-08-04,1500.00\n"
+                )
+            with open("early.csv", "w") as early_f:
+                early_f.write("payment,2021-06-03,250.00\n")
+
+            self.runner.invoke(interface, ["create-db"])
+            self.runner.invoke(interface, ["load", "late.csv", "--checkpoint-interval", "1"])
+            self.runner.invoke(interface, ["load", "early.csv", "--checkpoint-interval", "1"])
+            result = self.runner.invoke(interface, ["balances", "2021-10-01"])
+            self.assertEqual(0, result.exit_code)
+            with open(os.path.join(self.test_dir, "test2.correct.2021-10-01.txt"), "r") as correct_f:
+                self.assertEqual(correct_f.read(), result.output)
+
+    def test_balances_cache(self):
+        """Test that cached balances are reused and invalidated by loads that change them."""
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            with open("late.csv", "w") as late_f:
+                late_f.write(
+                    "advance,2021-05-22,2250.00\nadvance,2021-07-05,1200.00\n"
+                    "payment,2021-07-28,4000.00\nadvance,2021-08-04,1500.00\n"
+                )
+            with open("early.csv", "w") as early_f:
+                early_f.write("payment,2021-06-03,250.00\n")
+
+            self.runner.invoke(interface, ["create-db"])
+            self.runner.invoke(interface, ["load", "late.csv"])
+            first_result = self.runner.invoke(interface, ["balances", "2021-05-30", "2021-10-01"])
+            second_result = self.runner.invoke(interface, ["balances", "2021-05-30", "2021-10-01"])
+            self.assertEqual(first_result.output, second_result.output)
+            with sqlite3.connect("db.sqlite3") as connection:
+                self.assertEqual(2, connection.execute("select count(*) from balance_cache;").fetchone()[0])
+
+            self.runner.invoke(interface, ["load", "early.csv"])
+            with sqlite3.connect("db.sqlite3") as connection:
+                cached_dates = connection.execute("select end_date from balance_cache;").fetchall()
+            self.assertEqual([("2021-05-31",)], cached_dates)
+
+            result = self.runner.invoke(interface, ["balances", "2021-10-01"])
+            self.assertEqual(0, result.exit_code)
+            with open(os.path.join(self.test_dir, "test2.correct.2021-10-01.txt"), "r") as correct_f:
+                self.assertEqual(correct_f.read(), result.output)
+
+    def test_debug_instrumentation(self):
+        """Test that debug mode reports the instrumentation on stderr and dumps it as JSON."""
+        test_file_2 = os.path.join(self.test_dir, "test2.csv")
+        runner = CliRunner(mix_stderr=False)
+        with runner.isolated_filesystem(temp_dir="/tmp"):
+            runner.invoke(interface, ["create-db"])
+            runner.invoke(interface, ["load", test_file_2])
+            result = runner.invoke(
+                interface, ["--debug", "--metrics", "metrics.json", "balances", "2021-07-08", "--no-cache"]
+            )
+            self.assertEqual(0, result.exit_code)
+            with open(os.path.join(self.test_dir, "test2.correct.2021-07-08.txt"), "r") as correct_f:
+                self.assertEqual("[Debug mode is on]\n" + correct_f.read(), result.stdout)
+            self.assertIn("[Debug] stage calculate advances:", result.stderr)
+            self.assertIn("[Debug] advances scanned per payment: 1.00", result.stderr)
+
+            with open("metrics.json", "r") as metrics_f:
+                metrics = json.load(metrics_f)
+            self.assertEqual(3, metrics["counters"]["rows fetched"])
+            self.assertEqual(3, metrics["counters"]["entities processed"])
+            self.assertEqual(1, metrics["counters"]["advances scanned"])
+            self.assertEqual(2, metrics["counters"]["advances rendered"])
+
+    def test_serve_daemon(self):
+        """Test that balances are answered by a running daemon, which picks up newly loaded events."""
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            with open("first.csv", "w") as first_f:
+                first_f.write("advance,2021-05-22,2250.00\npayment,2021-06-03,250.00\nadvance,2021-07-05,1200.00\n")
+            with open("second.csv", "w") as second_f:
+                second_f.write("payment,2021-07-28,4000.00\nadvance,2021-08-04,1500.00\n")
+
+            self.runner.invoke(interface, ["create-db"])
+            self.runner.invoke(interface, ["load", "first.csv"])
+
+            # WITHOUT ANY CHECKPOINT, THE DAEMON REPLAYS ALL THE EVENTS WITHOUT SAVING ANY, AS IT ONLY READS
+            with sqlite3.connect("db.sqlite3") as connection:
+                connection.execute("delete from checkpoints;")
+
+            connection = sqlite3.connect("file:db.sqlite3?mode=ro", uri=True, check_same_thread=False)
+            daemon_handler = DaemonHandler(connection)
+            server = daemon_handler.build_server("127.0.0.1", 0)
+            DaemonClient.write_address(
+                "db.sqlite3.daemon", f"http://127.0.0.1:{server.server_address[1]}", daemon_handler.database_id
+            )
+            server_thread = threading.Thread(target=server.serve_forever)
+            server_thread.start()
+
+            try:
+                for csv_file, end_date in (("first.csv", "2021-07-08"), ("second.csv", "2021-10-01")):
+                    if csv_file == "second.csv":
+                        self.runner.invoke(interface, ["load", csv_file])
+
+                    result = self.runner.invoke(interface, ["balances", end_date])
+                    self.assertEqual(0, result.exit_code)
+                    with open(os.path.join(self.test_dir, f"test2.correct.{end_date}.txt"), "r") as correct_f:
+                        self.assertEqual(correct_f.read(), result.output)
+
+                self.assertEqual(5, daemon_handler.watermark)
+                self.assertEqual(3, len(daemon_handler.balance_entity.advances))
+
+                result = self.runner.invoke(interface, ["serve"])
+                self.assertEqual(1, result.exit_code)
+                self.assertIn(f"A daemon (pid {os.getpid()}) is already serving the database", result.output)
+
+                # ONLY THE DAEMON THAT WROTE THE ADDRESS FILE REMOVES IT
+                DaemonClient.remove_address("db.sqlite3.daemon", "http://127.0.0.1:0")
+                self.assertEqual(True, os.path.exists("db.sqlite3.daemon"))
+
+                result = self.runner.invoke(interface, ["drop-db"])
+                self.assertIn(f"A daemon (pid {os.getpid()}) is serving the database", result.output)
+                self.assertEqual(True, os.path.exists("db.sqlite3"))
+
+                # THE DAEMON STILL SERVES THE DELETED DATABASE, SO THE BALANCES OF THE NEW ONE ARE CALCULATED HERE
+                for path in ("db.sqlite3", "db.sqlite3-wal", "db.sqlite3-shm"):
+                    if os.path.exists(path):
+                        os.unlink(path)
+
+                self.runner.invoke(interface, ["create-db"])
+                self.runner.invoke(interface, ["load", os.path.join(self.test_dir, "test1.csv")])
+
+                result = self.runner.invoke(interface, ["balances", "2021-05-25"])
+                with open(os.path.join(self.test_dir, "test1.correct.2021-05-25.txt"), "r") as correct_f:
+                    self.assertEqual(correct_f.read(), result.output)
+
+            finally:
+                server.shutdown()
+                server.server_close()
+                server_thread.join()
+                connection.close()
+
+    def test_async_query_handler(self):
+        """Test that identical concurrent queries are coalesced and answered from read-only connections."""
+        test_file_2 = os.path.join(self.test_dir, "test2.csv")
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+            self.runner.invoke(interface, ["load", test_file_2])
+
+            async def query_balances():
+                async with AsyncQueryHandler(max_workers=4) as query_handler:
+                    balance_entities = await asyncio.gather(
+                        *[query_handler.get_balance("db.sqlite3", date(2021, 10, 2)) for _ in range(10)],
+                        query_handler.get_balance("db.sqlite3", date(2021, 7, 9))
+                    )
+                    return balance_entities, query_handler.calculations
+
+            balance_entities, calculations = asyncio.run(query_balances())
+            self.assertEqual(2, calculations)
+            self.assertIs(balance_entities[0], balance_entities[9])
+
+            with sqlite3.connect("db.sqlite3") as connection:
+                self.assertEqual("wal", connection.execute("pragma journal_mode;").fetchone()[0])
+                self.assertEqual(0, connection.execute("select count(*) from balance_cache;").fetchone()[0])
+
+                expected_balances = LedgerHandler(connection, cache_size=0).get_balances(
+                    [date(2021, 7, 9), date(2021, 10, 2)]
+                )
+            for expected_balance, balance_entity in zip(expected_balances, [balance_entities[10], balance_entities[0]]):
+                self.assertEqual(expected_balance.advance_balance, balance_entity.advance_balance)
+                self.assertEqual(expected_balance.interest_payable_balance, balance_entity.interest_payable_balance)
+                self.assertEqual(expected_balance.interest_paid, balance_entity.interest_paid)
+
+    def test_customers(self):
+        """Test that each customer is an independent ledger, and the portfolio totals add them up."""
+        customer_files = {"acme": "test2.csv", "globex": "test4.csv"}
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            rows = []
+            for customer_id, test_file in customer_files.items():
+                with open(os.path.join(self.test_dir, test_file), "r") as test_f:
+                    rows += [f"{line.strip()},{customer_id}\n" for line in test_f if line.strip()]
+            with open("customers.csv", "w") as customers_f:
+                customers_f.writelines(sorted(rows, key=lambda row: row.split(",")[1]))
+
+            self.runner.invoke(interface, ["create-db"])
+            self.runner.invoke(interface, ["load", "customers.csv"])
+
+            result = self.runner.invoke(interface, ["balances", "2022-01-10", "--customer", "globex"])
+            self.assertEqual(0, result.exit_code)
+            with open(os.path.join(self.test_dir, "test4.correct.2022-01-10.txt"), "r") as correct_f:
+                self.assertEqual(correct_f.read(), result.output)
+
+            result = self.runner.invoke(interface, ["balances", "2021-10-01", "--by-customer", "--workers", "2"])
+            self.assertEqual(0, result.exit_code)
+            lines = result.output.splitlines()
+            self.assertEqual(["acme", "globex"], [lines[5].split()[0], lines[6].split()[0]])
+            self.assertIn("Aggregate Advance Balance:                          757.79", lines)
+
+            # THE EVENTS OF BOTH CUSTOMERS ARE NEVER REPLAYED AS A SINGLE LEDGER
+            for arguments in (
+                ["balances", "2021-10-01", "--no-daemon"],
+                ["quote", "2022-02-01"],
+                ["simulate", "2022-02-01"],
+                ["advance-history", "1"],
+                ["report", "monthly"],
+                ["export-binary", "events.bin"],
+            ):
+                with self.subTest(command=arguments[0]):
+                    result = self.runner.invoke(interface, arguments)
+                    self.assertEqual(1, result.exit_code)
+                    self.assertIn("more than one customer", result.output)
+
+            result = self.runner.invoke(interface, ["export-binary", "events.bin", "--customer", "globex"])
+            self.assertEqual(0, result.exit_code)
+            result = self.runner.invoke(interface, ["balances", "2022-01-10", "--source", "events.bin"])
+            with open(os.path.join(self.test_dir, "test4.correct.2022-01-10.txt"), "r") as correct_f:
+                self.assertEqual(correct_f.read(), result.output)
+
+            for arguments in (["--by-customer", "--open-only"], ["--by-customer", "--limit", "1"]):
+                with self.subTest(arguments=arguments):
+                    result = self.runner.invoke(interface, ["balances", "2021-10-01", "--customer", "acme", *arguments])
+                    self.assertEqual(2, result.exit_code)
+
+            for arguments in (["--customer", "acme"], ["--by-customer"]):
+                with self.subTest(arguments=arguments):
+                    result = self.runner.invoke(interface, ["balances", "2021-10-01", *arguments])
+                    self.assertEqual(
+                        result.output,
+                        self.runner.invoke(interface, ["balances", "2021-10-01", *arguments, "--no-cache"]).output
+                    )
+
+    def test_binary_event_file(self):
+        """Test that the balances calculated from an exported event file, or after importing it, are the same."""
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+            self.runner.invoke(interface, ["load", os.path.join(self.test_dir, "test7.csv")])
+
+            result = self.runner.invoke(interface, ["export-binary", "events.bin"])
+            self.assertEqual(0, result.exit_code)
+            self.assertEqual("Exported 500 events to events.bin\n", result.output)
+
+            self.runner.invoke(interface, ["drop-db"])
+            for engine in ("decimal", "fixed", "vector"):
+                with self.subTest(engine=engine):
+                    result = self.runner.invoke(
+                        interface, ["balances", "2022-01-11", "--source", "events.bin", "--engine", engine]
+                    )
+                    self.assertEqual(0, result.exit_code)
+                    with open(os.path.join(self.test_dir, "test7.correct.2022-01-11.txt"), "r") as correct_f:
+                        self.assertEqual(correct_f.read(), result.output)
+
+            self.runner.invoke(interface, ["create-db"])
+            result = self.runner.invoke(interface, ["import-binary", "events.bin"])
+            self.assertEqual(0, result.exit_code)
+            result = self.runner.invoke(interface, ["balances", "2021-10-01"])
+            with open(os.path.join(self.test_dir, "test7.correct.2021-10-01.txt"), "r") as correct_f:
+                self.assertEqual(correct_f.read(), result.output)
+
+            with open("events.csv", "w") as events_f:
+                events_f.write("advance,2021-01-01,1.00\n")
+            result = self.runner.invoke(interface, ["balances", "--source", "events.csv"])
+            self.assertEqual(1, result.exit_code)
+            self.assertIn("is not a ledger event file", result.output)
+
+    def test_output_formats(self):
+        """Test the CSV and JSON Lines formats, and the filters of the displayed advances."""
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+            self.runner.invoke(interface, ["load", os.path.join(self.test_dir, "test2.csv")])
+
+            result = self.runner.invoke(
+                interface, ["balances", "2021-10-01", "--format", "csv", "--open-only", "--limit", "2"]
+            )
+            self.assertEqual(0, result.exit_code)
+            self.assertEqual(
+                "as_of,record,customer,identifier,date,initial_amount,current_balance,advance_balance,"
+                "interest_payable_balance,interest_paid,payments_for_future\n"
+                "2021-10-01,advance,,3,2021-08-04,1500.00,757.79,,,,\n"
+                "2021-10-01,summary,,,,,,757.79,15.65,57.79,0.00\n",
+                result.output
+            )
+
+            result = self.runner.invoke(interface, ["balances", "2021-10-01", "--format", "jsonl"])
+            records = [json.loads(line) for line in result.output.splitlines()]
+            self.assertEqual(4, len(records))
+            self.assertEqual(
+                {"as_of": "2021-10-01", "record": "advance", "identifier": 1, "date": "2021-05-22",
+                 "initial_amount": "2250.00", "current_balance": "0.00"},
+                records[0]
+            )
+            self.assertEqual("summary", records[-1]["record"])
+
+            result = self.runner.invoke(interface, ["balances", "2021-10-01", "--open-only"])
+            self.assertEqual(11, len(result.output.splitlines()))
+
+    def test_load_follow(self):
+        """Test that following a CSV file loads only the complete lines appended since the previous load."""
+        with open(os.path.join(self.test_dir, "test7.csv"), "r") as test_f:
+            lines = test_f.readlines()
+
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+            with open("events.csv", "w") as events_f:
+                events_f.writelines(lines[:100])
+                events_f.write(lines[100][:10])
+
+            result = self.runner.invoke(interface, ["load", "events.csv", "--follow", "--once"])
+            self.assertEqual(0, result.exit_code)
+            self.assertEqual("Loaded 100 events from events.csv\n", result.output)
+
+            result = self.runner.invoke(interface, ["load", "events.csv", "--follow", "--once"])
+            self.assertEqual("Loaded 0 events from events.csv\n", result.output)
+
+            with open("events.csv", "a") as events_f:
+                events_f.write(lines[100][10:])
+                events_f.writelines(lines[101:])
+
+            result = self.runner.invoke(interface, ["load", "events.csv", "--follow", "--once"])
+            self.assertEqual("Loaded 400 events from events.csv\n", result.output)
+
+            result = self.runner.invoke(interface, ["balances", "2022-01-11"])
+            with open(os.path.join(self.test_dir, "test7.correct.2022-01-11.txt"), "r") as correct_f:
+                self.assertEqual(correct_f.read(), result.output)
+
+    def test_load_validation(self):
+        """Test that invalid lines are rejected with their offset, while the valid ones are loaded."""
+        with open(os.path.join(self.test_dir, "test7.csv"), "r") as test_f:
+            lines = test_f.readlines()
+
+        invalid_lines = [
+            "refund,2021-05-03,100.00\n",
+            "advance,2021-02-30,100.00\n",
+            "advance,2021-05-03,abc\n",
+            "payment,2021-05-03,0\n",
+            "advance,2021-05-03,-5.00\n",
+            "advance,2021-05-03\n",
+        ]
+
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+            offsets = []
+            with open("events.csv", "w") as events_f:
+                for index, line in enumerate(lines):
+                    if index % 80 == 40:
+                        offsets.append(events_f.tell())
+                        events_f.write(invalid_lines[len(offsets) - 1])
+
+                    events_f.write(line)
+
+            result = self.runner.invoke(
+                interface, ["load", "events.csv", "--workers", "2", "--chunk-size", "1024"]
+            )
+            self.assertEqual(0, result.exit_code)
+            self.assertEqual(
+                "Loaded 500 events from events.csv\nRejected 6 lines, written to events.csv.rejects\n",
+                result.output
+            )
+
+            with open("events.csv.rejects", "r", newline="") as rejects_f:
+                rejects = list(csv.reader(rejects_f))
+
+            self.assertEqual(["offset", "reason", "line"], rejects[0])
+            self.assertEqual([str(offset) for offset in offsets], [reject[0] for reject in rejects[1:]])
+            self.assertEqual([line.strip() for line in invalid_lines], [reject[2] for reject in rejects[1:]])
+
+            result = self.runner.invoke(interface, ["balances", "2022-01-11"])
+            with open(os.path.join(self.test_dir, "test7.correct.2022-01-11.txt"), "r") as correct_f:
+                self.assertEqual(correct_f.read(), result.output)
+
+    def test_load_compressed(self):
+        """Test that compressed files and the standard input are loaded as plain CSV files."""
+        with open(os.path.join(self.test_dir, "test7.csv"), "rb") as test_f:
+            data = test_f.read()
+
+        with open(os.path.join(self.test_dir, "test7.correct.2022-01-11.txt"), "r") as correct_f:
+            correct = correct_f.read()
+
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            for filename, compress in (("events.csv.gz", gzip.compress), ("events.csv.bz2", bz2.compress)):
+                with self.subTest(filename=filename):
+                    self.runner.invoke(interface, ["drop-db"])
+                    self.runner.invoke(interface, ["create-db"])
+                    with open(filename, "wb") as events_f:
+                        events_f.write(compress(data))
+
+                    result = self.runner.invoke(interface, ["load", filename])
+                    self.assertEqual(f"Loaded 500 events from {filename}\n", result.output)
+
+                    result = self.runner.invoke(interface, ["balances", "2022-01-11"])
+                    self.assertEqual(correct, result.output)
+
+            self.runner.invoke(interface, ["drop-db"])
+            self.runner.invoke(interface, ["create-db"])
+            result = self.runner.invoke(
+                interface, ["load", "-", "--workers", "2", "--chunk-size", "1024"], input=lzma.compress(data)
+            )
+            self.assertEqual("Loaded 500 events from stdin\n", result.output)
+
+            result = self.runner.invoke(interface, ["balances", "2022-01-11"])
+            self.assertEqual(correct, result.output)
+
+            result = self.runner.invoke(interface, ["load", "events.csv.gz", "--follow", "--once"])
+            self.assertNotEqual(0, result.exit_code)
+
+    def test_simulate_and_quote(self):
+        """Test that hypothetical events are applied in memory as if they were loaded, without storing them."""
+        with open(os.path.join(self.test_dir, "test2.csv"), "r") as test_f:
+            lines = test_f.readlines()
+
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+            with open("events.csv", "w") as events_f:
+                events_f.writelines(lines[:3])
+
+            self.runner.invoke(interface, ["load", "events.csv"])
+            hypothetical = [option for line in lines[3:] for option in ("-e", line.strip())]
+
+            result = self.runner.invoke(interface, ["simulate", "2021-10-01", *hypothetical])
+            with open(os.path.join(self.test_dir, "test2.correct.2021-10-01.txt"), "r") as correct_f:
+                self.assertEqual(correct_f.read(), result.output)
+
+            result = self.runner.invoke(interface, ["quote", "2021-10-01", *hypothetical])
+            self.assertEqual(0, result.exit_code)
+            self.assertIn("Payoff Amount:                                      773.18\n", result.output)
+
+            result = self.runner.invoke(
+                interface,
+                ["simulate", "2021-10-01", *hypothetical, "-e", "payment,2021-10-01,773.18", "--format", "jsonl"]
+            )
+            summary = json.loads(result.output.splitlines()[-1])
+            self.assertEqual(("0.00", "0.00"), (summary["advance_balance"], summary["interest_payable_balance"]))
+
+            result = self.runner.invoke(interface, ["quote", "2021-10-01", "-e", "payment,2021-06-01,100.00"])
+            self.assertNotEqual(0, result.exit_code)
+
+            # THE HYPOTHETICAL EVENTS WERE NEVER STORED
+            result = self.runner.invoke(interface, ["balances", "2021-07-08"])
+            with open(os.path.join(self.test_dir, "test2.correct.2021-07-08.txt"), "r") as correct_f:
+                self.assertEqual(correct_f.read(), result.output)
+
+    def test_advance_history(self):
+        """Test that the history of an advance is read from the allocations saved by the loads."""
+        with open(os.path.join(self.test_dir, "test2.csv"), "r") as test_f:
+            lines = test_f.readlines()
+
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+
+            # THE LAST EVENTS ARE LOADED LATER, SO THEIR ALLOCATIONS ARE ADDED TO THE INDEX
+            for name, chunk in (("first.csv", lines[:3]), ("second.csv", lines[3:])):
+                with open(name, "w") as events_f:
+                    events_f.writelines(chunk)
+
+                self.runner.invoke(interface, ["load", name])
+
+            result = self.runner.invoke(interface, ["advance-history", "1"])
+            self.assertEqual(
+                "Advance:\n"
+                "----------------------------------------------------------\n"
+                "Identifier       Date      Initial Amt     Current Balance\n"
+                "         1 2021-05-22          2250.00                0.00\n"
+                "\n"
+                "History:\n"
+                "----------------------------------------------------------\n"
+                "      Date     Event    Source     Allocated       Balance\n"
+                "2021-05-22         1    credit          0.00       2250.00\n"
+                "2021-06-03         2   payment        240.55       2009.45\n"
+                "2021-07-28         4   payment       2009.45          0.00\n",
+                result.output
+            )
+
+            result = self.runner.invoke(interface, ["advance-history", "3"])
+            self.assertIn("2021-08-04         5    credit        742.21        757.79\n", result.output)
+
+            result = self.runner.invoke(interface, ["advance-history", "4"])
+            self.assertNotEqual(0, result.exit_code)
+
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+
+            # THE SECOND PAYMENT ONLY COVERS THE INTEREST, SO IT IS NOT LISTED
+            with open("interest.csv", "w") as events_f:
+                events_f.write("advance,2021-01-01,1000.00\npayment,2021-01-11,3.50\npayment,2021-01-13,1000.70\n")
+
+            self.runner.invoke(interface, ["load", "interest.csv"])
+            result = self.runner.invoke(interface, ["advance-history", "1"])
+            self.assertEqual(
+                "2021-01-01         1    credit          0.00       1000.00\n"
+                "2021-01-13         3   payment       1000.00          0.00\n",
+                "".join(result.output.splitlines(keepends=True)[-2:])
+            )
+
+    def test_monthly_report(self):
+        """Test that the monthly rollups saved by the loads match whether the events are loaded at once or not."""
+        with open(os.path.join(self.test_dir, "test2.csv"), "r") as test_f:
+            lines = test_f.readlines()
+
+        expected_output = (
+            "Monthly Report:\n"
+            "----------------------------------------------------------\n"
+            "  Month     Advanced       Repaid     Accrued     Int Paid\n"
+            "2021-05      2250.00         0.00        7.87         0.00\n"
+            "2021-06         0.00       240.55       21.27         9.45\n"
+            "2021-07      1200.00      3209.45       28.65        48.34\n"
+            "2021-08      1500.00       742.21        0.00         0.00\n"
+        )
+
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+            self.runner.invoke(interface, ["load", os.path.join(self.test_dir, "test2.csv")])
+
+            result = self.runner.invoke(interface, ["report", "monthly"])
+            self.assertEqual(expected_output, result.output)
+
+            result = self.runner.invoke(interface, ["report", "monthly", "--from", "2021-06", "--to", "2021-06"])
+            self.assertEqual(expected_output.splitlines()[4], result.output.splitlines()[3])
+            self.assertEqual(4, len(result.output.splitlines()))
+
+            result = self.runner.invoke(interface, ["report", "monthly", "--format", "csv"])
+            self.assertEqual(
+                "month,principal_advanced,principal_repaid,interest_accrued,interest_paid\n"
+                "2021-05,2250.00,0.00,7.87,0.00\n",
+                "".join(result.output.splitlines(keepends=True)[:2])
+            )
+
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+
+            # THE FIRST EVENTS ARE LOADED LATER, SO THE MONTHS AFTER THEM ARE ROLLED UP AGAIN
+            for name, chunk in (("second.csv", lines[2:]), ("first.csv", lines[:2])):
+                with open(name, "w") as events_f:
+                    events_f.writelines(chunk)
+
+                self.runner.invoke(interface, ["load", name])
+                self.runner.invoke(interface, ["report", "monthly"])
+
+            result = self.runner.invoke(interface, ["report", "monthly"])
+            self.assertEqual(expected_output, result.output)
+
+        with self.runner.isolated_filesystem(temp_dir="/tmp"):
+            self.runner.invoke(interface, ["create-db"])
+
+            # THE FIRST LOAD ENDS ON THE LAST DAY OF A MONTH, SO ITS INTEREST IS SPLIT BY THE NEXT LOAD
+            for name, line in (
+                ("first.csv", "advance,2021-05-31,1000.00\n"),
+                ("second.csv", "payment,2021-06-10,10.00\n"),
+            ):
+                with open(name, "w") as events_f:
+                    events_f.write(line)
+
+                self.runner.invoke(interface, ["load", name])
+                self.runner.invoke(interface, ["report", "monthly"])
+
+            result = self.runner.invoke(interface, ["report", "monthly"])
+            self.assertEqual(
+                "2021-05      1000.00         0.00        0.35         0.00\n"
+                "2021-06         0.00         6.50        3.15         3.50\n",
+                "".join(result.output.splitlines(keepends=True)[3:])
+            )
+
 
 if __name__ == "__main__":
     unittest.main()